@@ -5,11 +5,17 @@ from flask_cors import CORS
 from src.models.user import db
 from src.routes.user_routes import user_bp
 from src.routes.routes import routes_bp
-from src.routes.tourist_spots import tourist_spots_bp
+from src.routes.tourist_spots import TOURIST_SPOTS_MAX_AGE, tourist_spots_bp
 from src.routes.pdf_export import pdf_export_bp
 from src.routes.notifications import notifications_bp
+from src.routes.metrics import metrics_bp
+from src.services.database import configure_database
+from src.services.logging_config import configure_logging
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+
+# Logs estruturados com X-Request-ID (LOG_LEVEL / LOG_FORMAT por ambiente)
+configure_logging(app)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
 # Habilitar CORS para todas as rotas
@@ -21,21 +27,19 @@ app.register_blueprint(routes_bp, url_prefix='/api')
 app.register_blueprint(tourist_spots_bp, url_prefix='/api')
 app.register_blueprint(pdf_export_bp, url_prefix='/api')
 app.register_blueprint(notifications_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
 
-# Configurar banco de dados
-# Garantir que a pasta database existe
-database_dir = os.path.join(os.path.dirname(__file__), 'database')
-os.makedirs(database_dir, exist_ok=True)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(database_dir, 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+# Configurar banco de dados (DATABASE_URL ou SQLite local em database/app.db)
+configure_database(app, db)
 
 # Importar todos os modelos para garantir que sejam registrados
 with app.app_context():
     from src.models.route import Route
+    from src.models.route_point import RoutePoint
     from src.models.tourist_spot import TouristSpot
+    from src.models.migrations import run_migrations
     db.create_all()
+    run_migrations()
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -44,9 +48,10 @@ def serve(path):
     if static_folder_path is None:
             return "Static folder not configured", 404
 
-    # Servir tourist_spots.json diretamente da raiz
+    # Servir tourist_spots.json diretamente da raiz (ETag do arquivo, 304 e Cache-Control público)
     if path == 'tourist_spots.json':
-        return send_from_directory(os.path.dirname(__file__), 'tourist_spots.json')
+        return send_from_directory(os.path.dirname(__file__), 'tourist_spots.json',
+                                   max_age=TOURIST_SPOTS_MAX_AGE)
 
     if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
         return send_from_directory(static_folder_path, path)
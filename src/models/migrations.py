@@ -0,0 +1,294 @@
+from src.models.user import db
+from src.models.route import Route
+from src.models.route_point import RoutePoint
+from src.services.geo import spot_coordinates
+from src.services.route_summary import summarize_points
+from sqlalchemy import bindparam, exists, insert, inspect, select, text, update
+from sqlalchemy.schema import CreateTable
+from datetime import datetime
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Evolução do esquema do banco.
+#
+# db.create_all() cria tabelas novas (já com índices e chaves estrangeiras dos
+# modelos), mas não altera tabelas existentes. Cada migração abaixo leva um
+# banco antigo ao esquema atual; a versão aplicada fica na tabela
+# schema_version. Migrações precisam ser idempotentes, pois em um banco novo
+# rodam sobre tabelas que já nasceram no formato final.
+
+def backfill_route_points(connection, batch_size=500):
+    """Copia os pontos do JSON antigo (Route.pontos_turisticos) para route_points.
+
+    Idempotente: só processa rotas que ainda não têm linhas em route_points
+    e cujo JSON não está vazio. Usa apenas as colunas existentes desde a
+    criação de route (SQL direto, independente da versão atual do modelo).
+    Retorna o número de rotas migradas.
+    """
+    routes = Route.__table__
+    points = RoutePoint.__table__
+    pending = (select(routes.c.id, routes.c.pontos_turisticos)
+               .where(~exists().where(points.c.route_id == routes.c.id))
+               .where(routes.c.pontos_turisticos.notin_(['', '[]']))
+               .order_by(routes.c.id))
+
+    migrated = 0
+    last_id = 0
+    while True:
+        batch = connection.execute(pending.where(routes.c.id > last_id).limit(batch_size)).all()
+        if not batch:
+            break
+        rows = []
+        migrated_ids = []
+        for route_id, pontos_json in batch:
+            last_id = route_id
+            try:
+                pontos = json.loads(pontos_json)
+            except ValueError as e:
+                logger.warning('Rota %s: JSON de pontos inválido, mantido no formato antigo (%s)', route_id, e)
+                continue
+            if not isinstance(pontos, list):
+                continue
+            rows.extend(RoutePoint.row_values(route_id, position, ponto) for position, ponto in enumerate(pontos))
+            migrated_ids.append(route_id)
+        if rows:
+            connection.execute(insert(points), rows)
+        if migrated_ids:
+            # updated_at mantido: a coluna tem onupdate, aplicado também em UPDATEs do Core
+            connection.execute(update(routes).where(routes.c.id.in_(migrated_ids))
+                               .values(pontos_turisticos='[]', updated_at=routes.c.updated_at))
+        migrated += len(migrated_ids)
+
+    if migrated:
+        logger.info('route_points: %d rotas migradas do formato JSON', migrated)
+    return migrated
+
+def create_named_indexes(model, *names):
+    """Cria, se ainda não existirem, os índices do modelo com esses nomes.
+
+    Para migrações que introduzem um índice específico; nomes que não estão
+    declarados no modelo são erro de programação (ValueError ao montar a migração).
+    """
+    table = model.__table__
+    indexes = {index.name: index for index in table.indexes}
+    unknown = [name for name in names if name not in indexes]
+    if unknown:
+        raise ValueError(f'Índices não declarados em {table.name}: {", ".join(unknown)}')
+
+    def migrate(connection):
+        existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+        for name in names:
+            if name not in existing:
+                indexes[name].create(connection)
+    return migrate
+
+def create_composite_indexes(connection):
+    """Índices compostos da listagem de rotas por usuário e dos pontos de cada rota"""
+    create_named_indexes(Route, 'ix_route_user_created_at', 'ix_route_user_data_inicio')(connection)
+    create_named_indexes(RoutePoint, 'ix_route_points_route_position', 'ix_route_points_spot_id',
+                         'ix_route_points_lat_lng')(connection)
+
+def restore_route_user_fk(connection):
+    """Recria a tabela route com a chave estrangeira para user.
+
+    O SQLite não permite adicionar uma FK com ALTER TABLE; segue o
+    procedimento recomendado: nova tabela, cópia, remoção e renomeação.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    if any(fk['referred_table'] == 'user' for fk in inspect(connection).get_foreign_keys('route')):
+        return
+    if connection.execute(text('PRAGMA foreign_keys')).scalar():
+        # Com FKs ativas, o DROP TABLE apagaria os route_points em cascata
+        raise RuntimeError('Desative PRAGMA foreign_keys antes de recriar a tabela route')
+
+    table = Route.__table__
+    create_sql = str(CreateTable(table).compile(connection)).strip()
+    create_sql = create_sql.replace('CREATE TABLE route ', 'CREATE TABLE route_new ', 1)
+    # Copiar apenas as colunas que já existem; as novas ficam nulas
+    existing = {column['name'] for column in inspect(connection).get_columns('route')}
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+
+    connection.execute(text(create_sql))
+    connection.execute(text(f'INSERT INTO route_new ({columns}) SELECT {columns} FROM route'))
+    connection.execute(text('DROP TABLE route'))
+    connection.execute(text('ALTER TABLE route_new RENAME TO route'))
+    for index in table.indexes:
+        index.create(connection)
+
+def add_model_columns(model, *names):
+    """Adiciona ao banco as colunas do modelo que ainda não existem na tabela"""
+    def migrate(connection):
+        table = model.__table__
+        existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+        for name in names:
+            if name in existing:
+                continue
+            column = table.columns[name]
+            column_type = column.type.compile(dialect=connection.dialect)
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}'
+            if column.server_default is not None:
+                # Colunas NOT NULL precisam de um valor padrão para as linhas existentes
+                ddl += f' NOT NULL DEFAULT {column.server_default.arg}'
+            connection.execute(text(ddl))
+    return migrate
+
+def backfill_route_summaries(connection, batch_size=500):
+    """Calcula o resumo (distância, tempo, caixa envolvente) das rotas que não o têm.
+
+    SQL direto sobre as colunas existentes neste passo (colunas adicionadas
+    depois, como route.version, ainda não existem em bancos antigos). Não
+    altera updated_at nem version: ETags e chaves de cache continuam válidas.
+    """
+    add_model_columns(Route, *Route.SUMMARY_COLUMNS)(connection)
+    create_named_indexes(Route, 'ix_route_user_total_distance', 'ix_route_bbox')(connection)
+
+    routes = Route.__table__
+    points = RoutePoint.__table__
+    store = (update(routes)
+             .where(routes.c.id == bindparam('route_id'))
+             .values({column: bindparam('new_' + column) for column in Route.SUMMARY_COLUMNS})
+             # updated_at mantido (onupdate também vale para UPDATEs do Core)
+             .values(updated_at=routes.c.updated_at))
+
+    last_id = 0
+    updated = 0
+    while True:
+        batch = connection.execute(
+            select(routes.c.id, routes.c.pontos_turisticos)
+            .where(routes.c.total_distance.is_(None), routes.c.id > last_id)
+            .order_by(routes.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        located = {route_id: [] for route_id, _ in batch}
+        rows = connection.execute(
+            select(points.c.route_id, points.c.latitude, points.c.longitude, points.c.extra)
+            .where(points.c.route_id.in_(located))
+            .order_by(points.c.route_id, points.c.position)
+        )
+        for route_id, latitude, longitude, extra in rows:
+            located[route_id].append(_summary_point(latitude, longitude, extra))
+
+        values = []
+        for route_id, pontos_json in batch:
+            pontos = located[route_id] or _legacy_points(route_id, pontos_json)
+            summary = summarize_points(pontos)
+            values.append({'route_id': route_id, **{'new_' + column: summary[column] for column in summary}})
+        connection.execute(store, values)
+        updated += len(values)
+    if updated:
+        logger.info('Resumo calculado para %d rotas', updated)
+
+def _summary_point(latitude, longitude, extra):
+    """Ponto com apenas o necessário para summarize_points (coordenadas)"""
+    if latitude is not None or longitude is not None:
+        return {'localizacao': {'latitude': latitude, 'longitude': longitude}}
+    # Coordenadas fora de "localizacao" (ex.: lat/lng) ficam no JSON de campos extras
+    return json.loads(extra) if extra else {}
+
+def _legacy_points(route_id, pontos_json):
+    """Pontos de rotas que continuaram no formato JSON antigo"""
+    try:
+        pontos = json.loads(pontos_json) if pontos_json else []
+    except ValueError:
+        logger.warning('Rota %s: JSON de pontos inválido, resumo vazio', route_id)
+        return []
+    return pontos if isinstance(pontos, list) else []
+
+def backfill_point_coordinates(connection, batch_size=500):
+    """Preenche latitude/longitude de route_points gravados sem coordenadas.
+
+    Pontos informados com lat/lng (em vez de "localizacao") tinham as
+    coordenadas apenas no JSON; sem elas nas colunas, a busca de rotas
+    próximas não os encontra. Lê o ponto original (point_json) ou, em linhas
+    mais antigas, os campos extras. Retorna o número de linhas atualizadas.
+    """
+    points = RoutePoint.__table__
+    store = (update(points)
+             .where(points.c.id == bindparam('point_id'))
+             .values(latitude=bindparam('new_latitude'), longitude=bindparam('new_longitude')))
+
+    last_id = 0
+    updated = 0
+    while True:
+        batch = connection.execute(
+            select(points.c.id, points.c.point_json, points.c.extra)
+            .where(points.c.latitude.is_(None), points.c.longitude.is_(None), points.c.id > last_id)
+            .order_by(points.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        values = []
+        for point_id, point_json, extra in batch:
+            coordinates = _stored_point_coordinates(point_json or extra)
+            if coordinates is not None:
+                values.append({'point_id': point_id, 'new_latitude': coordinates[0],
+                               'new_longitude': coordinates[1]})
+        if values:
+            connection.execute(store, values)
+            updated += len(values)
+    if updated:
+        logger.info('route_points: coordenadas preenchidas em %d pontos', updated)
+    return updated
+
+def _stored_point_coordinates(point_json):
+    """(lat, lng) de um ponto gravado em JSON, ou None se não houver coordenadas válidas"""
+    try:
+        return spot_coordinates(json.loads(point_json)) if point_json else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+# (versão, descrição, função) em ordem de aplicação
+MIGRATIONS = [
+    (1, 'route_points a partir do JSON de Route.pontos_turisticos', backfill_route_points),
+    (2, 'índices compostos de route e route_points', create_composite_indexes),
+    (3, 'chave estrangeira route.user_id -> user.id', restore_route_user_fk),
+    (4, 'resumo da geometria das rotas (distância, tempo, caixa envolvente)', backfill_route_summaries),
+    (5, 'índice da caixa envolvente por usuário', create_named_indexes(Route, 'ix_route_user_bbox')),
+    (6, 'índice de última alteração por usuário', create_named_indexes(Route, 'ix_route_user_updated_at')),
+    (7, 'versão da rota para controle de concorrência otimista', add_model_columns(Route, 'version')),
+    (8, 'ponto original (JSON) em route_points', add_model_columns(RoutePoint, 'point_json')),
+    (9, 'coordenadas de route_points informadas como lat/lng', backfill_point_coordinates),
+]
+
+def current_schema_version(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_version ('
+        ' version INTEGER PRIMARY KEY,'
+        ' description TEXT NOT NULL,'
+        ' applied_at DATETIME NOT NULL)'
+    ))
+    return connection.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+def run_migrations():
+    """Aplica, em ordem, as migrações ainda não registradas em schema_version.
+
+    Deve ser chamada dentro do contexto da aplicação, após db.create_all().
+    Retorna a lista de versões aplicadas.
+    """
+    with db.engine.begin() as connection:
+        version = current_schema_version(connection)
+
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        with db.engine.begin() as connection:
+            migrate(connection)
+            _record(connection, number, description)
+        logger.info('Migração %d aplicada: %s', number, description)
+        applied.append(number)
+    return applied
+
+def _record(connection, number, description):
+    connection.execute(
+        text('INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)'),
+        {'v': number, 'd': description, 't': datetime.utcnow()}
+    )
@@ -1,4 +1,6 @@
 from src.models.user import db
+from src.models.route_point import RoutePoint
+from src.services.route_summary import summarize_points
 from datetime import datetime
 import json
 
@@ -6,30 +8,128 @@ class Route(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(200), nullable=False)
     data_inicio = db.Column(db.DateTime, nullable=False)
-    pontos_turisticos = db.Column(db.Text, nullable=False)  # JSON string
-    user_id = db.Column(db.Integer, nullable=False)  # Removido foreign key temporariamente
+    # Formato antigo (JSON string); os pontos agora ficam em route_points
+    pontos_turisticos = db.Column(db.Text, nullable=False, default='[]')
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Incrementada a cada UPDATE; escrita com versão desatualizada falha (StaleDataError)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+
+    # Resumo da geometria, calculado ao gravar os pontos (nunca na leitura)
+    total_distance = db.Column(db.Float)  # km
+    estimated_time = db.Column(db.Integer)  # minutos
+    min_lat = db.Column(db.Float)
+    min_lng = db.Column(db.Float)
+    max_lat = db.Column(db.Float)
+    max_lng = db.Column(db.Float)
+    centroid_lat = db.Column(db.Float)
+    centroid_lng = db.Column(db.Float)
+
+    __table_args__ = (
+        # Listagem por usuário ordenada por created_at (o id vem junto no índice do SQLite)
+        db.Index('ix_route_user_created_at', 'user_id', 'created_at'),
+        # Total e última alteração por usuário (ETag da listagem)
+        db.Index('ix_route_user_updated_at', 'user_id', 'updated_at'),
+        # Filtros por usuário e período
+        db.Index('ix_route_user_data_inicio', 'user_id', 'data_inicio'),
+        # Ordenação/filtro por distância total
+        db.Index('ix_route_user_total_distance', 'user_id', 'total_distance'),
+        # Pré-filtro espacial pela caixa envolvente
+        db.Index('ix_route_bbox', 'min_lat', 'max_lat', 'min_lng', 'max_lng'),
+        # Rotas próximas de um usuário: caixa envolvente lida direto do índice
+        db.Index('ix_route_user_bbox', 'user_id', 'min_lat', 'max_lat', 'min_lng', 'max_lng'),
+    )
+
+    __mapper_args__ = {'version_id_col': version}
+
+    # Campos aceitos por to_dict(fields=...), na ordem da resposta
+    FIELDS = ('id', 'nome', 'data_inicio', 'pontos_turisticos', 'user_id', 'created_at', 'updated_at', 'version',
+              'summary')
+
+    # Colunas do resumo, na ordem de summarize_points
+    SUMMARY_COLUMNS = ('total_distance', 'estimated_time', 'min_lat', 'min_lng',
+                       'max_lat', 'max_lng', 'centroid_lat', 'centroid_lng')
+
+    points = db.relationship(
+        RoutePoint,
+        order_by=RoutePoint.position,
+        cascade='all, delete-orphan',
+        lazy='selectin'
+    )
 
     def __repr__(self):
         return f'<Route {self.nome}>'
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'data_inicio': self.data_inicio.isoformat() if self.data_inicio else None,
-            'pontos_turisticos': json.loads(self.pontos_turisticos) if self.pontos_turisticos else [],
-            'user_id': self.user_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+    def to_dict(self, fields=None):
+        """Dicionário da rota; ``fields`` limita os campos (sem decodificar os pontos se omitidos)"""
+        serializers = {
+            'id': lambda: self.id,
+            'nome': lambda: self.nome,
+            'data_inicio': lambda: self.data_inicio.isoformat() if self.data_inicio else None,
+            'pontos_turisticos': self.get_pontos_turisticos,
+            'user_id': lambda: self.user_id,
+            'created_at': lambda: self.created_at.isoformat() if self.created_at else None,
+            'updated_at': lambda: self.updated_at.isoformat() if self.updated_at else None,
+            'version': lambda: self.version,
+            'summary': self.get_summary
         }
+        return {field: serializers[field]() for field in (fields or self.FIELDS)}
 
     def set_pontos_turisticos(self, pontos_list):
-        """Converte lista de pontos turísticos para JSON string"""
-        self.pontos_turisticos = json.dumps(pontos_list)
+        """Grava os pontos turísticos na tabela route_points, na ordem informada"""
+        self.points = [RoutePoint.from_point(position, ponto) for position, ponto in enumerate(pontos_list)]
+        self.pontos_turisticos = '[]'
+        self.update_summary(pontos_list)
+
+    def update_summary(self, pontos_list):
+        """Recalcula as colunas de resumo a partir dos pontos"""
+        for column, value in summarize_points(pontos_list).items():
+            setattr(self, column, value)
+
+    def get_summary(self):
+        """Resumo gravado (distância, tempo, caixa envolvente e centróide) ou None"""
+        if self.total_distance is None:
+            return None
+        summary = {
+            'total_distance': self.total_distance,
+            'estimated_time': self.estimated_time,
+            'bbox': None,
+            'centroid': None
+        }
+        if self.centroid_lat is not None:
+            summary['bbox'] = {
+                'min_lat': self.min_lat,
+                'min_lng': self.min_lng,
+                'max_lat': self.max_lat,
+                'max_lng': self.max_lng
+            }
+            summary['centroid'] = {'latitude': self.centroid_lat, 'longitude': self.centroid_lng}
+        return summary
+
+    @classmethod
+    def columns_for(cls, fields):
+        """Colunas necessárias para serializar os campos informados"""
+        columns = set()
+        for field in fields:
+            columns.update(cls.SUMMARY_COLUMNS if field == 'summary' else (field,))
+        return columns
 
     def get_pontos_turisticos(self):
-        """Retorna lista de pontos turísticos a partir do JSON string"""
+        """Retorna a lista de pontos turísticos (route_points ou, em rotas antigas, o JSON string)"""
+        if self.points:
+            return [point.to_point() for point in self.points]
         return json.loads(self.pontos_turisticos) if self.pontos_turisticos else []
 
+    @classmethod
+    def intersecting_box(cls, min_lat, max_lat, min_lng=None, max_lng=None):
+        """Condição SQL: caixa envolvente da rota intersecta a caixa informada (usa ix_route_bbox)"""
+        conditions = [cls.min_lat <= max_lat, cls.max_lat >= min_lat]
+        if min_lng is not None and max_lng is not None:
+            conditions += [cls.min_lng <= max_lng, cls.max_lng >= min_lng]
+        return db.and_(*conditions)
+
+    @classmethod
+    def containing_spot(cls, spot_id):
+        """Consulta das rotas que passam pelo ponto turístico informado"""
+        return cls.query.filter(cls.points.any(RoutePoint.spot_id == str(spot_id)))
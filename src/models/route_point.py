@@ -0,0 +1,97 @@
+from src.models.user import db
+from src.services.geo import spot_coordinates
+import json
+
+# Campos do ponto turístico que têm coluna própria; o restante vai para "extra"
+_COLUMN_FIELDS = ('id', 'nome', 'descricao', 'categoria', 'imagem_url', 'localizacao')
+
+class RoutePoint(db.Model):
+    """Ponto turístico de uma rota, na posição em que é visitado"""
+    __tablename__ = 'route_points'
+
+    id = db.Column(db.Integer, primary_key=True)
+    route_id = db.Column(db.Integer, db.ForeignKey('route.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    spot_id = db.Column(db.String(64))
+    nome = db.Column(db.String(200))
+    descricao = db.Column(db.Text)
+    categoria = db.Column(db.String(100))
+    imagem_url = db.Column(db.String(500))
+    # Coordenadas desnormalizadas para consultas espaciais
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    extra = db.Column(db.Text)  # JSON com campos adicionais do ponto
+    # Ponto exatamente como informado (tipo do ID, campos de localizacao, ...); fonte de to_point
+    point_json = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_route_points_route_position', 'route_id', 'position'),
+        db.Index('ix_route_points_spot_id', 'spot_id'),
+        db.Index('ix_route_points_lat_lng', 'latitude', 'longitude'),
+    )
+
+    def __repr__(self):
+        return f'<RoutePoint {self.route_id}:{self.position} {self.spot_id}>'
+
+    @classmethod
+    def from_point(cls, position, point):
+        """Cria a linha a partir de um ponto no formato da API (dict ou apenas o ID)"""
+        point_json = json.dumps(point)
+        if not isinstance(point, dict):
+            return cls(position=position, spot_id=str(point), point_json=point_json)
+
+        localizacao = point.get('localizacao') or {}
+        extra = {key: value for key, value in point.items() if key not in _COLUMN_FIELDS}
+        if not isinstance(localizacao, dict):
+            extra['localizacao'] = localizacao
+        # Coordenadas de "localizacao" ou de lat/lng, como em summarize_points
+        latitude, longitude = spot_coordinates(point) or (None, None)
+        return cls(
+            position=position,
+            spot_id=str(point['id']) if point.get('id') is not None else None,
+            nome=point.get('nome'),
+            descricao=point.get('descricao'),
+            categoria=point.get('categoria'),
+            imagem_url=point.get('imagem_url'),
+            latitude=latitude,
+            longitude=longitude,
+            extra=json.dumps(extra) if extra else None,
+            point_json=point_json
+        )
+
+    @classmethod
+    def row_values(cls, route_id, position, point):
+        """Valores das colunas para um INSERT direto (sem passar pela sessão)"""
+        built = cls.from_point(position, point)
+        values = {column.name: getattr(built, column.name) for column in cls.__table__.columns if column.name != 'id'}
+        values['route_id'] = route_id
+        return values
+
+    def to_point(self):
+        """Ponto no formato da API (o mesmo informado em from_point)"""
+        if self.point_json is not None:
+            return json.loads(self.point_json)
+        # Linhas gravadas antes de point_json: reconstruído a partir das colunas
+        # IDs numéricos voltam como inteiros, como no catálogo de pontos turísticos
+        spot_id = int(self.spot_id) if self.spot_id and self.spot_id.isdigit() else self.spot_id
+        details = (self.nome, self.descricao, self.categoria, self.imagem_url,
+                   self.latitude, self.longitude, self.extra)
+        if all(value is None for value in details):
+            # Ponto informado apenas pelo ID
+            return spot_id
+
+        point = {'id': spot_id}
+        if self.nome is not None:
+            point['nome'] = self.nome
+        if self.descricao is not None:
+            point['descricao'] = self.descricao
+        if self.categoria is not None:
+            point['categoria'] = self.categoria
+        if self.imagem_url is not None:
+            point['imagem_url'] = self.imagem_url
+        extra = json.loads(self.extra) if self.extra else {}
+        # Coordenadas vindas de lat/lng já voltam pelos campos extras
+        if (self.latitude is not None or self.longitude is not None) and 'lat' not in extra:
+            point['localizacao'] = {'latitude': self.latitude, 'longitude': self.longitude}
+        point.update(extra)
+        return point
@@ -3,5 +3,6 @@ from .routes import routes_bp
 from .tourist_spots import tourist_spots_bp
 from .pdf_export import pdf_export_bp
 from .notifications import notifications_bp
+from .metrics import metrics_bp
 
 
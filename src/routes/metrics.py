@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify
+from src.routes.pdf_export import pdf_job_queue
+from src.services.cache import cache_stats
+from src.services.http_client import upstream_stats
+from src.services.tourist_spot_catalog import catalog
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Métricas de desempenho: catálogo em memória, caches, filas de jobs e serviços externos"""
+    try:
+        return jsonify({
+            "catalog": catalog.stats(),
+            "caches": cache_stats(),
+            "jobs": {pdf_job_queue.kind: pdf_job_queue.stats()},
+            "upstreams": upstream_stats()
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
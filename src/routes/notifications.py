@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
+import logging
 from src.models.user import User
 
 notifications_bp = Blueprint("notifications", __name__)
+logger = logging.getLogger(__name__)
 
 @notifications_bp.route("/notifications/send", methods=["POST"])
 def send_notification():
@@ -18,7 +20,7 @@ def send_notification():
         # Simulação de envio de e-mail
         user = User.query.get(user_id)
         if user:
-            print(f"Simulando envio de e-mail para {user.email}: {message}")
+            logger.info("Simulando envio de e-mail para o usuário %s", user.id)
             return jsonify({"message": "Notificação enviada com sucesso (simulado)"}), 200
         else:
             return jsonify({"error": "Usuário não encontrado"}), 404
@@ -1,226 +1,546 @@
 from flask import Blueprint, request, jsonify, send_file
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.graphics.shapes import Drawing, Circle, Line, String
 from reportlab.graphics import renderPDF
 from src.models.route import Route
-import tempfile
-import os
+from src.models.user import db
+from src.services.cache import FileLRUCache, register_cache
+from src.services.database import DEFAULT_DATABASE_DIR
+from src.services.http_caching import not_modified, with_validators
+from src.services.job_queue import DEFAULT_START_METHOD, DONE, FAILED, JobQueue, JobStore, QueueFull
+from src.services.map_image import prepare_map_image
+import functools
+import hashlib
+import itertools
 import json
+import logging
+import os
 from PIL import Image as PILImage
+from xml.sax.saxutils import escape
 import io
 
 pdf_export_bp = Blueprint("pdf_export", __name__)
+logger = logging.getLogger(__name__)
+
+# Alterar quando o layout do PDF mudar, para invalidar os PDFs já em cache
+PDF_RENDER_VERSION = 2
+
+# Área do mapa na página (polegadas)
+MAP_WIDTH_IN = 6
+MAP_HEIGHT_IN = 4
+
+# PDFs já gerados, por conteúdo (rota, versão e imagem do mapa); 0 desativa
+route_pdf_cache = register_cache(FileLRUCache(
+    'route_pdfs',
+    directory=os.environ.get('PDF_CACHE_DIR', os.path.join(DEFAULT_DATABASE_DIR, 'pdf_cache')),
+    max_bytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+))
+
+# PDFs de rotas são dados do usuário: revalidados a cada download (ETag)
+PDF_CACHE_CONTROL = 'private, no-cache'
+
+# Exportação assíncrona: processos que geram PDFs e limite de jobs pendentes por processo
+PDF_JOB_WORKERS = int(os.environ.get('PDF_JOB_WORKERS', 2))
+PDF_JOB_MAX_PENDING = int(os.environ.get('PDF_JOB_MAX_PENDING', 16))
+PDF_JOB_TIMEOUT = int(os.environ.get('PDF_JOB_TIMEOUT', 300))
+# Tempo (s) que o resultado de um job fica disponível para download
+PDF_JOB_TTL = int(os.environ.get('PDF_JOB_TTL', 3600))
+# Segundos sugeridos ao cliente (Retry-After) quando a fila está cheia
+PDF_JOB_RETRY_AFTER = 5
+
+# Livro da viagem: limite de rotas por documento e rotas carregadas do banco por vez
+ROUTE_BOOK_MAX_ROUTES = int(os.environ.get('ROUTE_BOOK_MAX_ROUTES', 500))
+ROUTE_BOOK_BATCH_SIZE = int(os.environ.get('ROUTE_BOOK_BATCH_SIZE', 50))
+ROUTE_BOOK_DEFAULT_TITLE = "Roteiro de Viagem"
+
+pdf_job_queue = JobQueue(
+    'pdf_export',
+    store=JobStore(os.environ.get('PDF_JOBS_DB_PATH', os.path.join(DEFAULT_DATABASE_DIR, 'jobs.db')), PDF_JOB_TTL),
+    max_workers=PDF_JOB_WORKERS,
+    max_pending=PDF_JOB_MAX_PENDING,
+    job_timeout=PDF_JOB_TIMEOUT,
+    on_result=lambda key, pdf: route_pdf_cache.set(key, pdf),
+    start_method=os.environ.get('PDF_JOB_START_METHOD') or DEFAULT_START_METHOD
+)
 
 @pdf_export_bp.route("/routes/<int:route_id>/export-pdf", methods=["GET", "POST"])
 def export_route_to_pdf(route_id):
-    """Exportar rota para PDF"""
+    """Exportar rota para PDF (gerado em memória e reaproveitado do cache se a rota não mudou)"""
     try:
-        route = Route.query.get_or_404(route_id)
-        
-        # Inicializar variáveis para cleanup
-        temp_image_path = None
+        # A chave do cache sai da versão da rota, sem carregar os pontos
+        row = db.session.query(Route.nome, Route.version, Route.updated_at).filter_by(id=route_id).first()
+        if row is None:
+            return jsonify({"error": "Rota não encontrada"}), 404
         
-        # Verificar se há dados de imagem do mapa enviados via POST
-        map_image_data = None
-        if request.method == "POST":
-            if 'map_image' in request.files:
-                map_file = request.files['map_image']
-                if map_file.filename != '':
-                    # Processar imagem do mapa
-                    map_image_data = map_file.read()
-                    print(f"Imagem do mapa recebida: {len(map_image_data)} bytes")
+        map_image_data = uploaded_map_image()
+        key = route_pdf_key(route_id, row.version, row.updated_at, map_image_data)
+        if request.method == "GET":
+            cached = not_modified(key, PDF_CACHE_CONTROL)
+            if cached:
+                return cached
         
-        # Criar arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        temp_filename = temp_file.name
-        temp_file.close()
-        
-        # Criar documento PDF
-        doc = SimpleDocTemplate(temp_filename, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
+        pdf = route_pdf_cache.get(key)
+        if pdf is None:
+            route = db.session.get(Route, route_id)
+            buffer = io.BytesIO()
+            map_image = render_route_pdf(route_pdf_data(route), buffer, map_image_data)
+            pdf = buffer.getvalue()
+            route_pdf_cache.set(key, pdf)
+        else:
+            map_image = None
         
-        # Título
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=1  # Center
+        # send_file envia o buffer em blocos, sem passar pelo disco
+        response = send_file(
+            io.BytesIO(pdf),
+            as_attachment=True,
+            download_name=pdf_filename(row.nome),
+            mimetype="application/pdf"
         )
-        story.append(Paragraph("Rota: " + route.nome, title_style))
-        story.append(Spacer(1, 20))
-        
-        # Adicionar mapa - priorizar imagem enviada, depois mapa simples
-        pontos = route.get_pontos_turisticos()
-        pontos_com_localizacao = [p for p in pontos if p.get('localizacao')]
+        if map_image is not None:
+            add_map_image_headers(response, map_image)
+        return with_validators(response, key, PDF_CACHE_CONTROL)
         
-        if map_image_data:
-            # Usar imagem real do mapa capturada
-            try:
-                # Criar arquivo temporário para a imagem
-                temp_img = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-                temp_img.write(map_image_data)
-                temp_img.close()
-                
-                print(f"Arquivo temporário da imagem criado: {temp_img.name}")
-                
-                # Verificar se o arquivo existe e tem conteúdo
-                if os.path.exists(temp_img.name) and os.path.getsize(temp_img.name) > 0:
-                    # Adicionar imagem ao PDF
-                    story.append(Paragraph("<b>Mapa da Rota:</b>", styles["Heading3"]))
-                    story.append(Spacer(1, 10))
-                    
-                    # Redimensionar imagem para caber na página
-                    img = Image(temp_img.name, width=6*inch, height=4*inch)
-                    story.append(img)
-                    story.append(Spacer(1, 20))
-                    
-                    print("Mapa real adicionado ao PDF com sucesso")
-                    
-                    # Guardar referência para deletar depois do PDF ser gerado
-                    temp_image_path = temp_img.name
-                else:
-                    print("Arquivo de imagem não foi criado corretamente")
-                    temp_image_path = None
-                    # Fallback para mapa simples
-                    if pontos_com_localizacao:
-                        try:
-                            map_drawing = create_simple_map(pontos_com_localizacao)
-                            story.append(Paragraph("<b>Mapa da Rota (Simples):</b>", styles["Heading3"]))
-                            story.append(Spacer(1, 10))
-                            story.append(map_drawing)
-                            story.append(Spacer(1, 20))
-                        except Exception as simple_map_error:
-                            print(f"Erro ao criar mapa simples: {simple_map_error}")
-                    
-            except Exception as map_error:
-                print(f"Erro ao processar imagem do mapa: {map_error}")
-                temp_image_path = None
-                # Fallback para mapa simples
-                if pontos_com_localizacao:
-                    try:
-                        map_drawing = create_simple_map(pontos_com_localizacao)
-                        story.append(Paragraph("<b>Mapa da Rota (Simples):</b>", styles["Heading3"]))
-                        story.append(Spacer(1, 10))
-                        story.append(map_drawing)
-                        story.append(Spacer(1, 20))
-                    except Exception as simple_map_error:
-                        print(f"Erro ao criar mapa simples: {simple_map_error}")
-        else:
-            temp_image_path = None
-            # Usar mapa simples como fallback
-            try:
-                map_drawing = create_simple_map(pontos_com_localizacao)
-                story.append(Paragraph("<b>Mapa da Rota (Simples):</b>", styles["Heading3"]))
-                story.append(Spacer(1, 10))
-                story.append(map_drawing)
-                story.append(Spacer(1, 20))
-            except Exception as map_error:
-                print(f"Erro ao criar mapa simples: {map_error}")
-                # Continuar sem o mapa
-        
-        # TODO: Adicionar mapa visual no futuro
-        # Por enquanto, incluir apenas informações textuais
+    except Exception as e:
+        logger.exception("Erro ao gerar PDF")
+        return jsonify({"error": str(e)}), 500
+
+
+@pdf_export_bp.route("/routes/<int:route_id>/export-pdf/jobs", methods=["POST"])
+def create_pdf_export_job(route_id):
+    """Enfileirar a exportação da rota para PDF; o PDF é gerado em um processo separado"""
+    try:
+        row = db.session.query(Route.nome, Route.version, Route.updated_at).filter_by(id=route_id).first()
+        if row is None:
+            return jsonify({"error": "Rota não encontrada"}), 404
         
-        # Informações da rota
-        info_style = styles["Normal"]
-        story.append(Paragraph("<b>Data de Início:</b> " + route.data_inicio.strftime("%d/%m/%Y às %H:%M"), info_style))
-        story.append(Spacer(1, 10))
+        map_image_data = uploaded_map_image()
+        key = route_pdf_key(route_id, row.version, row.updated_at, map_image_data)
+        filename = pdf_filename(row.nome)
         
-        # Pontos turísticos
-        pontos = route.get_pontos_turisticos()
-        if pontos:
-            story.append(Paragraph("<b>Pontos Turísticos:</b>", styles["Heading2"]))
-            story.append(Spacer(1, 10))
-            
-            # Criar tabela com pontos
-            data = [["#", "Nome", "Descrição"]]
-            for i, ponto in enumerate(pontos, 1):
-                nome = ponto.get("nome", "N/A")
-                descricao = ponto.get("descricao", "N/A")
-                # Limitar descrição para caber na tabela
-                if len(descricao) > 100:
-                    descricao = descricao[:97] + "..."
-                data.append([str(i), nome, descricao])
-            
-            table = Table(data, colWidths=[0.5*inch, 2*inch, 3.5*inch])
-            table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, 0), 12),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ]))
-            story.append(table)
+        pdf = route_pdf_cache.get(key)
+        if pdf is not None:
+            # Já gerado: o job nasce concluído, sem ocupar o pool
+            job_id = pdf_job_queue.completed(route_id, filename, pdf)
+        else:
+            # Os processos do pool não têm contexto da aplicação: recebem só dados simples
+            route_data = route_pdf_data(db.session.get(Route, route_id))
+            job_id = pdf_job_queue.submit(route_id, key, filename, render_route_pdf_bytes, route_data, map_image_data)
         
-        # Rodapé
-        story.append(Spacer(1, 30))
-        footer_style = ParagraphStyle(
-            "Footer",
-            parent=styles["Normal"],
-            fontSize=10,
-            alignment=1,
-            textColor=colors.grey
-        )
-        story.append(Paragraph("Gerado pelo Touristeer - Plataforma de Turismo Inteligente", footer_style))
+        response = jsonify(pdf_job_dict(route_id, pdf_job_queue.status(job_id)))
+        response.status_code = 202
+        response.headers["Location"] = pdf_job_url(route_id, job_id)
+        return response
         
-        # Construir PDF
-        doc.build(story)
+    except QueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(PDF_JOB_RETRY_AFTER)
+        return response
+    except Exception as e:
+        logger.exception("Erro ao enfileirar PDF")
+        return jsonify({"error": str(e)}), 500
+
+
+@pdf_export_bp.route("/routes/<int:route_id>/export-pdf/jobs/<job_id>", methods=["GET"])
+def get_pdf_export_job(route_id, job_id):
+    """Status de um job de exportação"""
+    job = pdf_job_queue.status(job_id)
+    if job is None or job["owner"] != str(route_id):
+        return jsonify({"error": "Job não encontrado"}), 404
+    return jsonify(pdf_job_dict(route_id, job)), 200
+
+
+@pdf_export_bp.route("/routes/<int:route_id>/export-pdf/jobs/<job_id>/download", methods=["GET"])
+def download_pdf_export_job(route_id, job_id):
+    """Baixar o PDF gerado por um job concluído"""
+    job = pdf_job_queue.status(job_id)
+    if job is None or job["owner"] != str(route_id):
+        return jsonify({"error": "Job não encontrado"}), 404
+    if job["status"] != DONE:
+        # Ainda pendente (ou falhou): o cliente deve consultar o status
+        return jsonify(pdf_job_dict(route_id, job)), 409
+    
+    pdf = pdf_job_queue.result(job_id)
+    if pdf is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    return send_file(
+        io.BytesIO(pdf),
+        as_attachment=True,
+        download_name=job["filename"],
+        mimetype="application/pdf"
+    )
+
+
+@pdf_export_bp.route("/routes/export-pdf", methods=["POST"])
+def export_routes_book():
+    """Exportar várias rotas em um único PDF (livro da viagem), com sumário"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Corpo deve ser um objeto JSON com route_ids"}), 400
+        route_ids, error = parse_route_ids(data.get("route_ids"))
+        if error:
+            return jsonify({"error": error}), 400
+        title = data.get("title") or ROUTE_BOOK_DEFAULT_TITLE
+        if not isinstance(title, str):
+            return jsonify({"error": "title deve ser um texto"}), 400
         
-        # Limpar arquivo temporário da imagem se existir
-        if 'temp_image_path' in locals() and temp_image_path and os.path.exists(temp_image_path):
-            try:
-                os.unlink(temp_image_path)
-                print(f"Arquivo temporário da imagem removido: {temp_image_path}")
-            except Exception as cleanup_error:
-                print(f"Erro ao remover arquivo temporário da imagem: {cleanup_error}")
+        # Só o necessário para o sumário; os pontos são carregados em lotes durante a geração
+        rows = (db.session.query(Route.id, Route.nome, Route.data_inicio)
+                .filter(Route.id.in_(route_ids))
+                .all())
+        found = {row.id: row for row in rows}
+        missing = [route_id for route_id in route_ids if route_id not in found]
+        if missing:
+            return jsonify({"error": "Rotas não encontradas", "missing": missing}), 404
         
-        # Retornar arquivo
-        response = send_file(
-            temp_filename,
+        buffer = io.BytesIO()
+        render_route_book(title, [found[route_id] for route_id in route_ids], iter_route_pdf_data(route_ids), buffer)
+        buffer.seek(0)
+        return send_file(
+            buffer,
             as_attachment=True,
-            download_name="rota_" + route.nome.replace(" ", "_") + ".pdf",
+            download_name=title.replace(" ", "_") + ".pdf",
             mimetype="application/pdf"
         )
         
-        # Programar limpeza do arquivo PDF temporário após o envio
-        def cleanup():
-            try:
-                if os.path.exists(temp_filename):
-                    os.unlink(temp_filename)
-            except:
-                pass
-        
-        # A limpeza será feita automaticamente pelo Flask após o envio
-        return response
-        
     except Exception as e:
-        # Limpar arquivos temporários em caso de erro
-        if "temp_filename" in locals() and os.path.exists(temp_filename):
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
-        
-        if 'temp_image_path' in locals() and temp_image_path and os.path.exists(temp_image_path):
-            try:
-                os.unlink(temp_image_path)
-            except:
-                pass
-                
-        print(f"Erro ao gerar PDF: {str(e)}")
+        logger.exception("Erro ao gerar livro de rotas")
         return jsonify({"error": str(e)}), 500
 
 
+def parse_route_ids(route_ids):
+    """Valida a lista de ids do livro; retorna (ids sem repetição, na ordem) ou (None, erro)"""
+    if not isinstance(route_ids, list) or not route_ids:
+        return None, "route_ids deve ser uma lista não vazia de ids"
+    if any(isinstance(route_id, bool) or not isinstance(route_id, int) for route_id in route_ids):
+        return None, "route_ids deve conter apenas números inteiros"
+    route_ids = list(dict.fromkeys(route_ids))
+    if len(route_ids) > ROUTE_BOOK_MAX_ROUTES:
+        return None, f"Máximo de {ROUTE_BOOK_MAX_ROUTES} rotas por documento"
+    return route_ids, None
+
+
+def iter_route_pdf_data(route_ids, batch_size=None):
+    """(id, route_pdf_data) das rotas na ordem informada, carregadas do banco em lotes"""
+    batch_size = batch_size or ROUTE_BOOK_BATCH_SIZE
+    for start in range(0, len(route_ids), batch_size):
+        batch = route_ids[start:start + batch_size]
+        routes = {route.id: route for route in Route.query.filter(Route.id.in_(batch))}
+        for route_id in batch:
+            route = routes.get(route_id)
+            if route is None:
+                # Excluída depois da montagem do sumário
+                logger.warning("Rota %s não encontrada ao gerar o livro", route_id)
+                continue
+            yield route_id, route_pdf_data(route)
+
+
+def add_map_image_headers(response, map_image):
+    """Tamanho da imagem do mapa enviada e embutida, e o tempo gasto para prepará-la"""
+    response.headers["X-Map-Image-Input-Bytes"] = str(map_image["input_bytes"])
+    response.headers["X-Map-Image-Output-Bytes"] = str(map_image["output_bytes"])
+    response.headers["X-Map-Image-Format"] = map_image["format"]
+    response.headers["X-Map-Image-Time-Ms"] = f"{map_image['seconds'] * 1000:.1f}"
+
+
+def pdf_job_url(route_id, job_id):
+    return f"/api/routes/{route_id}/export-pdf/jobs/{job_id}"
+
+
+def pdf_job_dict(route_id, job):
+    """Representação de um job na API"""
+    result = {
+        "job_id": job["id"],
+        "route_id": route_id,
+        "status": job["status"],
+        "status_url": pdf_job_url(route_id, job["id"])
+    }
+    if job["status"] == DONE:
+        result["download_url"] = pdf_job_url(route_id, job["id"]) + "/download"
+    elif job["status"] == FAILED:
+        result["error"] = job["error"]
+    return result
+
+
+def uploaded_map_image():
+    """Bytes da imagem do mapa enviada via POST (campo map_image), ou None"""
+    if request.method != "POST" or 'map_image' not in request.files:
+        return None
+    map_file = request.files['map_image']
+    if map_file.filename == '':
+        return None
+    map_image_data = map_file.read()
+    logger.debug("Imagem do mapa recebida: %d bytes", len(map_image_data))
+    return map_image_data
+
+
+def route_pdf_key(route_id, version, updated_at, map_image_data=None):
+    """Chave (e ETag) do PDF: muda com a rota, a imagem do mapa ou o layout"""
+    map_hash = hashlib.sha256(map_image_data).hexdigest() if map_image_data else None
+    raw = json.dumps([PDF_RENDER_VERSION, route_id, version, str(updated_at), map_hash])
+    return route_pdf_prefix(route_id) + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def route_pdf_prefix(route_id):
+    return f"route-{route_id}-"
+
+
+def invalidate_route_pdfs(route_id):
+    """Remove do cache os PDFs de uma rota alterada ou excluída"""
+    removed = route_pdf_cache.delete_prefix(route_pdf_prefix(route_id))
+    if removed:
+        logger.debug("Rota %s: %d PDFs removidos do cache", route_id, removed)
+
+
+def pdf_filename(nome):
+    return "rota_" + nome.replace(" ", "_") + ".pdf"
+
+
+def route_pdf_data(route):
+    """Dados da rota usados no PDF, como tipos simples (serializáveis para outro processo)"""
+    return {
+        "nome": route.nome,
+        "data_inicio": route.data_inicio,
+        "pontos_turisticos": route.get_pontos_turisticos()
+    }
+
+
+def render_route_pdf(route_data, output, map_image_data=None):
+    """Gera o PDF da rota em ``output`` (arquivo ou buffer aberto para escrita binária).
+
+    Retorna os dados da imagem do mapa preparada (ver prepare_map_image), ou
+    None se não foi enviada imagem ou ela é inválida.
+    """
+    map_image = prepared_map_image(map_image_data) if map_image_data else None
+    doc = SimpleDocTemplate(output, pagesize=A4)
+    doc.build(route_story(route_data, map_image))
+    return map_image
+
+
+def render_route_book(title, toc_entries, sections, output):
+    """Gera em ``output`` um PDF com várias rotas, precedidas de um sumário.
+
+    ``toc_entries`` tem (id, nome, data_inicio) de cada rota, na ordem do
+    livro; ``sections`` produz (id, route_data) na mesma ordem e é consumido
+    aos poucos (LazyStory), de modo que só os flowables da rota sendo
+    paginada ficam em memória. O sumário tem links para cada rota, que
+    também aparece no índice lateral (outline) do leitor de PDF.
+    """
+    doc = SimpleDocTemplate(output, pagesize=A4, title=title)
+    numbered = (route_book_section(number, route_id, route_data)
+                for number, (route_id, route_data) in enumerate(sections, 1))
+    story = LazyStory(itertools.chain([route_book_contents(title, toc_entries)], numbered, [pdf_footer()]))
+    doc.build(story, onFirstPage=draw_page_number, onLaterPages=draw_page_number)
+
+
+def route_book_contents(title, toc_entries):
+    """Capa com o sumário do livro: uma linha com link para cada rota"""
+    styles = pdf_styles()
+    story = [
+        Paragraph(escape(title), styles["CustomTitle"]),
+        Paragraph(f"{len(toc_entries)} rotas", styles["Heading3"]),
+        Spacer(1, 10),
+        Paragraph("<b>Sumário</b>", styles["Heading2"]),
+    ]
+    for number, (route_id, nome, data_inicio) in enumerate(toc_entries, 1):
+        story.append(Paragraph(
+            f'<a href="#{route_anchor(route_id)}" color="blue">{number}. {escape(nome)}</a>'
+            f' - {data_inicio.strftime("%d/%m/%Y")}',
+            styles["TocEntry"]
+        ))
+    return story
+
+
+def route_book_section(number, route_id, route_data):
+    """Flowables de uma rota do livro, começando em uma nova página"""
+    return [PageBreak(), RouteBookmark(route_anchor(route_id), f"{number}. {route_data['nome']}")] + \
+        route_section(route_data)
+
+
+def route_anchor(route_id):
+    return f"route-{route_id}"
+
+
+def draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 9)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, str(doc.page))
+    canvas.restoreState()
+
+
+class LazyStory(list):
+    """Story do platypus montada sob demanda a partir de partes (listas de flowables).
+
+    O laço de doc.build consulta len() antes de cada flowable; a próxima
+    parte só é gerada quando a anterior já foi toda paginada.
+    """
+
+    def __init__(self, parts):
+        super().__init__()
+        self._parts = iter(parts)
+
+    def __len__(self):
+        while not super().__len__():
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self.extend(part)
+        return super().__len__()
+
+
+class RouteBookmark(Flowable):
+    """Destino dos links do sumário e entrada do outline, sem ocupar espaço na página"""
+
+    def __init__(self, key, title):
+        super().__init__()
+        self.key = key
+        self.title = title
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=0)
+
+
+def render_route_pdf_bytes(route_data, map_image_data=None):
+    """Gera o PDF e retorna seus bytes; executado nos processos do pool de jobs"""
+    buffer = io.BytesIO()
+    render_route_pdf(route_data, buffer, map_image_data)
+    return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def pdf_styles():
+    """Estilos dos PDFs, criados uma vez e compartilhados por todos os documentos"""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=1  # Center
+    ))
+    styles.add(ParagraphStyle(
+        "Footer",
+        parent=styles["Normal"],
+        fontSize=10,
+        alignment=1,
+        textColor=colors.grey
+    ))
+    styles.add(ParagraphStyle(
+        "TocEntry",
+        parent=styles["Normal"],
+        leftIndent=10,
+        spaceAfter=4
+    ))
+    return styles
+
+
+POINTS_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, 0), 12),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
+
+
+def route_story(route_data, map_image=None):
+    """Elementos (flowables) do PDF de uma rota (dados de route_pdf_data e de prepared_map_image)"""
+    return route_section(route_data, map_image) + pdf_footer()
+
+
+def route_section(route_data, map_image=None):
+    """Título, mapa, data e tabela de pontos de uma rota"""
+    styles = pdf_styles()
+    story = []
+    
+    # Título
+    story.append(Paragraph("Rota: " + escape(route_data["nome"]), styles["CustomTitle"]))
+    story.append(Spacer(1, 20))
+    
+    # Adicionar mapa - priorizar imagem enviada, depois mapa simples
+    pontos = [ponto if isinstance(ponto, dict) else {"id": ponto} for ponto in route_data["pontos_turisticos"]]
+    pontos_com_localizacao = [p for p in pontos if p.get('localizacao')]
+    
+    if map_image is not None:
+        # Usar imagem real do mapa capturada
+        story.append(Paragraph("<b>Mapa da Rota:</b>", styles["Heading3"]))
+        story.append(Spacer(1, 10))
+        story.append(Image(io.BytesIO(map_image["data"]), width=MAP_WIDTH_IN*inch, height=MAP_HEIGHT_IN*inch))
+        story.append(Spacer(1, 20))
+        logger.debug("Mapa real adicionado ao PDF com sucesso")
+    else:
+        # Mapa simples como fallback
+        try:
+            map_drawing = create_simple_map(pontos_com_localizacao)
+            story.append(Paragraph("<b>Mapa da Rota (Simples):</b>", styles["Heading3"]))
+            story.append(Spacer(1, 10))
+            story.append(map_drawing)
+            story.append(Spacer(1, 20))
+        except Exception as map_error:
+            logger.warning("Erro ao criar mapa simples: %s", map_error)
+            # Continuar sem o mapa
+    
+    # Informações da rota
+    info_style = styles["Normal"]
+    story.append(Paragraph("<b>Data de Início:</b> " + route_data["data_inicio"].strftime("%d/%m/%Y às %H:%M"), info_style))
+    story.append(Spacer(1, 10))
+    
+    # Pontos turísticos
+    if pontos:
+        story.append(Paragraph("<b>Pontos Turísticos:</b>", styles["Heading2"]))
+        story.append(Spacer(1, 10))
+        
+        # Criar tabela com pontos
+        data = [["#", "Nome", "Descrição"]]
+        for i, ponto in enumerate(pontos, 1):
+            nome = ponto.get("nome") or "N/A"
+            descricao = ponto.get("descricao") or "N/A"
+            # Limitar descrição para caber na tabela
+            if len(descricao) > 100:
+                descricao = descricao[:97] + "..."
+            data.append([str(i), nome, descricao])
+        
+        table = Table(data, colWidths=[0.5*inch, 2*inch, 3.5*inch])
+        table.setStyle(POINTS_TABLE_STYLE)
+        story.append(table)
+    return story
+
+
+def pdf_footer():
+    """Rodapé ao final do documento"""
+    return [
+        Spacer(1, 30),
+        Paragraph("Gerado pelo Touristeer - Plataforma de Turismo Inteligente", pdf_styles()["Footer"])
+    ]
+
+
+def prepared_map_image(map_image_data):
+    """Imagem do mapa reduzida e recomprimida para a área do mapa, ou None se inválida"""
+    try:
+        # Imagem corrompida cai no mapa simples
+        map_image = prepare_map_image(map_image_data, MAP_WIDTH_IN, MAP_HEIGHT_IN)
+    except ValueError as map_error:
+        logger.warning("Erro ao processar imagem do mapa: %s", map_error)
+        return None
+    logger.debug("Imagem do mapa: %d -> %d bytes (%s) em %.1f ms", map_image["input_bytes"],
+                 map_image["output_bytes"], map_image["format"], map_image["seconds"] * 1000)
+    return map_image
+
+
 def create_simple_map(pontos):
     """Criar um mapa simples usando reportlab"""
     try:
@@ -301,7 +621,7 @@ def create_simple_map(pontos):
         return drawing
         
     except Exception as e:
-        print(f"Erro ao criar mapa simples: {e}")
+        logger.warning("Erro ao criar mapa simples: %s", e)
         # Retornar drawing vazio em caso de erro
         return Drawing(6 * inch, 4 * inch)
 
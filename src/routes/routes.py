@@ -1,114 +1,395 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, g, has_app_context, stream_with_context
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from sqlalchemy import delete, func, insert, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import lazyload, load_only
 from src.models.user import db, User
 from src.models.route import Route
+from src.models.route_point import RoutePoint
+from src.models.tourist_spot import TouristSpot
+from src.routes.pdf_export import invalidate_route_pdfs
+import base64
+import binascii
+import bisect
 import json
-import requests
+import logging
 import math
-import traceback
+import os
+from src.services.cache import MISSING, TTLCache, register_cache
+from src.services.distance_matrix import distance_matrix, leg_distances
+from src.services.geo import bounding_box, haversine_km
+from src.services.http_caching import make_etag, not_modified, with_validators
+from src.services.http_client import get_client
+from src.services.logging_config import log_payload
+from src.services.route_summary import estimated_minutes, summarize_points
+from src.services.route_optimizer import DEFAULT_TIME_BUDGET_MS, EXACT_MAX_POINTS, OPTIMIZERS, optimize_order
+from src.services.tourist_spot_catalog import catalog
 
 routes_bp = Blueprint('routes', __name__)
+logger = logging.getLogger(__name__)
+
+# Limite de pontos turísticos por rota
+MAX_ROUTE_POINTS = int(os.environ.get('MAX_ROUTE_POINTS', 5))
+
+# Paginação da listagem de rotas
+ROUTES_PAGE_SIZE = int(os.environ.get('ROUTES_PAGE_SIZE', 100))
+ROUTES_MAX_PAGE_SIZE = 500
+
+# Rotas são dados do usuário: sem cache compartilhado e sempre revalidadas (ETag)
+ROUTES_CACHE_CONTROL = 'private, no-cache'
+
+# Busca de rotas próximas (?lat=&lng=&radius=), em km
+ROUTES_NEAR_DEFAULT_RADIUS_KM = 10
+ROUTES_NEAR_MAX_RADIUS_KM = 500
+
+# Tempo máximo (ms) de busca local que o cliente pode pedir na otimização
+OPTIMIZE_MAX_TIME_BUDGET_MS = int(os.environ.get('OPTIMIZE_MAX_TIME_BUDGET_MS', 2000))
+
+# Importação/exportação em lote
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 500))
+BULK_MAX_REPORTED_ERRORS = 1000
+EXPORT_BATCH_SIZE = 500
+
+# Servidor OSRM e perfil de roteamento
+OSRM_URL = os.environ.get('OSRM_URL', "http://router.project-osrm.org")
+OSRM_PROFILE = 'driving'
+
+# Casas decimais das coordenadas nas chaves de cache (~1 m)
+OSRM_CACHE_PRECISION = 5
+
+# Cache de rotas completas e de trechos individuais do OSRM (em memória)
+osrm_route_cache = register_cache(TTLCache(
+    'osrm_routes',
+    ttl=int(os.environ.get('OSRM_CACHE_TTL', 6 * 3600)),
+    max_entries=int(os.environ.get('OSRM_ROUTE_CACHE_SIZE', 512))
+))
+osrm_leg_cache = register_cache(TTLCache(
+    'osrm_legs',
+    ttl=int(os.environ.get('OSRM_CACHE_TTL', 6 * 3600)),
+    max_entries=int(os.environ.get('OSRM_LEG_CACHE_SIZE', 4096))
+))
 
 @routes_bp.route('/routes', methods=['POST'])
 def create_route():
     """Criar uma nova rota turística"""
     try:
-        print('--- [DEBUG] Recebido POST /api/routes ---')
-        print('Headers:', dict(request.headers))
-        print('Raw data:', request.get_data(as_text=True))
-        try:
-            data = request.get_json(force=True)
-            print('JSON decodificado:', data)
-        except Exception as json_err:
-            print('Erro ao decodificar JSON:', json_err)
-            raise
+        data = request.get_json(force=True)
+        log_payload(logger, 'POST /routes payload', lambda: request.get_data(as_text=True))
         
-        for key in ['nome', 'data_inicio', 'pontos_turisticos', 'user_id']:
-            print(f"Campo '{key}':", data.get(key))
+        nova_rota, error = build_route(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        # Validações básicas
-        if not data.get('nome'):
-            return jsonify({'error': 'Nome da rota é obrigatório'}), 400
+        db.session.add(nova_rota)
+        db.session.commit()
         
-        if not data.get('data_inicio'):
-            return jsonify({'error': 'Data de início é obrigatória'}), 400
+        return jsonify({'message': 'Rota criada com sucesso!'}), 201
         
-        pontos_turisticos = data.get('pontos_turisticos', [])
-        if len(pontos_turisticos) > 5:
-            return jsonify({'error': 'Máximo de 5 pontos turísticos por rota'}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Erro ao criar rota')
+        return jsonify({'error': str(e)}), 500
+
+def parse_iso_datetime(value):
+    """Data ISO 8601 como datetime sem fuso.
+
+    Datas com fuso ("Z", "-03:00") são convertidas para UTC, como created_at
+    e updated_at, e podem ser comparadas com as demais. ValueError (ou
+    AttributeError, se não for texto) quando o formato é inválido.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def build_route(data, default_user_id=1):
+    """Validar os dados de uma rota e montar o objeto Route (sem salvar).
+
+    Retorna (rota, None) ou (None, mensagem de erro). Usado pela criação
+    individual e pela importação em lote, com as mesmas regras.
+    """
+    if not isinstance(data, dict):
+        return None, 'Rota deve ser um objeto JSON'
+    
+    # Validações básicas
+    if not data.get('nome'):
+        return None, 'Nome da rota é obrigatório'
+    
+    if not data.get('data_inicio'):
+        return None, 'Data de início é obrigatória'
+    
+    pontos_turisticos = data.get('pontos_turisticos', [])
+    if not isinstance(pontos_turisticos, list):
+        return None, 'pontos_turisticos deve ser uma lista'
+    if len(pontos_turisticos) > MAX_ROUTE_POINTS:
+        return None, f'Máximo de {MAX_ROUTE_POINTS} pontos turísticos por rota'
+    
+    # Converter string de data para datetime e validar
+    try:
+        data_inicio = parse_iso_datetime(data['data_inicio'])
+    except (AttributeError, ValueError):
+        return None, 'Formato de data inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)'
+    
+    # Validar se data de início é futura
+    now = datetime.now()
+    if data_inicio <= now:
+        return None, 'Data de início deve ser futura'
+    
+    # Validar data de fim se fornecida
+    if data.get('data_fim'):
+        try:
+            data_fim = parse_iso_datetime(data['data_fim'])
+        except (AttributeError, ValueError):
+            return None, 'Formato de data de fim inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)'
+        
+        # Validar se data de fim é posterior à data de início
+        if data_fim <= data_inicio:
+            return None, 'Data de fim deve ser posterior à data de início'
+    
+    # Criar nova rota
+    nova_rota = Route(
+        nome=data['nome'],
+        data_inicio=data_inicio,
+        user_id=data.get('user_id', default_user_id)  # Default user para MVP
+    )
+    nova_rota.set_pontos_turisticos(pontos_turisticos)
+    return nova_rota, None
+
+@routes_bp.route('/routes', methods=['GET'])
+def get_routes():
+    """Listar rotas do usuário com paginação por cursor e projeção de campos.
+
+    Parâmetros: ``limit`` (padrão ROUTES_PAGE_SIZE), ``cursor`` (cabeçalho
+    X-Next-Cursor da página anterior), ``fields`` (ex.: ``id,nome``) e
+    ``spot_id``. Com ``lat``/``lng`` (e ``radius`` em km, padrão
+    ROUTES_NEAR_DEFAULT_RADIUS_KM) lista apenas as rotas com algum ponto
+    dentro do raio, da mais próxima para a mais distante, com
+    ``distance_km`` em cada item. O total vem no cabeçalho X-Total-Count.
+    """
+    try:
+        user_id = request.args.get('user_id', 1)  # Default user para MVP
+        spot_id = request.args.get('spot_id')
         
-        # Converter string de data para datetime e validar
         try:
-            data_inicio = datetime.fromisoformat(data['data_inicio'].replace('Z', '+00:00'))
+            limit = int(request.args.get('limit', ROUTES_PAGE_SIZE))
         except ValueError:
-            return jsonify({'error': 'Formato de data inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)'}), 400
+            return jsonify({'error': 'limit deve ser um número inteiro'}), 400
+        if limit < 1 or limit > ROUTES_MAX_PAGE_SIZE:
+            return jsonify({'error': f'limit deve estar entre 1 e {ROUTES_MAX_PAGE_SIZE}'}), 400
         
-        # Validar se data de início é futura
-        now = datetime.now()
-        if data_inicio <= now:
-            return jsonify({'error': 'Data de início deve ser futura'}), 400
+        fields = None
+        if request.args.get('fields'):
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            invalid = [field for field in fields if field not in Route.FIELDS]
+            if invalid:
+                return jsonify({'error': f"Campos inválidos: {', '.join(invalid)}. Use: {', '.join(Route.FIELDS)}"}), 400
         
-        # Validar data de fim se fornecida
-        data_fim = None
-        if data.get('data_fim'):
+        near = None
+        if any(name in request.args for name in ('lat', 'lng', 'radius')):
             try:
-                data_fim = datetime.fromisoformat(data['data_fim'].replace('Z', '+00:00'))
+                near = parse_near_args(request.args)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        query = Route.containing_spot(spot_id) if spot_id else Route.query
+        query = query.filter_by(user_id=user_id)
+        
+        # Validador da listagem: total e última alteração das rotas do filtro
+        # (um único passe por ix_route_user_updated_at), mais os parâmetros da página
+        total, last_updated = query.with_entities(func.count(Route.id), func.max(Route.updated_at)).one()
+        etag = make_etag('routes', sorted(request.args.items(multi=True)), total, last_updated)
+        cached = not_modified(etag, ROUTES_CACHE_CONTROL)
+        if cached:
+            return cached
+        
+        distances = None
+        if near:
+            try:
+                page, total, next_cursor = near_routes_page(query, *near, request.args.get('cursor'), limit)
             except ValueError:
-                return jsonify({'error': 'Formato de data de fim inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)'}), 400
+                return jsonify({'error': 'Cursor inválido'}), 400
+            distances = {route_id: distance for distance, route_id in page}
+            loaded = project_route_fields(Route.query.filter(Route.id.in_(list(distances))), fields).all()
+            by_id = {route.id: route for route in loaded}
+            routes = [by_id[route_id] for _, route_id in page if route_id in by_id]
+        else:
+            if request.args.get('cursor'):
+                try:
+                    cursor_created_at, cursor_id = decode_route_cursor(request.args['cursor'])
+                except ValueError:
+                    return jsonify({'error': 'Cursor inválido'}), 400
+                query = query.filter(tuple_(Route.created_at, Route.id) > (cursor_created_at, cursor_id))
             
-            # Validar se data de fim é posterior à data de início
-            if data_fim <= data_inicio:
-                return jsonify({'error': 'Data de fim deve ser posterior à data de início'}), 400
-        
-        # Criar nova rota
-        nova_rota = Route(
-            nome=data['nome'],
-            data_inicio=data_inicio,
-            pontos_turisticos=json.dumps(pontos_turisticos),
-            user_id=data.get('user_id', 1)  # Default user para MVP
-        )
+            query = project_route_fields(query.order_by(Route.created_at, Route.id), fields)
+            
+            # Um item a mais indica se existe próxima página
+            routes = query.limit(limit + 1).all()
+            next_cursor = None
+            if len(routes) > limit:
+                routes = routes[:limit]
+                next_cursor = encode_route_cursor(routes[-1])
         
-        db.session.add(nova_rota)
-        db.session.commit()
+        headers = {'X-Total-Count': str(total)}
+        if next_cursor:
+            headers['X-Next-Cursor'] = next_cursor
+            next_args = request.args.to_dict()
+            next_args['cursor'] = next_cursor
+            headers['Link'] = f'<{request.base_url}?{urlencode(next_args)}>; rel="next"'
         
-        return jsonify({'message': 'Rota criada com sucesso!'}), 201
+        def serialize(route):
+            item = route.to_dict(fields)
+            if distances is not None:
+                item['distance_km'] = round(distances[route.id], 3)
+            return json.dumps(item)
         
-    except Exception as e:
-        print('--- [ERRO 500] ---')
-        print('Payload recebido:', request.get_data(as_text=True))
-        print('Traceback completo:')
-        traceback.print_exc()
-        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
-
-@routes_bp.route('/routes', methods=['GET'])
-def get_routes():
-    """Listar todas as rotas com filtros opcionais"""
-    try:
-        user_id = request.args.get('user_id', 1)  # Default user para MVP
-        
-        routes = Route.query.filter_by(user_id=user_id).all()
+        def generate():
+            # Serializa rota a rota em vez de montar uma única lista em memória
+            yield '['
+            for i, route in enumerate(routes):
+                yield (',' if i else '') + serialize(route)
+            yield ']'
         
-        return jsonify([route.to_dict() for route in routes]), 200
+        response = Response(stream_with_context(generate()), status=200,
+                            mimetype='application/json', headers=headers)
+        return with_validators(response, etag, ROUTES_CACHE_CONTROL)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def project_route_fields(query, fields):
+    """Carregar só as colunas pedidas (id/created_at sempre, para o cursor)"""
+    if fields is None:
+        return query
+    columns = {'id', 'created_at'} | Route.columns_for(fields)
+    query = query.options(load_only(*[getattr(Route, column) for column in sorted(columns)]))
+    if 'pontos_turisticos' not in fields:
+        query = query.options(lazyload(Route.points))
+    return query
+
+def parse_near_args(args):
+    """(lat, lng, radius_km) da busca por proximidade; ValueError se inválidos"""
+    if 'lat' not in args or 'lng' not in args:
+        raise ValueError('Informe lat e lng para buscar rotas próximas')
+    try:
+        lat = float(args['lat'])
+        lng = float(args['lng'])
+        radius = float(args.get('radius', ROUTES_NEAR_DEFAULT_RADIUS_KM))
+    except ValueError:
+        raise ValueError('lat, lng e radius devem ser numéricos')
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Coordenadas fora do intervalo válido')
+    if not 0 < radius <= ROUTES_NEAR_MAX_RADIUS_KM:
+        raise ValueError(f'radius deve estar entre 0 e {ROUTES_NEAR_MAX_RADIUS_KM} km')
+    return lat, lng, radius
+
+def near_routes_page(query, lat, lng, radius_km, cursor, limit):
+    """Página da busca por proximidade: ([(distância, id)], total, próximo cursor).
+
+    O cursor é a posição (distância, id) do último item; ValueError se inválido.
+    """
+    ranked = rank_routes_by_distance(query, lat, lng, radius_km)
+    total = len(ranked)
+    if cursor:
+        try:
+            cursor_distance, cursor_id = decode_cursor(cursor)
+            position = (float(cursor_distance), int(cursor_id))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'Cursor inválido: {cursor}') from e
+        ranked = ranked[bisect.bisect_right(ranked, position):]
+
+    page = ranked[:limit]
+    next_cursor = encode_cursor(list(page[-1])) if len(ranked) > limit else None
+    return page, total, next_cursor
+
+def rank_routes_by_distance(query, lat, lng, radius_km):
+    """(distância, id) das rotas da consulta com algum ponto a até radius_km, em ordem crescente.
+
+    O SQL só devolve os pontos das rotas cuja caixa envolvente intersecta a
+    caixa do círculo (ix_route_bbox); a distância exata (Haversine) até o
+    ponto mais próximo de cada rota é calculada aqui.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    candidates = (query.filter(Route.intersecting_box(min_lat, max_lat, min_lng, max_lng))
+                  .with_entities(Route.id)
+                  .order_by(None))
+    points = (db.session.query(RoutePoint.route_id, RoutePoint.latitude, RoutePoint.longitude)
+              .filter(RoutePoint.route_id.in_(candidates.scalar_subquery()),
+                      RoutePoint.latitude.isnot(None),
+                      RoutePoint.longitude.isnot(None)))
+
+    nearest = {}
+    for route_id, point_lat, point_lng in points.yield_per(1000):
+        distance = haversine_km(lat, lng, point_lat, point_lng)
+        if distance <= radius_km and distance < nearest.get(route_id, math.inf):
+            nearest[route_id] = distance
+    return sorted((distance, route_id) for route_id, distance in nearest.items())
+
+def encode_cursor(values):
+    """Cursor opaco (base64 de uma lista JSON) com a posição do último item da página"""
+    raw = json.dumps(values).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverso de encode_cursor; ValueError se o cursor for inválido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+
+def encode_route_cursor(route):
+    """Cursor opaco com a posição (created_at, id) da última rota da página"""
+    created_at = route.created_at.isoformat() if route.created_at else ''
+    return encode_cursor([created_at, route.id])
+
+def decode_route_cursor(cursor):
+    """Inverso de encode_route_cursor; ValueError se o cursor for inválido"""
+    try:
+        created_at, route_id = decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(route_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+
 @routes_bp.route('/routes/<int:route_id>', methods=['GET'])
 def get_route(route_id):
-    """Obter uma rota específica"""
+    """Obter uma rota específica (ETag pela versão; 304 com If-None-Match)"""
     try:
-        route = Route.query.get_or_404(route_id)
-        return jsonify(route.to_dict()), 200
+        # Revalidação só com a chave primária e a versão, sem carregar os pontos
+        version = db.session.query(Route.version).filter_by(id=route_id).scalar()
+        if version is None:
+            return jsonify({'error': 'Rota não encontrada'}), 404
+        etag = route_etag(route_id, version)
+        cached = not_modified(etag, ROUTES_CACHE_CONTROL)
+        if cached:
+            return cached
+        
+        route = db.session.get(Route, route_id)
+        return with_validators(jsonify(route.to_dict()), etag, ROUTES_CACHE_CONTROL), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @routes_bp.route('/routes/<int:route_id>', methods=['PUT'])
 def update_route(route_id):
-    """Atualizar uma rota existente"""
+    """Atualizar uma rota existente.
+
+    Com ``If-Match`` (ETag do GET) ou ``version`` no corpo, a escrita só é
+    aplicada se a rota não mudou desde a leitura; caso contrário, 409.
+    """
     try:
-        route = Route.query.get_or_404(route_id)
         data = request.get_json()
+        try:
+            expected_version = requested_route_version(route_id, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        route = db.session.get(Route, route_id)
+        if route is None:
+            return jsonify({'error': 'Rota não encontrada'}), 404
+        if expected_version is not None and expected_version != route.version:
+            return route_conflict(route.version)
         
         # Atualizar campos se fornecidos
         if 'nome' in data:
@@ -116,25 +397,157 @@ def update_route(route_id):
         
         if 'data_inicio' in data:
             try:
-                route.data_inicio = datetime.fromisoformat(data['data_inicio'].replace('Z', '+00:00'))
-            except ValueError:
+                route.data_inicio = parse_iso_datetime(data['data_inicio'])
+            except (AttributeError, ValueError):
                 return jsonify({'error': 'Formato de data inválido. Use ISO format'}), 400
         
         if 'pontos_turisticos' in data:
             pontos_turisticos = data['pontos_turisticos']
-            if len(pontos_turisticos) > 5:
-                return jsonify({'error': 'Máximo de 5 pontos turísticos por rota'}), 400
-            route.pontos_turisticos = json.dumps(pontos_turisticos)
+            if len(pontos_turisticos) > MAX_ROUTE_POINTS:
+                return jsonify({'error': f'Máximo de {MAX_ROUTE_POINTS} pontos turísticos por rota'}), 400
+            route.set_pontos_turisticos(pontos_turisticos)
         
         route.updated_at = datetime.utcnow()
+        try:
+            # O UPDATE leva "WHERE version = <lida>": outra escrita no meio do caminho falha aqui
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return route_conflict(db.session.query(Route.version).filter_by(id=route_id).scalar())
+        
+        invalidate_route_pdfs(route_id)
+        etag = route_etag(route.id, route.version)
+        return with_validators(jsonify(route.to_dict()), etag, ROUTES_CACHE_CONTROL), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@routes_bp.route('/routes/<int:route_id>', methods=['PATCH'])
+def patch_route(route_id):
+    """Atualização parcial (nome, data_inicio e/ou pontos_turisticos).
+
+    Um único UPDATE condicionado à versão, sem carregar a rota nem seus
+    pontos; os pontos, se enviados, substituem os anteriores em route_points.
+    Aceita If-Match/version como o PUT e devolve a nova versão. Não usa
+    UPDATE ... RETURNING (SQLite < 3.35, MySQL): a linha alterada é conferida
+    pelo rowcount e, sem versão esperada, a nova versão é lida na mesma transação.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Corpo deve ser um objeto JSON'}), 400
+        try:
+            expected_version = requested_route_version(route_id, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        values, pontos_turisticos, error = route_patch_values(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        changed = sorted(values) + (['pontos_turisticos'] if pontos_turisticos is not None else [])
+        if pontos_turisticos is not None:
+            values['pontos_turisticos'] = '[]'
+            values.update(summarize_points(pontos_turisticos))
+        values['updated_at'] = datetime.utcnow()
+        values['version'] = Route.version + 1
+        
+        statement = update(Route).where(Route.id == route_id)
+        if expected_version is not None:
+            statement = statement.where(Route.version == expected_version)
+        result = db.session.execute(
+            statement.values(**values),
+            execution_options={'synchronize_session': False}
+        )
+        if result.rowcount == 0:
+            db.session.rollback()
+            current_version = db.session.query(Route.version).filter_by(id=route_id).scalar()
+            if current_version is None:
+                return jsonify({'error': 'Rota não encontrada'}), 404
+            return route_conflict(current_version)
+        if expected_version is not None:
+            new_version = expected_version + 1
+        else:
+            # A linha já está bloqueada por este UPDATE: lê a versão que ele gravou
+            new_version = db.session.query(Route.version).filter_by(id=route_id).scalar()
+        
+        if pontos_turisticos is not None:
+            db.session.execute(delete(RoutePoint).where(RoutePoint.route_id == route_id))
+            if pontos_turisticos:
+                db.session.execute(insert(RoutePoint), [
+                    RoutePoint.row_values(route_id, position, ponto)
+                    for position, ponto in enumerate(pontos_turisticos)
+                ])
         db.session.commit()
+        invalidate_route_pdfs(route_id)
         
-        return jsonify(route.to_dict()), 200
+        body = {'id': route_id, 'version': new_version, 'updated_at': values['updated_at'].isoformat(),
+                'updated_fields': changed}
+        return with_validators(jsonify(body), route_etag(route_id, new_version), ROUTES_CACHE_CONTROL), 200
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Erro ao atualizar rota')
         return jsonify({'error': str(e)}), 500
 
+def route_patch_values(data):
+    """Valida o corpo do PATCH: (colunas escalares, pontos ou None, erro ou None)"""
+    values = {}
+    if 'nome' in data:
+        if not isinstance(data['nome'], str) or not data['nome'].strip():
+            return None, None, 'Nome da rota é obrigatório'
+        values['nome'] = data['nome']
+    
+    if 'data_inicio' in data:
+        try:
+            values['data_inicio'] = parse_iso_datetime(data['data_inicio'])
+        except (AttributeError, ValueError):
+            return None, None, 'Formato de data inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)'
+    
+    pontos_turisticos = None
+    if 'pontos_turisticos' in data:
+        pontos_turisticos = data['pontos_turisticos']
+        if not isinstance(pontos_turisticos, list):
+            return None, None, 'pontos_turisticos deve ser uma lista'
+        if len(pontos_turisticos) > MAX_ROUTE_POINTS:
+            return None, None, f'Máximo de {MAX_ROUTE_POINTS} pontos turísticos por rota'
+    
+    if not values and pontos_turisticos is None:
+        return None, None, 'Nenhum campo para atualizar. Use: nome, data_inicio, pontos_turisticos'
+    return values, pontos_turisticos, None
+
+def route_etag(route_id, version):
+    """ETag forte de uma rota: muda a cada escrita (coluna version)"""
+    return f'route-{route_id}-v{version}'
+
+def requested_route_version(route_id, data):
+    """Versão esperada pelo cliente (If-Match ou campo ``version``) ou None.
+
+    ValueError se o If-Match não corresponder a nenhuma versão desta rota.
+    """
+    if request.if_match:
+        if request.if_match.star_tag:
+            return None
+        prefix = f'route-{route_id}-v'
+        for tag in request.if_match.as_set():
+            if tag.startswith(prefix) and tag[len(prefix):].isdigit():
+                return int(tag[len(prefix):])
+        raise ValueError('If-Match não corresponde a esta rota')
+    if isinstance(data, dict) and data.get('version') is not None:
+        try:
+            return int(data['version'])
+        except (TypeError, ValueError):
+            raise ValueError('version deve ser um número inteiro')
+    return None
+
+def route_conflict(current_version):
+    """Resposta 409: a rota mudou desde que o cliente a leu"""
+    return jsonify({
+        'error': 'A rota foi alterada por outra requisição. Recarregue e tente novamente.',
+        'version': current_version
+    }), 409
+
 @routes_bp.route('/routes/<int:route_id>', methods=['DELETE'])
 def delete_route(route_id):
     """Deletar uma rota"""
@@ -142,6 +555,7 @@ def delete_route(route_id):
         route = Route.query.get_or_404(route_id)
         db.session.delete(route)
         db.session.commit()
+        invalidate_route_pdfs(route_id)
         
         return jsonify({'message': 'Rota deletada com sucesso'}), 200
         
@@ -149,6 +563,104 @@ def delete_route(route_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@routes_bp.route('/routes/bulk', methods=['POST'])
+def bulk_import_routes():
+    """Importar rotas em lote a partir de NDJSON (uma rota JSON por linha).
+
+    Cada linha passa pelas mesmas validações de POST /routes; as válidas são
+    gravadas em transações de até BULK_BATCH_SIZE rotas. A resposta informa,
+    por número de linha, as rotas que falharam.
+    """
+    try:
+        default_user_id = request.args.get('user_id', 1, type=int)
+        report = {'created': 0, 'failed': 0, 'errors': []}
+        batch = []
+        
+        def fail(line_number, error):
+            report['failed'] += 1
+            if len(report['errors']) < BULK_MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': line_number, 'error': error})
+        
+        # Lê o corpo linha a linha, sem carregar o arquivo inteiro
+        for line_number, raw_line in enumerate(request.stream, start=1):
+            line = raw_line.decode('utf-8', errors='replace').strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                fail(line_number, f'JSON inválido: {e}')
+                continue
+            route, error = build_route(data, default_user_id)
+            if error:
+                fail(line_number, error)
+                continue
+            batch.append((line_number, route))
+            if len(batch) >= BULK_BATCH_SIZE:
+                save_route_batch(batch, report, fail)
+                batch = []
+        
+        if batch:
+            save_route_batch(batch, report, fail)
+        
+        if not report['created'] and not report['failed']:
+            return jsonify({'error': 'Nenhuma rota enviada. Envie NDJSON (uma rota por linha)'}), 400
+        
+        report['errors_truncated'] = report['failed'] > len(report['errors'])
+        return jsonify(report), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def save_route_batch(batch, report, fail):
+    """Gravar um lote de rotas em uma transação.
+
+    Se o commit falhar, grava linha a linha (savepoints) para identificar
+    quais rotas do lote causaram o erro.
+    """
+    try:
+        db.session.add_all([route for _, route in batch])
+        db.session.commit()
+        report['created'] += len(batch)
+        return
+    except SQLAlchemyError:
+        db.session.rollback()
+    
+    for line_number, route in batch:
+        try:
+            with db.session.begin_nested():
+                db.session.add(route)
+            report['created'] += 1
+        except SQLAlchemyError as e:
+            fail(line_number, f'Erro ao gravar rota: {e.__class__.__name__}')
+    db.session.commit()
+
+@routes_bp.route('/routes/export', methods=['GET'])
+def export_routes():
+    """Exportar todas as rotas do usuário como NDJSON, em streaming"""
+    user_id = request.args.get('user_id', 1, type=int)
+    
+    def generate():
+        # Páginas por id; cada página é descartada da sessão após ser enviada
+        last_id = 0
+        while True:
+            page = (Route.query
+                    .filter(Route.user_id == user_id, Route.id > last_id)
+                    .order_by(Route.id)
+                    .limit(EXPORT_BATCH_SIZE)
+                    .all())
+            if not page:
+                break
+            for route in page:
+                yield json.dumps(route.to_dict()) + '\n'
+            last_id = page[-1].id
+            db.session.expunge_all()
+    
+    headers = {'Content-Disposition': f'attachment; filename=rotas_usuario_{user_id}.ndjson'}
+    return Response(stream_with_context(generate()), status=200,
+                    mimetype='application/x-ndjson', headers=headers)
+
 @routes_bp.route('/routes/<int:route_id>/optimize', methods=['POST'])
 def optimize_route(route_id):
     """Otimizar a ordem dos pontos turísticos em uma rota"""
@@ -159,22 +671,58 @@ def optimize_route(route_id):
         if len(pontos) < 2:
             return jsonify({'error': 'Rota precisa ter pelo menos 2 pontos'}), 400
         
-        # Calcular melhor sequência usando algoritmo simples (distância euclidiana)
-        optimized_order = optimize_points_order(pontos)
+        # Opções da otimização (todas opcionais)
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Opções devem ser um objeto JSON'}), 400
+        strategy = data.get('strategy', 'auto')
+        if not isinstance(strategy, str) or (strategy != 'auto' and strategy not in OPTIMIZERS):
+            return jsonify({'error': f"Estratégia inválida. Use: auto, {', '.join(OPTIMIZERS)}"}), 400
+        if strategy == 'exact' and len(pontos) > EXACT_MAX_POINTS:
+            return jsonify({'error': f'Estratégia exata aceita no máximo {EXACT_MAX_POINTS} pontos'}), 400
+        try:
+            time_budget_ms = float(data.get('time_budget_ms', DEFAULT_TIME_BUDGET_MS))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'time_budget_ms deve ser numérico'}), 400
+        if not math.isfinite(time_budget_ms):
+            return jsonify({'error': 'time_budget_ms deve ser um número finito'}), 400
+        time_budget_ms = min(max(time_budget_ms, 0), OPTIMIZE_MAX_TIME_BUDGET_MS)
+        try:
+            flags = {name: bool_option(data, name, default)
+                     for name, default in (('fixed_start', True), ('fixed_end', False), ('closed', False))}
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Calcular melhor sequência (exata para poucos pontos, busca local acima disso)
+        optimized_order, optimization, legs = optimize_points(
+            pontos,
+            strategy=strategy,
+            time_budget_ms=time_budget_ms,
+            **flags
+        )
         
         # Calcular dados da rota otimizada
-        route_data = calculate_route_data(optimized_order)
+        route_data = calculate_route_data(optimized_order, legs)
         
         return jsonify({
             'optimized_order': optimized_order,
             'route_data': route_data,
             'total_distance': route_data['total_distance'],
-            'estimated_time': route_data['estimated_time']
+            'estimated_time': route_data['estimated_time'],
+            'optimization': optimization,
+            'unresolved_ids': optimization['unresolved_ids']
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def bool_option(data, name, default):
+    """Opção booleana do corpo JSON; só aceita true/false (a string "false" não vira True)"""
+    value = data.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f'{name} deve ser true ou false')
+    return value
+
 @routes_bp.route('/calculate-route', methods=['POST'])
 def calculate_route():
     """Calcular rota entre pontos turísticos selecionados"""
@@ -185,11 +733,11 @@ def calculate_route():
         if len(points) < 2:
             return jsonify({'error': 'Pelo menos 2 pontos são necessários'}), 400
         
-        # Otimizar ordem dos pontos
-        optimized_points = optimize_points_order(points)
+        # Otimizar ordem dos pontos (IDs não encontrados ficam de fora)
+        optimized_points, optimization, legs = optimize_points(points)
         
-        # Calcular dados da rota
-        route_data = calculate_route_data(optimized_points)
+        # Calcular dados da rota (trechos já medidos na matriz da otimização)
+        route_data = calculate_route_data(optimized_points, legs)
         
         # Obter direções detalhadas (usando OpenRouteService ou similar)
         directions = get_route_directions(optimized_points)
@@ -200,11 +748,12 @@ def calculate_route():
             'directions': directions,
             'total_distance': route_data['total_distance'],
             'estimated_time': route_data['estimated_time'],
-            'polyline': route_data.get('polyline', '')
+            'polyline': route_data.get('polyline', ''),
+            'unresolved_ids': optimization['unresolved_ids']
         }), 200
         
     except Exception as e:
-        print(f"Erro no cálculo da rota: {e}")
+        logger.exception('Erro no cálculo da rota')
         return jsonify({'error': str(e)}), 500
 
 # === FUNÇÕES PARA ROTAS REAIS ===
@@ -232,84 +781,156 @@ def calculate_real_route():
             return jsonify(fallback_data), 200
         
     except Exception as e:
-        print(f"Erro no cálculo da rota real: {e}")
+        logger.exception('Erro no cálculo da rota real')
         return jsonify({'error': str(e)}), 500
 
 def calculate_real_route_data(points):
-    """Calcular rota real usando OSRM (Open Source Routing Machine)"""
+    """Calcular rota real usando OSRM (Open Source Routing Machine), com cache"""
     try:
-        # Extrair coordenadas dos pontos
+        # Extrair coordenadas dos pontos (OSRM usa [lng, lat])
         coordinates = []
         for point in points:
             if isinstance(point, dict):
                 if 'localizacao' in point:
                     lat = point['localizacao']['latitude']
                     lng = point['localizacao']['longitude']
-                    coordinates.append([lng, lat])  # OSRM usa [lng, lat]
+                    coordinates.append(round_coordinate(lng, lat))
                 elif 'lat' in point and 'lng' in point:
-                    coordinates.append([point['lng'], point['lat']])
+                    coordinates.append(round_coordinate(point['lng'], point['lat']))
         
         if len(coordinates) < 2:
             return None
         
-        # Construir URL da API OSRM
-        coords_str = ';'.join([f"{coord[0]},{coord[1]}" for coord in coordinates])
-        osrm_url = f"http://router.project-osrm.org/route/v1/driving/{coords_str}"
+        # Rota completa já calculada para a mesma sequência de coordenadas
+        route_key = osrm_cache_key(OSRM_PROFILE, coordinates)
+        cached = osrm_route_cache.get(route_key)
+        if cached is not MISSING:
+            result = dict(cached)
+            result['optimized_points'] = points
+            result['cache'] = 'hit'
+            return result
         
-        params = {
-            'overview': 'full',
-            'geometries': 'geojson',
-            'steps': 'true'
-        }
+        legs = get_osrm_legs(coordinates)
+        if legs is None:
+            return None
         
-        # Fazer requisição para OSRM
-        response = requests.get(osrm_url, params=params, timeout=10)
+        # Montar a rota a partir dos trechos
+        geometry_coordinates = []
+        detailed_instructions = []
+        total_distance = 0
+        total_duration = 0
+        for leg in legs:
+            total_distance += leg['distance']
+            total_duration += leg['duration']
+            extend_line(geometry_coordinates, leg['coordinates'])
+            detailed_instructions.extend(leg['instructions'])
         
-        if response.status_code == 200:
-            osrm_data = response.json()
-            
-            if osrm_data.get('code') == 'Ok' and osrm_data.get('routes'):
-                route = osrm_data['routes'][0]
-                
-                # Extrair informações da rota
-                total_distance = route['distance'] / 1000  # metros para km
-                total_duration = route['duration'] / 60     # segundos para minutos
-                
-                # Extrair geometria da rota (polyline)
-                geometry = route['geometry']
-                
-                # Extrair instruções detalhadas
-                legs = route.get('legs', [])
-                detailed_instructions = []
-                
-                for leg in legs:
-                    steps = leg.get('steps', [])
-                    for step in steps:
-                        instruction = step.get('maneuver', {}).get('instruction', 'Continue')
-                        step_distance = step.get('distance', 0) / 1000
-                        step_duration = step.get('duration', 0) / 60
-                        
-                        detailed_instructions.append({
-                            'instruction': instruction,
-                            'distance': round(step_distance, 2),
-                            'duration': round(step_duration, 1)
-                        })
-                
-                return {
-                    'type': 'real',
-                    'total_distance': round(total_distance, 2),
-                    'estimated_time': round(total_duration),
-                    'geometry': geometry,
-                    'instructions': detailed_instructions,
-                    'optimized_points': points,
-                    'source': 'OSRM'
-                }
+        result = {
+            'type': 'real',
+            'total_distance': round(total_distance / 1000, 2),  # metros para km
+            'estimated_time': round(total_duration / 60),       # segundos para minutos
+            'geometry': {'type': 'LineString', 'coordinates': geometry_coordinates},
+            'instructions': detailed_instructions,
+            'source': 'OSRM'
+        }
+        osrm_route_cache.set(route_key, result)
         
-        return None
+        result = dict(result)
+        result['optimized_points'] = points
+        result['cache'] = 'miss'
+        return result
         
     except Exception as e:
-        print(f"Erro ao calcular rota real: {e}")
+        logger.warning('Erro ao calcular rota real: %s', e)
+        return None
+
+def round_coordinate(lng, lat):
+    """Arredondar [lng, lat] para a precisão usada nas chaves de cache (~1 m)"""
+    return [round(float(lng), OSRM_CACHE_PRECISION), round(float(lat), OSRM_CACHE_PRECISION)]
+
+def osrm_cache_key(profile, coordinates):
+    return profile + ':' + ';'.join(f"{lng},{lat}" for lng, lat in coordinates)
+
+def get_osrm_legs(coordinates, timeout=None):
+    """Obter os trechos (legs) entre coordenadas consecutivas.
+    
+    Trechos já calculados vêm do cache; cada sequência contígua de trechos
+    faltantes é pedida ao OSRM em uma única requisição. Retorna None se o
+    OSRM não conseguir calcular algum trecho.
+    """
+    legs = [osrm_leg_cache.get(osrm_cache_key(OSRM_PROFILE, coordinates[i:i + 2]))
+            for i in range(len(coordinates) - 1)]
+    
+    i = 0
+    while i < len(legs):
+        if legs[i] is not MISSING:
+            i += 1
+            continue
+        # Sequência contígua de trechos faltantes: [i, j)
+        j = i
+        while j < len(legs) and legs[j] is MISSING:
+            j += 1
+        fetched = fetch_osrm_legs(coordinates[i:j + 1], timeout)
+        if fetched is None or len(fetched) != j - i:
+            return None
+        for offset, leg in enumerate(fetched):
+            osrm_leg_cache.set(osrm_cache_key(OSRM_PROFILE, coordinates[i + offset:i + offset + 2]), leg)
+            legs[i + offset] = leg
+        i = j
+    
+    return legs
+
+def fetch_osrm_legs(coordinates, timeout=None):
+    """Consultar o OSRM e retornar os trechos com geometria e instruções"""
+    coords_str = ';'.join(f"{lng},{lat}" for lng, lat in coordinates)
+    osrm_url = f"{OSRM_URL}/route/v1/{OSRM_PROFILE}/{coords_str}"
+    
+    # A geometria de cada trecho é montada a partir dos passos (steps)
+    params = {
+        'overview': 'false',
+        'geometries': 'geojson',
+        'steps': 'true'
+    }
+    
+    kwargs = {'params': params}
+    if timeout is not None:
+        kwargs['timeout'] = timeout
+    response = get_client('osrm').get(osrm_url, **kwargs)
+    
+    if response.status_code != 200:
+        return None
+    
+    osrm_data = response.json()
+    if osrm_data.get('code') != 'Ok' or not osrm_data.get('routes'):
         return None
+    
+    legs = []
+    for leg in osrm_data['routes'][0].get('legs', []):
+        leg_coordinates = []
+        instructions = []
+        for step in leg.get('steps', []):
+            extend_line(leg_coordinates, step.get('geometry', {}).get('coordinates', []))
+            
+            instruction = step.get('maneuver', {}).get('instruction', 'Continue')
+            instructions.append({
+                'instruction': instruction,
+                'distance': round(step.get('distance', 0) / 1000, 2),
+                'duration': round(step.get('duration', 0) / 60, 1)
+            })
+        
+        legs.append({
+            'distance': leg.get('distance', 0),  # metros
+            'duration': leg.get('duration', 0),  # segundos
+            'coordinates': leg_coordinates,
+            'instructions': instructions
+        })
+    return legs
+
+def extend_line(line, coordinates):
+    """Anexar coordenadas a uma linha sem repetir pontos consecutivos iguais"""
+    for coordinate in coordinates:
+        if not line or line[-1] != coordinate:
+            line.append(coordinate)
 
 def get_real_directions_between_points(point1, point2):
     """Obter direções reais entre dois pontos específicos"""
@@ -325,55 +946,74 @@ def get_real_directions_between_points(point1, point2):
         else:
             return None
         
-        # URL da API OSRM para dois pontos
-        osrm_url = f"http://router.project-osrm.org/route/v1/driving/{lng1},{lat1};{lng2},{lat2}"
-        
-        params = {
-            'steps': 'true',
-            'geometries': 'geojson'
-        }
-        
-        response = requests.get(osrm_url, params=params, timeout=5)
+        # Trecho único entre os dois pontos (compartilha o cache de trechos)
+        legs = get_osrm_legs([round_coordinate(lng1, lat1), round_coordinate(lng2, lat2)], timeout=5)
+        if not legs:
+            return None
+        leg = legs[0]
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            if data.get('code') == 'Ok' and data.get('routes'):
-                route = data['routes'][0]
-                leg = route['legs'][0]
-                
-                distance = route['distance'] / 1000  # km
-                duration = route['duration'] / 60     # minutos
-                
-                # Extrair primeira instrução
-                steps = leg.get('steps', [])
-                first_instruction = "Siga em frente"
-                if steps and len(steps) > 0:
-                    maneuver = steps[0].get('maneuver', {})
-                    first_instruction = maneuver.get('instruction', 'Siga em frente')
-                
-                return {
-                    'distance': round(distance, 2),
-                    'duration': round(duration),
-                    'instruction': first_instruction,
-                    'geometry': route.get('geometry', {})
-                }
+        # Extrair primeira instrução
+        first_instruction = "Siga em frente"
+        if leg['instructions']:
+            first_instruction = leg['instructions'][0]['instruction']
         
-        return None
+        return {
+            'distance': round(leg['distance'] / 1000, 2),  # km
+            'duration': round(leg['duration'] / 60),       # minutos
+            'instruction': first_instruction,
+            'geometry': {'type': 'LineString', 'coordinates': leg['coordinates']}
+        }
         
     except Exception as e:
-        print(f"Erro ao obter direções: {e}")
+        logger.warning('Erro ao obter direções: %s', e)
         return None
 
 # === FIM DAS FUNÇÕES PARA ROTAS REAIS ===
 
-def optimize_points_order(points):
-    """Otimizar ordem dos pontos usando algoritmo do vizinho mais próximo"""
-    if len(points) <= 2:
-        return points
+def optimize_points_order(points, **options):
+    """Otimizar ordem dos pontos (mantém o primeiro ponto como início)"""
+    optimized, _, _ = optimize_points(points, **options)
+    return optimized
+
+def optimize_points(points, fixed_start=True, fixed_end=False, closed=False,
+                    strategy='auto', time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+    """Otimizar ordem dos pontos; retorna (pontos ordenados, estatísticas, trechos).
+
+    IDs que não correspondem a nenhum ponto turístico ficam fora da rota e
+    são informados em ``unresolved_ids`` nas estatísticas. ``trechos`` são as
+    distâncias entre pontos consecutivos da ordem final, lidas da matriz usada
+    na otimização (None quando não há matriz), para calculate_route_data.
+    """
+    coords, unresolved = extract_point_coordinates(points)
+    
+    if len(coords) <= 2:
+        return [coord['original'] for coord in coords], {'unresolved_ids': unresolved}, None
+    
+    # Matriz de distâncias Haversine compartilhada (calculada de uma vez)
+    matrix = distance_matrix([(coord['lat'], coord['lng']) for coord in coords])
+    
+    order, stats = optimize_order(
+        matrix,
+        fixed_start=fixed_start,
+        fixed_end=fixed_end,
+        closed=closed,
+        strategy=strategy,
+        time_budget_ms=time_budget_ms
+    )
+    stats['unresolved_ids'] = unresolved
+    legs = [float(matrix[i, j]) for i, j in zip(order, order[1:])]
+    return [coords[i]['original'] for i in order], stats, legs
+
+def extract_point_coordinates(points):
+    """Converter pontos para formato consistente (id, nome, lat, lng, original).
+
+    Pontos informados apenas pelo ID são resolvidos em lote. Retorna a lista
+    convertida e os IDs não encontrados.
+    """
+    spots = resolve_spot_ids([point for point in points if isinstance(point, (int, str))])
     
-    # Converter pontos para formato consistente
     coords = []
+    unresolved = []
     for point in points:
         if isinstance(point, dict):
             if 'localizacao' in point:
@@ -393,96 +1033,89 @@ def optimize_points_order(points):
                     'original': point
                 })
         elif isinstance(point, (int, str)):
-            # Se for apenas ID, buscar dados do ponto na base de dados
-            from ..models.tourist_spot import TouristSpot
-            try:
-                spot = TouristSpot.query.get(point)
-                if spot:
-                    spot_dict = spot.to_dict()
-                    coords.append({
-                        'id': spot_dict.get('id'),
-                        'nome': spot_dict.get('nome', f'Ponto {point}'),
-                        'lat': spot_dict.get('localizacao', {}).get('latitude', 0),
-                        'lng': spot_dict.get('localizacao', {}).get('longitude', 0),
-                        'original': spot_dict
-                    })
-                else:
-                    # Ponto não encontrado, usar coordenadas padrão
-                    coords.append({
-                        'id': point,
-                        'nome': f'Ponto {point}',
-                        'lat': -15.7801,  # Brasília como padrão
-                        'lng': -47.9292,
-                        'original': {'id': point, 'nome': f'Ponto {point}'}
-                    })
-            except Exception as e:
-                print(f"Erro ao buscar ponto {point}: {e}")
-                coords.append({
-                    'id': point,
-                    'nome': f'Ponto {point}',
-                    'lat': -15.7801,  # Brasília como padrão
-                    'lng': -47.9292,
-                    'original': {'id': point, 'nome': f'Ponto {point}'}
-                })
-        else:
-            print(f"Tipo de ponto não reconhecido: {type(point)} - {point}")
+            spot_dict = spots.get(point)
+            localizacao = (spot_dict or {}).get('localizacao') or {}
+            if 'latitude' not in localizacao or 'longitude' not in localizacao:
+                unresolved.append(point)
+                continue
             coords.append({
-                'id': 'unknown',
-                'nome': 'Ponto Desconhecido',
-                'lat': -15.7801,
-                'lng': -47.9292,
-                'original': point
+                'id': spot_dict.get('id'),
+                'nome': spot_dict.get('nome', f'Ponto {point}'),
+                'lat': localizacao['latitude'],
+                'lng': localizacao['longitude'],
+                'original': spot_dict
             })
+        else:
+            logger.warning('Tipo de ponto não reconhecido: %s - %r', type(point).__name__, point)
+            unresolved.append(point)
     
-    if len(coords) <= 2:
-        return [coord['original'] for coord in coords]
+    return coords, unresolved
+
+def spot_lookup_key(point_id):
+    """Normalizar o ID (\"3\" e 3 são o mesmo ponto)"""
+    if isinstance(point_id, str) and point_id.strip().isdigit():
+        return int(point_id)
+    return point_id
+
+def spot_identity_map():
+    """Mapa de identidade dos pontos já resolvidos na requisição atual"""
+    if not has_app_context():
+        return {}
+    if 'spot_identity_map' not in g:
+        g.spot_identity_map = {}
+    return g.spot_identity_map
+
+def resolve_spot_ids(point_ids):
+    """Resolver IDs de pontos turísticos de uma só vez.
+
+    Usa o mapa de identidade da requisição, depois uma única consulta
+    ``IN`` na tabela de pontos turísticos e, para o que faltar, o catálogo
+    em memória. Retorna ``{id informado: ponto}`` apenas para os encontrados.
+    """
+    identity_map = spot_identity_map()
+    keys = {point_id: spot_lookup_key(point_id) for point_id in point_ids}
+    missing = {key for key in keys.values() if key not in identity_map}
     
-    # Algoritmo do vizinho mais próximo (TSP simplificado)
-    unvisited = coords[1:]  # Excluir primeiro ponto
-    route = [coords[0]]     # Começar do primeiro ponto
+    numeric = sorted(key for key in missing if isinstance(key, int))
+    if numeric and has_app_context():
+        try:
+            for spot in TouristSpot.query.filter(TouristSpot.id.in_(numeric)).all():
+                identity_map[spot.id] = spot.to_dict()
+        except SQLAlchemyError as e:
+            logger.error('Erro ao buscar pontos turísticos %s: %s', numeric, e)
     
-    while unvisited:
-        current = route[-1]
-        nearest_idx = 0
-        nearest_dist = float('inf')
-        
-        for i, point in enumerate(unvisited):
-            dist = calculate_distance(current['lat'], current['lng'], point['lat'], point['lng'])
-            if dist < nearest_dist:
-                nearest_dist = dist
-                nearest_idx = i
-        
-        route.append(unvisited.pop(nearest_idx))
+    for key in missing:
+        if key not in identity_map:
+            spot = catalog.get(key)
+            if spot is not None:
+                identity_map[key] = spot
     
-    return [point['original'] for point in route]
+    return {point_id: identity_map[key] for point_id, key in keys.items() if key in identity_map}
 
-def calculate_distance(lat1, lng1, lat2, lng2):
-    """Calcular distância euclidiana simples entre dois pontos"""
-    import math
-    return math.sqrt((lat2 - lat1)**2 + (lng2 - lng1)**2)
+def calculate_route_data(points, legs=None):
+    """Calcular dados da rota (distância total, tempo estimado).
 
-def calculate_route_data(points):
-    """Calcular dados da rota (distância total, tempo estimado)"""
+    ``legs`` são as distâncias entre pontos consecutivos já conhecidas (por
+    exemplo, as de optimize_points); sem elas, só os N-1 trechos são calculados.
+    """
     total_distance = 0
     route_segments = []
     
+    if legs is None and len(points) > 1:
+        # Extrair coordenadas
+        coordinates = []
+        for point in points:
+            if isinstance(point, dict) and 'localizacao' in point:
+                coordinates.append((point['localizacao']['latitude'], point['localizacao']['longitude']))
+            else:
+                coordinates.append((0, 0))
+        legs = leg_distances(coordinates)
+    
     for i in range(len(points) - 1):
         current = points[i]
         next_point = points[i + 1]
         
-        # Extrair coordenadas
-        if isinstance(current, dict) and 'localizacao' in current:
-            lat1, lng1 = current['localizacao']['latitude'], current['localizacao']['longitude']
-        else:
-            lat1, lng1 = 0, 0
-            
-        if isinstance(next_point, dict) and 'localizacao' in next_point:
-            lat2, lng2 = next_point['localizacao']['latitude'], next_point['localizacao']['longitude']
-        else:
-            lat2, lng2 = 0, 0
-        
-        # Calcular distância aproximada (fórmula de Haversine simplificada)
-        segment_distance = haversine_distance(lat1, lng1, lat2, lng2)
+        segment_distance = float(legs[i])
         total_distance += segment_distance
         
         route_segments.append({
@@ -491,34 +1124,12 @@ def calculate_route_data(points):
             'distance': segment_distance
         })
     
-    # Tempo estimado (assumindo 50 km/h média)
-    estimated_time_hours = total_distance / 50
-    estimated_time_minutes = int(estimated_time_hours * 60)
-    
     return {
         'total_distance': round(total_distance, 2),
-        'estimated_time': estimated_time_minutes,
+        'estimated_time': estimated_minutes(total_distance),  # 50 km/h média
         'segments': route_segments
     }
 
-def haversine_distance(lat1, lng1, lat2, lng2):
-    """Calcular distância real entre dois pontos usando fórmula de Haversine"""
-    import math
-    
-    # Converter para radianos
-    lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
-    
-    # Fórmula de Haversine
-    dlat = lat2 - lat1
-    dlng = lng2 - lng1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    # Raio da Terra em quilômetros
-    r = 6371
-    
-    return c * r
-
 def get_route_directions(points):
     """Obter direções detalhadas entre pontos (placeholder para integração futura)"""
     # Aqui você pode integrar com APIs como:
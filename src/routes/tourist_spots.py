@@ -1,64 +1,100 @@
 from flask import Blueprint, request, jsonify
 import json
+import logging
 import os
 import requests
 from urllib.parse import quote
 import math
+import hashlib
+from src.services.cache import DEFAULT_CACHE_DB_PATH, MISSING, TTLCache, register_cache
+from src.services.http_caching import make_etag, not_modified, with_validators
+from src.services.http_client import get_client
+from src.services.text_index import fold_text
+from src.services.tourist_spot_catalog import catalog
 
 tourist_spots_bp = Blueprint('tourist_spots', __name__)
+logger = logging.getLogger(__name__)
+
+# O catálogo é público e muda raramente: CDN e navegador podem guardá-lo por alguns minutos
+TOURIST_SPOTS_MAX_AGE = int(os.environ.get('TOURIST_SPOTS_MAX_AGE', 300))
+TOURIST_SPOTS_CACHE_CONTROL = f'public, max-age={TOURIST_SPOTS_MAX_AGE}'
+
+# URL da API Nominatim (configurável para testes/instâncias próprias)
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', "https://nominatim.openstreetmap.org/search")
+
+# Cache dos resultados já filtrados do Nominatim (LRU em memória + SQLite)
+nominatim_cache = register_cache(TTLCache(
+    'nominatim',
+    ttl=int(os.environ.get('NOMINATIM_CACHE_TTL', 24 * 3600)),
+    negative_ttl=int(os.environ.get('NOMINATIM_CACHE_NEGATIVE_TTL', 5 * 60)),
+    max_entries=int(os.environ.get('NOMINATIM_CACHE_SIZE', 1024)),
+    db_path=os.environ.get('NOMINATIM_CACHE_DB', DEFAULT_CACHE_DB_PATH) or None
+))
+
+# URL da API Overpass
+OVERPASS_URL = os.environ.get('OVERPASS_URL', "https://overpass-api.de/api/interpreter")
+
+# Tamanho do tile (graus) usado para agrupar consultas ao Overpass (~28 km)
+OVERPASS_TILE_SIZE_DEG = 0.25
+
+# Cache de tiles do Overpass por conjunto de categorias
+overpass_tile_cache = register_cache(TTLCache(
+    'overpass_tiles',
+    ttl=int(os.environ.get('OVERPASS_TILE_TTL', 24 * 3600)),
+    max_entries=int(os.environ.get('OVERPASS_TILE_CACHE_SIZE', 4096)),
+    db_path=os.environ.get('OVERPASS_TILE_CACHE_DB', DEFAULT_CACHE_DB_PATH) or None
+))
 
 def load_tourist_spots():
-    """Carrega pontos turísticos do arquivo JSON estático"""
-    try:
-        # Caminho para o arquivo na raiz do projeto
-        json_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'tourist_spots.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Se o arquivo contém uma lista diretamente, retorna ela
-            if isinstance(data, list):
-                return data
-            # Se contém um objeto com chave "tourist_spots", extrai a lista
-            elif isinstance(data, dict) and 'tourist_spots' in data:
-                return data['tourist_spots']
-            else:
-                return data
-    except Exception as e:
-        print(f"Erro ao carregar pontos turísticos: {e}")
-        return []
+    """Retorna os pontos turísticos do catálogo em memória"""
+    return catalog.get_all()
 
 @tourist_spots_bp.route('/tourist-spots', methods=['GET'])
 def get_tourist_spots():
     """Listar todos os pontos turísticos com filtros opcionais"""
     try:
-        spots = load_tourist_spots()
+        # ETag pela versão do catálogo e pelos filtros
+        etag = make_etag('tourist-spots', catalog.version(), sorted(request.args.items(multi=True)))
+        cached = not_modified(etag, TOURIST_SPOTS_CACHE_CONTROL)
+        if cached:
+            return cached
         
-        # Filtro por nome (busca parcial)
-        search = request.args.get('search', '').lower()
-        if search:
-            spots = [spot for spot in spots if search in spot['nome'].lower()]
+        # Filtro por nome (busca por termos, sem acentos e por prefixo)
+        search = request.args.get('search', '').strip()
+        matched = catalog.search(search, fields=('nome',)) if search else None
+        matched_ids = {id(spot) for spot in matched} if search else None
+        
+        def matches_search(spot):
+            return id(spot) in matched_ids
         
         # Filtro por proximidade (latitude, longitude, raio em km)
         lat = request.args.get('lat', type=float)
         lng = request.args.get('lng', type=float)
-        radius = request.args.get('radius', type=float, default=10.0)
+        radius = request.args.get('radius', type=float)
+        # Consulta dos k pontos mais próximos
+        k = request.args.get('k', type=int)
         
         if lat is not None and lng is not None:
-            filtered_spots = []
-            for spot in spots:
-                spot_lat = spot['localizacao']['latitude']
-                spot_lng = spot['localizacao']['longitude']
-                
-                # Cálculo simples de distância (aproximado)
-                distance = ((lat - spot_lat) ** 2 + (lng - spot_lng) ** 2) ** 0.5 * 111  # ~111km por grau
-                
-                if distance <= radius:
-                    spot_with_distance = spot.copy()
-                    spot_with_distance['distance'] = round(distance, 2)
-                    filtered_spots.append(spot_with_distance)
+            predicate = matches_search if search else None
+            if k is not None:
+                nearby = catalog.nearest(lat, lng, k, max_radius_km=radius, predicate=predicate)
+            else:
+                radius = 10.0 if radius is None else radius
+                nearby = catalog.within_radius(lat, lng, radius, predicate=predicate)
             
-            spots = sorted(filtered_spots, key=lambda x: x['distance'])
+            # Resultados já vêm ordenados por distância pelo índice espacial
+            spots = []
+            for distance, spot in nearby:
+                spot_with_distance = spot.copy()
+                spot_with_distance['distance'] = round(distance, 2)
+                spots.append(spot_with_distance)
+        elif search:
+            # Resultados ordenados por relevância
+            spots = matched
+        else:
+            spots = load_tourist_spots()
         
-        return jsonify(spots), 200
+        return with_validators(jsonify(spots), etag, TOURIST_SPOTS_CACHE_CONTROL), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -67,17 +103,35 @@ def get_tourist_spots():
 def get_tourist_spot(spot_id):
     """Obter um ponto turístico específico"""
     try:
-        spots = load_tourist_spots()
-        spot = next((s for s in spots if s['id'] == spot_id), None)
+        etag = make_etag('tourist-spot', catalog.version(), spot_id)
+        cached = not_modified(etag, TOURIST_SPOTS_CACHE_CONTROL)
+        if cached:
+            return cached
+        
+        spot = catalog.get(spot_id)
         
         if not spot:
             return jsonify({'error': 'Ponto turístico não encontrado'}), 404
         
-        return jsonify(spot), 200
+        return with_validators(jsonify(spot), etag, TOURIST_SPOTS_CACHE_CONTROL), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tourist_spots_bp.route('/tourist-spots/reload', methods=['POST'])
+def reload_tourist_spots():
+    """Forçar a releitura do catálogo de pontos turísticos"""
+    try:
+        return jsonify(catalog.reload()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@tourist_spots_bp.route('/tourist-spots/stats', methods=['GET'])
+def tourist_spots_stats():
+    """Contadores de acesso e recarga do catálogo"""
+    return jsonify(catalog.stats()), 200
+
 @tourist_spots_bp.route('/search-places', methods=['GET'])
 def search_places():
     """Buscar pontos turísticos via API externa (Nominatim/OpenStreetMap)"""
@@ -87,12 +141,7 @@ def search_places():
             return jsonify({'error': 'Parâmetro de busca obrigatório'}), 400
             
         # Buscar primeiro nos pontos locais
-        local_spots = load_tourist_spots()
-        local_results = [
-            spot for spot in local_spots 
-            if query.lower() in spot['nome'].lower() or 
-               (spot.get('descricao', '') and query.lower() in spot['descricao'].lower())
-        ]
+        local_results = catalog.search(query)
         
         # Buscar via API externa (Nominatim)
         external_results = search_nominatim(query)
@@ -111,97 +160,113 @@ def search_places():
         return jsonify(unique_results), 200
         
     except Exception as e:
-        print(f"Erro na busca de lugares: {e}")
+        logger.exception('Erro na busca de lugares')
         return jsonify({'error': str(e)}), 500
 
 def search_nominatim(query):
-    """Buscar lugares usando a API do Nominatim (OpenStreetMap)"""
+    """Buscar lugares usando a API do Nominatim (OpenStreetMap), com cache"""
+    # Parâmetros da busca
+    params = {
+        'q': query,
+        'format': 'json',
+        'limit': 20,  # Aumentar limite
+        'addressdetails': 1,
+        'extratags': 1,
+        'namedetails': 1,
+        'accept-language': 'pt-BR,pt,en'
+    }
+    
+    cache_key = nominatim_cache_key(params)
+    cached = nominatim_cache.get(cache_key)
+    if cached is not MISSING:
+        return list(cached)
+    
     try:
-        # URL da API Nominatim
-        base_url = "https://nominatim.openstreetmap.org/search"
-        
-        # Parâmetros da busca
-        params = {
-            'q': query,
-            'format': 'json',
-            'limit': 20,  # Aumentar limite
-            'addressdetails': 1,
-            'extratags': 1,
-            'namedetails': 1,
-            'accept-language': 'pt-BR,pt,en'
-        }
-        
-        # Headers para identificar a aplicação
-        headers = {
-            'User-Agent': 'TouristRoutes/1.0 (contact@example.com)'
-        }
+        results = fetch_nominatim(params)
+    except requests.RequestException as e:
+        logger.warning('Erro na API Nominatim: %s', e)
+        results = []
+    except Exception as e:
+        logger.exception('Erro no processamento Nominatim')
+        results = []
+    
+    # Buscas vazias ou com falha ficam em cache negativo (TTL mais curto)
+    nominatim_cache.set(cache_key, results, negative=not results)
+    return results
+
+def nominatim_cache_key(params):
+    """Chave do cache: consulta normalizada (sem acentos/espaços extras) + parâmetros"""
+    normalized = dict(params)
+    normalized['q'] = ' '.join(fold_text(params.get('q', '')).split())
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+def fetch_nominatim(params):
+    """Consultar a API do Nominatim e converter os resultados turísticos"""
+    query = params['q']
+    # Headers para identificar a aplicação
+    headers = {
+        'User-Agent': 'TouristRoutes/1.0 (contact@example.com)'
+    }
+    
+    # Fazer requisição
+    response = get_client('nominatim').get(NOMINATIM_URL, params=params, headers=headers)
+    response.raise_for_status()
+    
+    data = response.json()
+    logger.debug("Nominatim retornou %d resultados para '%s'", len(data), query)
+    
+    # Converter para formato esperado
+    results = []
+    for item in data:
+        # Ser mais inclusivo nos tipos de lugares
+        place_type = item.get('type', '').lower()
+        category = item.get('category', '').lower()
+        class_type = item.get('class', '').lower()
         
-        # Fazer requisição
-        response = requests.get(base_url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
+        # Aceitar mais tipos de lugares
+        accepted_types = ['tourism', 'attraction', 'monument', 'museum', 'park', 'lake', 'water', 
+                         'natural', 'leisure', 'historic', 'memorial', 'viewpoint', 'beach']
+        accepted_categories = ['tourism', 'amenity', 'leisure', 'natural', 'historic', 'place']
         
-        data = response.json()
-        print(f"Nominatim retornou {len(data)} resultados para '{query}'")
+        is_tourist_place = (
+            any(keyword in place_type for keyword in accepted_types) or
+            any(keyword in category for keyword in accepted_categories) or
+            any(keyword in class_type for keyword in accepted_types) or
+            'tourism' in str(item.get('extratags', {})).lower() or
+            item.get('importance', 0) > 0.3  # Lugares com alta importância
+        )
         
-        # Converter para formato esperado
-        results = []
-        for item in data:
-            # Ser mais inclusivo nos tipos de lugares
-            place_type = item.get('type', '').lower()
-            category = item.get('category', '').lower()
-            class_type = item.get('class', '').lower()
+        if is_tourist_place:
+            # Extrair informações
+            display_name = item.get('display_name', '')
+            name_parts = display_name.split(',')
+            name = name_parts[0].strip()  # Primeiro parte do nome
             
-            # Aceitar mais tipos de lugares
-            accepted_types = ['tourism', 'attraction', 'monument', 'museum', 'park', 'lake', 'water', 
-                             'natural', 'leisure', 'historic', 'memorial', 'viewpoint', 'beach']
-            accepted_categories = ['tourism', 'amenity', 'leisure', 'natural', 'historic', 'place']
+            # Melhorar a descrição
+            description = f"📍 {display_name}"
+            if place_type:
+                description = f"{place_type.title()} - {description}"
             
-            is_tourist_place = (
-                any(keyword in place_type for keyword in accepted_types) or
-                any(keyword in category for keyword in accepted_categories) or
-                any(keyword in class_type for keyword in accepted_types) or
-                'tourism' in str(item.get('extratags', {})).lower() or
-                item.get('importance', 0) > 0.3  # Lugares com alta importância
-            )
-            
-            if is_tourist_place:
-                # Extrair informações
-                display_name = item.get('display_name', '')
-                name_parts = display_name.split(',')
-                name = name_parts[0].strip()  # Primeiro parte do nome
-                
-                # Melhorar a descrição
-                description = f"📍 {display_name}"
-                if place_type:
-                    description = f"{place_type.title()} - {description}"
-                
-                spot = {
-                    'id': f"ext_{item.get('place_id', '')}",  # ID externo
-                    'nome': name,
-                    'descricao': description,
-                    'localizacao': {
-                        'latitude': float(item.get('lat', 0)),
-                        'longitude': float(item.get('lon', 0))
-                    },
-                    'endereco': display_name,
-                    'categoria': place_type.title() or category.title() or 'Ponto de Interesse',
-                    'source': 'nominatim',
-                    'importance': item.get('importance', 0)
-                }
-                results.append(spot)
-        
-        # Ordenar por importância
-        results.sort(key=lambda x: x.get('importance', 0), reverse=True)
-        
-        print(f"Filtrados {len(results)} pontos turísticos")
-        return results[:10]  # Retornar apenas os 10 melhores
-        
-    except requests.RequestException as e:
-        print(f"Erro na API Nominatim: {e}")
-        return []
-    except Exception as e:
-        print(f"Erro no processamento Nominatim: {e}")
-        return []
+            spot = {
+                'id': f"ext_{item.get('place_id', '')}",  # ID externo
+                'nome': name,
+                'descricao': description,
+                'localizacao': {
+                    'latitude': float(item.get('lat', 0)),
+                    'longitude': float(item.get('lon', 0))
+                },
+                'endereco': display_name,
+                'categoria': place_type.title() or category.title() or 'Ponto de Interesse',
+                'source': 'nominatim',
+                'importance': item.get('importance', 0)
+            }
+            results.append(spot)
+    
+    # Ordenar por importância
+    results.sort(key=lambda x: x.get('importance', 0), reverse=True)
+    
+    logger.debug('Filtrados %d pontos turísticos', len(results))
+    return results[:10]  # Retornar apenas os 10 melhores
 
 @tourist_spots_bp.route('/search-nearby-spots', methods=['POST'])
 def search_nearby_spots():
@@ -216,185 +281,261 @@ def search_nearby_spots():
         
         if not latitude or not longitude:
             return jsonify({'error': 'Latitude e longitude são obrigatórios'}), 400
-            
-        # Construir consulta Overpass QL
+        
         # Converter raio de km para graus (aproximado: 1 grau ≈ 111 km)
         radius_deg = radius / 111.0
+        radius_deg_lng = radius_deg / max(math.cos(math.radians(latitude)), 0.01)
         
-        # Construir filtros por categoria
-        category_filters = []
-        for category in categories:
-            if category == 'tourism':
-                category_filters.extend([
-                    'tourism=attraction',
-                    'tourism=museum',
-                    'tourism=viewpoint',
-                    'tourism=monument',
-                    'tourism=artwork',
-                    'tourism=gallery',
-                    'tourism=information',
-                    'tourism=theme_park'
-                ])
-            elif category == 'historic':
-                category_filters.extend([
-                    'historic=monument',
-                    'historic=memorial',
-                    'historic=castle',
-                    'historic=ruins',
-                    'historic=archaeological_site',
-                    'historic=building'
-                ])
-            elif category == 'natural':
-                category_filters.extend([
-                    'natural=peak',
-                    'natural=waterfall',
-                    'natural=beach',
-                    'natural=cave_entrance'
-                ])
-            elif category == 'park':
-                category_filters.extend([
-                    'leisure=park',
-                    'leisure=nature_reserve',
-                    'tourism=zoo'
-                ])
-            else:
-                category_filters.append(f'{category}=*')
-        
-        # Construir query Overpass
-        bbox = f"{latitude - radius_deg},{longitude - radius_deg},{latitude + radius_deg},{longitude + radius_deg}"
+        # Tiles fixos que cobrem a área de busca
+        tiles = tiles_for_bbox(latitude - radius_deg, longitude - radius_deg_lng,
+                               latitude + radius_deg, longitude + radius_deg_lng)
+        categories_key = ','.join(sorted(set(categories)))
         
-        # Query para nós (points)
-        node_queries = []
-        for filter_item in category_filters:
-            node_queries.append(f'node[{filter_item}]({bbox});')
+        logger.debug('Buscando pontos próximos: lat=%s, lng=%s, radius=%skm, categorias=%s',
+                     latitude, longitude, radius, categories)
         
-        # Query para ways (áreas)
-        way_queries = []
-        for filter_item in category_filters:
-            way_queries.append(f'way[{filter_item}]({bbox});')
-        
-        overpass_query = f"""
-        [out:json][timeout:25];
-        (
-          {''.join(node_queries)}
-          {''.join(way_queries)}
-        );
-        out center meta;
-        """
-        
-        print(f"🌐 Buscando pontos próximos: lat={latitude}, lng={longitude}, radius={radius}km")
-        print(f"📋 Categorias: {categories}")
+        # Reaproveitar tiles já consultados; buscar apenas os que faltam
+        elements_by_tile = {}
+        missing_tiles = []
+        for tile in tiles:
+            cached = overpass_tile_cache.get(overpass_tile_key(tile, categories_key))
+            if cached is MISSING:
+                missing_tiles.append(tile)
+            else:
+                elements_by_tile[tile] = cached
         
-        # Fazer requisição para API Overpass
-        overpass_url = "https://overpass-api.de/api/interpreter"
+        logger.debug('Tiles: %d no total, %d a buscar', len(tiles), len(missing_tiles))
         
-        try:
-            response = requests.post(
-                overpass_url, 
-                data=overpass_query, 
-                timeout=30,
-                headers={'Content-Type': 'text/plain; charset=utf-8'}
-            )
+        if missing_tiles:
+            try:
+                fetched = fetch_overpass_tiles(missing_tiles, build_category_filters(categories))
+            except requests.exceptions.Timeout:
+                logger.warning('Timeout na API Overpass')
+                return jsonify({'error': 'Timeout na busca de pontos'}), 408
+            except requests.exceptions.RequestException as e:
+                logger.warning('Erro de rede na API Overpass: %s', e)
+                return jsonify({'error': 'Erro de conexão com API externa'}), 503
             
-            if response.status_code == 200:
-                overpass_data = response.json()
-                elements = overpass_data.get('elements', [])
-                
-                print(f"✅ Overpass retornou {len(elements)} elementos")
-                
-                # Processar resultados
-                spots = []
-                for element in elements:
-                    try:
-                        # Obter coordenadas
-                        if element['type'] == 'node':
-                            elem_lat = element['lat']
-                            elem_lng = element['lon']
-                        elif element['type'] == 'way' and 'center' in element:
-                            elem_lat = element['center']['lat']
-                            elem_lng = element['center']['lon']
-                        else:
-                            continue
-                        
-                        # Calcular distância real
-                        distance = calculate_distance(latitude, longitude, elem_lat, elem_lng)
-                        
-                        # Filtrar por raio real
-                        if distance > radius:
-                            continue
-                        
-                        # Extrair informações
-                        tags = element.get('tags', {})
-                        name = tags.get('name', tags.get('name:pt', tags.get('name:en', 'Ponto Turístico')))
-                        
-                        # Determinar categoria
-                        category = 'Outros'
-                        if 'tourism' in tags:
-                            category = f"Turismo - {tags['tourism'].title()}"
-                        elif 'historic' in tags:
-                            category = f"Histórico - {tags['historic'].title()}"
-                        elif 'natural' in tags:
-                            category = f"Natural - {tags['natural'].title()}"
-                        elif 'leisure' in tags:
-                            category = f"Lazer - {tags['leisure'].title()}"
-                        
-                        # Construir descrição
-                        description_parts = []
-                        description_parts.append(f"{category}")
-                        
-                        if 'addr:city' in tags:
-                            description_parts.append(f"📍 {tags['addr:city']}")
-                        if 'addr:state' in tags:
-                            description_parts.append(f"{tags['addr:state']}")
-                        if 'website' in tags:
-                            description_parts.append(f"🌐 {tags['website']}")
-                        if 'opening_hours' in tags:
-                            description_parts.append(f"🕒 {tags['opening_hours']}")
-                        
-                        spot = {
-                            'id': f"ext_{element['id']}",
-                            'nome': name,
-                            'descricao': ' - '.join(description_parts),
-                            'categoria': category,
-                            'localizacao': {
-                                'latitude': elem_lat,
-                                'longitude': elem_lng
-                            },
-                            'distance': distance,
-                            'source': 'overpass',
-                            'relevancia': calculate_relevance(tags, distance)
-                        }
-                        
-                        spots.append(spot)
-                        
-                    except Exception as e:
-                        print(f"❌ Erro ao processar elemento: {e}")
-                        continue
-                
-                # Ordenar por relevância e distância
-                spots.sort(key=lambda x: (-x['relevancia'], x['distance']))
-                
-                # Limitar resultados
-                spots = spots[:limit]
-                
-                print(f"🎯 Retornando {len(spots)} pontos processados")
-                return jsonify(spots)
-                
-            else:
-                print(f"❌ Erro na API Overpass: {response.status_code}")
+            if fetched is None:
                 return jsonify({'error': 'Erro ao buscar pontos na API externa'}), 500
+            
+            for tile, tile_elements in fetched.items():
+                overpass_tile_cache.set(overpass_tile_key(tile, categories_key), tile_elements)
+                elements_by_tile[tile] = tile_elements
+        
+        # Processar resultados
+        spots = []
+        seen = set()
+        for tile in tiles:
+            for element in elements_by_tile.get(tile, []):
+                key = (element['type'], element['id'])
+                if key in seen:
+                    continue
+                seen.add(key)
                 
-        except requests.exceptions.Timeout:
-            print("⏰ Timeout na API Overpass")
-            return jsonify({'error': 'Timeout na busca de pontos'}), 408
-        except requests.exceptions.RequestException as e:
-            print(f"🌐 Erro de rede na API Overpass: {e}")
-            return jsonify({'error': 'Erro de conexão com API externa'}), 503
+                try:
+                    spot = overpass_element_to_spot(element, latitude, longitude)
+                except Exception as e:
+                    logger.warning('Erro ao processar elemento do Overpass: %s', e)
+                    continue
+                
+                # Filtrar por raio real
+                if spot['distance'] <= radius:
+                    spots.append(spot)
+        
+        # Ordenar por relevância e distância
+        spots.sort(key=lambda x: (-x['relevancia'], x['distance']))
+        
+        # Limitar resultados
+        spots = spots[:limit]
+        
+        logger.debug('Retornando %d pontos processados', len(spots))
+        return jsonify(spots)
             
     except Exception as e:
-        print(f"💥 Erro geral em search_nearby_spots: {e}")
+        logger.exception('Erro geral em search_nearby_spots')
         return jsonify({'error': str(e)}), 500
 
+def build_category_filters(categories):
+    """Converter categorias da requisição em filtros Overpass (chave=valor)"""
+    category_filters = []
+    for category in categories:
+        if category == 'tourism':
+            category_filters.extend([
+                'tourism=attraction',
+                'tourism=museum',
+                'tourism=viewpoint',
+                'tourism=monument',
+                'tourism=artwork',
+                'tourism=gallery',
+                'tourism=information',
+                'tourism=theme_park'
+            ])
+        elif category == 'historic':
+            category_filters.extend([
+                'historic=monument',
+                'historic=memorial',
+                'historic=castle',
+                'historic=ruins',
+                'historic=archaeological_site',
+                'historic=building'
+            ])
+        elif category == 'natural':
+            category_filters.extend([
+                'natural=peak',
+                'natural=waterfall',
+                'natural=beach',
+                'natural=cave_entrance'
+            ])
+        elif category == 'park':
+            category_filters.extend([
+                'leisure=park',
+                'leisure=nature_reserve',
+                'tourism=zoo'
+            ])
+        else:
+            category_filters.append(f'{category}=*')
+    return list(dict.fromkeys(category_filters))
+
+def tiles_for_bbox(min_lat, min_lng, max_lat, max_lng):
+    """Tiles (linha, coluna) da grade fixa que intersectam a caixa envolvente"""
+    size = OVERPASS_TILE_SIZE_DEG
+    rows = range(int(math.floor(max(min_lat, -90.0) / size)), int(math.floor(min(max_lat, 90.0) / size)) + 1)
+    cols = range(int(math.floor(min_lng / size)), int(math.floor(max_lng / size)) + 1)
+    return [(row, col) for row in rows for col in cols]
+
+def tile_bbox(tile):
+    """Caixa (sul, oeste, norte, leste) de um tile"""
+    row, col = tile
+    size = OVERPASS_TILE_SIZE_DEG
+    return (row * size, col * size, (row + 1) * size, (col + 1) * size)
+
+def tile_for_point(lat, lng):
+    size = OVERPASS_TILE_SIZE_DEG
+    return (int(math.floor(lat / size)), int(math.floor(lng / size)))
+
+def overpass_tile_key(tile, categories_key):
+    return f"{OVERPASS_TILE_SIZE_DEG}:{tile[0]}:{tile[1]}:{categories_key}"
+
+def fetch_overpass_tiles(tiles, category_filters):
+    """Buscar no Overpass os elementos dos tiles informados, agrupados por tile.
+    
+    Uma única consulta cobre a caixa envolvente dos tiles; cada elemento é
+    atribuído ao tile que contém sua coordenada. Retorna None se a API
+    responder com erro.
+    """
+    bboxes = [tile_bbox(tile) for tile in tiles]
+    south = min(b[0] for b in bboxes)
+    west = min(b[1] for b in bboxes)
+    north = max(b[2] for b in bboxes)
+    east = max(b[3] for b in bboxes)
+    bbox = f"{south},{west},{north},{east}"
+    
+    # Query para nós (points)
+    node_queries = []
+    for filter_item in category_filters:
+        node_queries.append(f'node[{filter_item}]({bbox});')
+    
+    # Query para ways (áreas)
+    way_queries = []
+    for filter_item in category_filters:
+        way_queries.append(f'way[{filter_item}]({bbox});')
+    
+    overpass_query = f"""
+    [out:json][timeout:25];
+    (
+      {''.join(node_queries)}
+      {''.join(way_queries)}
+    );
+    out center meta;
+    """
+    
+    # Fazer requisição para API Overpass
+    response = get_client('overpass').post(
+        OVERPASS_URL, 
+        data=overpass_query.encode('utf-8'), 
+        headers={'Content-Type': 'text/plain; charset=utf-8'}
+    )
+    
+    if response.status_code != 200:
+        logger.warning('Erro na API Overpass: %s', response.status_code)
+        return None
+    
+    elements = response.json().get('elements', [])
+    logger.debug('Overpass retornou %d elementos', len(elements))
+    
+    # Tiles sem elementos também são guardados (vazios)
+    by_tile = {tile: [] for tile in tiles}
+    for element in elements:
+        # Obter coordenadas
+        if element.get('type') == 'node' and 'lat' in element:
+            elem_lat, elem_lng = element['lat'], element['lon']
+        elif element.get('type') == 'way' and 'center' in element:
+            elem_lat, elem_lng = element['center']['lat'], element['center']['lon']
+        else:
+            continue
+        
+        tile = tile_for_point(elem_lat, elem_lng)
+        if tile in by_tile:
+            by_tile[tile].append({
+                'type': element['type'],
+                'id': element['id'],
+                'lat': elem_lat,
+                'lon': elem_lng,
+                'tags': element.get('tags', {})
+            })
+    return by_tile
+
+def overpass_element_to_spot(element, latitude, longitude):
+    """Converter um elemento do Overpass (já com coordenadas) em ponto turístico"""
+    elem_lat = element['lat']
+    elem_lng = element['lon']
+    
+    # Calcular distância real
+    distance = calculate_distance(latitude, longitude, elem_lat, elem_lng)
+    
+    # Extrair informações
+    tags = element.get('tags', {})
+    name = tags.get('name', tags.get('name:pt', tags.get('name:en', 'Ponto Turístico')))
+    
+    # Determinar categoria
+    category = 'Outros'
+    if 'tourism' in tags:
+        category = f"Turismo - {tags['tourism'].title()}"
+    elif 'historic' in tags:
+        category = f"Histórico - {tags['historic'].title()}"
+    elif 'natural' in tags:
+        category = f"Natural - {tags['natural'].title()}"
+    elif 'leisure' in tags:
+        category = f"Lazer - {tags['leisure'].title()}"
+    
+    # Construir descrição
+    description_parts = []
+    description_parts.append(f"{category}")
+    
+    if 'addr:city' in tags:
+        description_parts.append(f"📍 {tags['addr:city']}")
+    if 'addr:state' in tags:
+        description_parts.append(f"{tags['addr:state']}")
+    if 'website' in tags:
+        description_parts.append(f"🌐 {tags['website']}")
+    if 'opening_hours' in tags:
+        description_parts.append(f"🕒 {tags['opening_hours']}")
+    
+    return {
+        'id': f"ext_{element['id']}",
+        'nome': name,
+        'descricao': ' - '.join(description_parts),
+        'categoria': category,
+        'localizacao': {
+            'latitude': elem_lat,
+            'longitude': elem_lng
+        },
+        'distance': distance,
+        'source': 'overpass',
+        'relevancia': calculate_relevance(tags, distance)
+    }
+
 def calculate_distance(lat1, lng1, lat2, lng2):
     """Calcular distância entre duas coordenadas em km"""
     R = 6371  # Raio da Terra em km
@@ -0,0 +1,360 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.services.database import SQLITE_BUSY_TIMEOUT_MS, apply_sqlite_pragmas
+
+logger = logging.getLogger(__name__)
+
+# Caminho padrão do banco SQLite usado pelos caches persistentes
+DEFAULT_CACHE_DB_PATH = os.environ.get(
+    'CACHE_DB_PATH',
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        'database', 'cache.db'
+    )
+)
+
+# Sentinela para diferenciar "não encontrado" de valores armazenados
+MISSING = object()
+
+# Caches registrados no processo, por nome (usado pelas métricas)
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def register_cache(cache):
+    with _registry_lock:
+        _registry[cache.name] = cache
+    return cache
+
+
+def cache_stats():
+    """Métricas de todos os caches registrados"""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+class SQLiteCacheStore:
+    """Camada persistente do cache: tabela chave/valor JSON com expiração"""
+
+    def __init__(self, path, namespace):
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                ' namespace TEXT NOT NULL,'
+                ' key TEXT NOT NULL,'
+                ' value TEXT NOT NULL,'
+                ' negative INTEGER NOT NULL DEFAULT 0,'
+                ' expires_at REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+
+    def _connection(self):
+        # Uma conexão por thread (sqlite3 não compartilha conexões entre threads)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+            apply_sqlite_pragmas(conn)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        row = self._connection().execute(
+            'SELECT value, negative, expires_at FROM cache_entries WHERE namespace = ? AND key = ?',
+            (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, negative, expires_at = row
+        if expires_at <= now:
+            self.delete(key)
+            return None
+        return json.loads(value), bool(negative), expires_at
+
+    def set(self, key, value, negative, expires_at):
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (namespace, key, value, negative, expires_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (self.namespace, key, json.dumps(value), int(negative), expires_at)
+            )
+
+    def delete(self, key):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (self.namespace, key))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+
+    def purge_expired(self, now):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?', (self.namespace, now))
+
+
+class TTLCache:
+    """Cache com expiração em duas camadas: LRU em memória e SQLite opcional.
+
+    Entradas negativas (buscas vazias ou falhas) usam ``negative_ttl``, em
+    geral mais curto. Sem ``db_path`` o cache existe apenas em memória.
+    Os valores precisam ser serializáveis em JSON.
+    """
+
+    def __init__(self, name, ttl, negative_ttl=None, max_entries=1024, db_path=None, clock=time.time):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._store = SQLiteCacheStore(db_path, name) if db_path else None
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+    def _remember(self, key, value, negative, expires_at):
+        """Insere na camada em memória respeitando o limite LRU (com lock)"""
+        self._memory[key] = (value, negative, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def get(self, key):
+        """Retorna o valor em cache ou MISSING"""
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, negative, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    if negative:
+                        self._counters['negative_hits'] += 1
+                    return value
+                del self._memory[key]
+                self._counters['expirations'] += 1
+
+        if self._store is not None:
+            try:
+                entry = self._store.get(key, now)
+            except sqlite3.Error as e:
+                logger.warning("Erro ao ler cache '%s': %s", self.name, e)
+                entry = None
+            if entry is not None:
+                value, negative, expires_at = entry
+                with self._lock:
+                    self._remember(key, value, negative, expires_at)
+                    self._counters['disk_hits'] += 1
+                    if negative:
+                        self._counters['negative_hits'] += 1
+                return value
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return MISSING
+
+    def set(self, key, value, negative=False, ttl=None):
+        """Armazena um valor; entradas negativas usam negative_ttl"""
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttl
+        expires_at = self._clock() + ttl
+        with self._lock:
+            self._remember(key, value, negative, expires_at)
+            self._counters['sets'] += 1
+        if self._store is not None:
+            try:
+                self._store.set(key, value, negative, expires_at)
+            except sqlite3.Error as e:
+                logger.warning("Erro ao gravar cache '%s': %s", self.name, e)
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self._store is not None:
+            self._store.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._memory)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hits'] = hits
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        stats['negative_ttl'] = self.negative_ttl
+        stats['max_entries'] = self.max_entries
+        stats['persistent'] = self._store is not None
+        return stats
+
+
+class FileLRUCache:
+    """Cache de conteúdo binário (ex.: PDFs) em arquivos, limitado pelo total de bytes.
+
+    Cada entrada é um arquivo ``<chave>.bin`` no diretório do cache. A ordem
+    LRU fica no mtime dos arquivos (atualizado a cada acerto), então sobrevive
+    a reinícios e é compartilhada por processos que usam o mesmo diretório.
+    Com ``max_bytes <= 0`` o cache fica desativado.
+    """
+
+    SUFFIX = '.bin'
+
+    def __init__(self, name, directory, max_bytes):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None  # OrderedDict chave -> tamanho, carregado sob demanda
+        self._total_bytes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _index(self):
+        """Índice em memória das entradas, do menos para o mais recente (com lock)"""
+        if self._entries is None:
+            found = []
+            try:
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(self.SUFFIX) and entry.is_file():
+                            stat = entry.stat()
+                            found.append((stat.st_mtime, entry.name[:-len(self.SUFFIX)], stat.st_size))
+            except FileNotFoundError:
+                pass
+            found.sort()
+            self._entries = OrderedDict((key, size) for _, key, size in found)
+            self._total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def _forget(self, key):
+        size = self._index().pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def get(self, key):
+        """Conteúdo em cache (bytes) ou None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(key)
+                self._counters['misses'] += 1
+            return None
+        with self._lock:
+            index = self._index()
+            if key not in index:
+                # Gravado por outro processo
+                index[key] = len(data)
+                self._total_bytes += len(data)
+            index.move_to_end(key)
+            self._counters['hits'] += 1
+        return data
+
+    def set(self, key, data):
+        """Grava o conteúdo e remove as entradas menos usadas acima de max_bytes"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # Escrita atômica: quem lê nunca vê um arquivo pela metade
+        partial = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+        with open(partial, 'wb') as f:
+            f.write(data)
+        os.replace(partial, path)
+
+        with self._lock:
+            self._forget(key)
+            index = self._index()
+            index[key] = len(data)
+            self._total_bytes += len(data)
+            self._counters['sets'] += 1
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(index) > 1:
+                old_key, size = index.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+            self._counters['evictions'] += len(evicted)
+        for old_key in evicted:
+            self._remove_file(old_key)
+
+    def delete_prefix(self, prefix):
+        """Remove todas as entradas cujas chaves começam com ``prefix``"""
+        if not self.enabled:
+            return 0
+        try:
+            names = [name for name in os.listdir(self.directory)
+                     if name.startswith(prefix) and name.endswith(self.SUFFIX)]
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            key = name[:-len(self.SUFFIX)]
+            with self._lock:
+                self._forget(key)
+                self._counters['invalidations'] += 1
+            self._remove_file(key)
+        return len(names)
+
+    def clear(self):
+        self.delete_prefix('')
+
+    def _remove_file(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            index = self._index() if self.enabled else {}
+            stats['entries'] = len(index)
+            stats['bytes'] = self._total_bytes if self.enabled else 0
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_bytes'] = self.max_bytes
+        stats['persistent'] = True
+        return stats
@@ -0,0 +1,94 @@
+import os
+
+from sqlalchemy import event
+
+# Banco padrão: SQLite em database/app.db na raiz do projeto
+DEFAULT_DATABASE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'database'
+)
+
+# Tempo (ms) que uma conexão espera por um lock antes de falhar com "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+# Pragmas aplicados a cada nova conexão SQLite, em ordem
+SQLITE_PRAGMAS = (
+    # WAL: leitores não bloqueiam o escritor (nem o contrário)
+    ('journal_mode', 'WAL'),
+    # Seguro com WAL; evita um fsync a cada commit
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', SQLITE_BUSY_TIMEOUT_MS),
+    ('mmap_size', int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+    # Negativo = tamanho em KiB (64 MiB)
+    ('cache_size', int(os.environ.get('SQLITE_CACHE_SIZE', -64000))),
+    ('temp_store', 'MEMORY'),
+)
+
+# Pool de conexões para workers multi-thread
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+
+
+def database_uri(default_dir=DEFAULT_DATABASE_DIR):
+    """URI do banco: DATABASE_URL (ex.: PostgreSQL) ou o SQLite local"""
+    uri = os.environ.get('DATABASE_URL')
+    if uri:
+        # Heroku e afins ainda usam o esquema antigo "postgres://"
+        if uri.startswith('postgres://'):
+            uri = 'postgresql://' + uri[len('postgres://'):]
+        return uri
+    os.makedirs(default_dir, exist_ok=True)
+    return f"sqlite:///{os.path.join(default_dir, 'app.db')}"
+
+
+def is_sqlite(uri):
+    return uri.startswith('sqlite')
+
+
+def engine_options(uri):
+    """Opções do engine SQLAlchemy adequadas ao banco e a workers com threads"""
+    if is_sqlite(uri):
+        if uri in ('sqlite://', 'sqlite:///:memory:'):
+            # Banco em memória: uma única conexão compartilhada (padrão do SQLAlchemy)
+            return {}
+        return {
+            'connect_args': {
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+                'check_same_thread': False,
+            },
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT,
+        }
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': True,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Aplica SQLITE_PRAGMAS a uma conexão sqlite3 recém-aberta"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def configure_database(app, db):
+    """Configura URI, pool e pragmas do banco e inicializa o Flask-SQLAlchemy"""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or database_uri()
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri))
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    db.init_app(app)
+
+    if is_sqlite(uri):
+        with app.app_context():
+            event.listen(db.engine, 'connect', apply_sqlite_pragmas)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.services.cache import MISSING, TTLCache, register_cache
+from src.services.geo import EARTH_RADIUS_KM
+
+# Matrizes já calculadas, por conjunto de coordenadas (independente da ordem)
+matrix_cache = register_cache(TTLCache('distance_matrix', ttl=3600, max_entries=256))
+
+
+def haversine_matrix(coordinates):
+    """Matriz N×N de distâncias Haversine (km) para uma lista de (lat, lng).
+
+    Todas as distâncias são calculadas de uma vez com operações vetorizadas
+    do NumPy, em vez de um par por vez.
+    """
+    coords = np.radians(np.asarray(coordinates, dtype=float).reshape(-1, 2))
+    lat = coords[:, 0][:, np.newaxis]
+    lng = coords[:, 1][:, np.newaxis]
+
+    dlat = lat - lat.T
+    dlng = lng - lng.T
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_matrix(coordinates, use_cache=True):
+    """Matriz de distâncias para as coordenadas, na ordem informada.
+
+    Com cache, a matriz é guardada na ordem canônica (coordenadas ordenadas),
+    de modo que qualquer permutação do mesmo conjunto - por exemplo a ordem
+    otimizada de uma rota - reaproveita o mesmo cálculo.
+    """
+    coordinates = [(float(lat), float(lng)) for lat, lng in coordinates]
+    if not use_cache:
+        return haversine_matrix(coordinates)
+
+    canonical = sorted(set(coordinates))
+    key = ';'.join(f"{lat:.7f},{lng:.7f}" for lat, lng in canonical)
+    matrix = matrix_cache.get(key)
+    if matrix is MISSING:
+        matrix = haversine_matrix(canonical)
+        matrix.setflags(write=False)
+        matrix_cache.set(key, matrix)
+
+    position = {coordinate: i for i, coordinate in enumerate(canonical)}
+    order = [position[coordinate] for coordinate in coordinates]
+    return matrix[np.ix_(order, order)]
+
+
+def leg_distances(coordinates):
+    """Distâncias Haversine (km) entre coordenadas consecutivas: N-1 trechos.
+
+    Para quem só precisa dos trechos da rota na ordem dada, evita montar a
+    matriz N×N inteira.
+    """
+    coords = np.radians(np.asarray(coordinates, dtype=float).reshape(-1, 2))
+    lat, lng = coords[:, 0], coords[:, 1]
+    dlat = np.diff(lat)
+    dlng = np.diff(lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
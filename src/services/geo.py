@@ -0,0 +1,55 @@
+import math
+
+# Raio médio da Terra em km
+EARTH_RADIUS_KM = 6371.0
+
+# Comprimento aproximado de um grau de latitude em km
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Distância de grande círculo (Haversine) entre duas coordenadas em km"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = lat2_rad - lat1_rad
+    delta_lng = math.radians(lng2 - lng1)
+
+    a = (math.sin(delta_lat / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) *
+         math.sin(delta_lng / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """Caixa (min_lat, max_lat, min_lng, max_lng) que contém o círculo de raio radius_km.
+
+    As longitudes vêm como None quando a caixa alcança um polo ou cruza o
+    antimeridiano; nesses casos apenas a faixa de latitude restringe a busca.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+
+    # Largura em longitude no paralelo mais distante do equador da faixa
+    max_abs_lat = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(max_abs_lat))
+    if max_abs_lat >= 90.0 or cos_lat <= 1e-9:
+        return min_lat, max_lat, None, None
+    dlng = dlat / cos_lat
+    if lng - dlng < -180.0 or lng + dlng > 180.0:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, lng - dlng, lng + dlng
+
+
+def spot_coordinates(spot):
+    """Extrai (lat, lng) de um ponto no formato do catálogo ou None"""
+    if not isinstance(spot, dict):
+        return None
+    if 'localizacao' in spot and spot['localizacao']:
+        loc = spot['localizacao']
+        if loc.get('latitude') is None or loc.get('longitude') is None:
+            return None
+        return float(loc['latitude']), float(loc['longitude'])
+    if spot.get('lat') is not None and spot.get('lng') is not None:
+        return float(spot['lat']), float(spot['lng'])
+    return None
@@ -0,0 +1,28 @@
+import hashlib
+import json
+
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """ETag forte (sem aspas) derivada das partes informadas, ex.: id e updated_at"""
+    raw = json.dumps(parts, default=str, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag, cache_control):
+    """Resposta 304 se o If-None-Match da requisição casa com a ETag, senão None.
+
+    Deve ser chamada antes de montar o corpo, para que a revalidação não
+    custe a serialização.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return with_validators(Response(status=304), etag, cache_control)
+
+
+def with_validators(response, etag, cache_control):
+    """Anexa ETag e Cache-Control a uma resposta"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
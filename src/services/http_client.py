@@ -0,0 +1,229 @@
+import bisect
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Limites (ms) dos buckets do histograma de latência
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# Configuração por serviço externo
+UPSTREAMS = {
+    'osrm': {
+        'timeout': float(os.environ.get('OSRM_TIMEOUT', 10)),
+        'retries': 2,
+    },
+    'nominatim': {
+        'timeout': float(os.environ.get('NOMINATIM_TIMEOUT', 10)),
+        'retries': 2,
+    },
+    'overpass': {
+        'timeout': float(os.environ.get('OVERPASS_TIMEOUT', 30)),
+        # Consultas lentas: não repetir após timeout
+        'retries': 1,
+        'retry_on_timeout': False,
+    },
+}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Circuito aberto: o serviço externo está falhando e a chamada não foi feita"""
+
+
+class LatencyHistogram:
+    """Histograma cumulativo simples de latências em milissegundos"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total_ms = 0.0
+        self.count = 0
+
+    def observe(self, elapsed_ms):
+        self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+        self.total_ms += elapsed_ms
+        self.count += 1
+
+    def to_dict(self):
+        labels = [f"le_{b}" for b in self.buckets] + ['le_inf']
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+        }
+
+
+class CircuitBreaker:
+    """Abre após ``failure_threshold`` falhas seguidas; após ``reset_timeout``
+    segundos deixa passar uma chamada de teste (meio-aberto)."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                # Apenas uma chamada de teste por vez
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+
+class UpstreamClient:
+    """Cliente HTTP compartilhado para um serviço externo.
+
+    Mantém um pool de conexões keep-alive por host, aplica timeout padrão,
+    repete falhas transitórias com backoff exponencial com jitter e usa um
+    circuit breaker para falhar rápido quando o serviço está fora do ar.
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(self, name, timeout=10.0, retries=2, backoff=0.2, max_backoff=2.0,
+                 retry_on_timeout=True, failure_threshold=5, reset_timeout=30.0,
+                 pool_maxsize=10, sleep=time.sleep):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on_timeout = retry_on_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self._counters = {
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'status_errors': 0,
+            'short_circuited': 0,
+        }
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _backoff_delay(self, attempt):
+        # Backoff exponencial com "full jitter"
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        self._count('requests')
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count('short_circuited')
+                raise CircuitOpenError(f"Serviço '{self.name}' indisponível (circuito aberto)")
+
+            self._count('attempts')
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self._observe(started)
+                self._count('errors')
+                is_timeout = isinstance(e, requests.exceptions.Timeout)
+                if is_timeout:
+                    self._count('timeouts')
+                self.breaker.record_failure()
+                if attempt >= self.retries or (is_timeout and not self.retry_on_timeout):
+                    raise
+            else:
+                self._observe(started)
+                if response.status_code >= 500:
+                    self._count('status_errors')
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                response.close()
+
+            self._count('retries')
+            self._sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    def _observe(self, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._latency.observe(elapsed_ms)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['latency_ms'] = self._latency.to_dict()
+        stats['circuit'] = {
+            'state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'times_opened': self.breaker.times_opened,
+        }
+        stats['timeout'] = self.timeout
+        return stats
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Cliente compartilhado (um por processo) para o serviço externo informado"""
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = UpstreamClient(name, **UPSTREAMS.get(name, {}))
+            _clients[name] = client
+        return client
+
+
+def upstream_stats():
+    """Métricas de latência/erros de todos os serviços externos já utilizados"""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.name: client.stats() for client in clients}
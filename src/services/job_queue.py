@@ -0,0 +1,229 @@
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from src.services.database import SQLITE_BUSY_TIMEOUT_MS, apply_sqlite_pragmas
+
+logger = logging.getLogger(__name__)
+
+# Estados de um job
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+# Processos do pool são iniciados do zero: com fork, o filho de um worker WSGI
+# com várias threads herdaria locks (logging, pool do SQLAlchemy, caches) que
+# podem estar presos por threads que não existem nele
+DEFAULT_START_METHOD = 'spawn'
+# Intervalo máximo (s) entre varreduras de jobs que excederam o tempo limite
+SWEEP_INTERVAL = 60
+
+
+class QueueFull(Exception):
+    """A fila atingiu o limite de jobs pendentes"""
+
+
+class JobStore:
+    """Jobs e seus resultados (BLOB) em uma tabela SQLite local.
+
+    Compartilhado por todos os processos que usam o mesmo arquivo, então o
+    status pode ser consultado em qualquer worker WSGI.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        # Tempo (s) que jobs concluídos e seus resultados ficam disponíveis
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                ' id TEXT PRIMARY KEY,'
+                ' kind TEXT NOT NULL,'
+                ' owner TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' filename TEXT,'
+                ' error TEXT,'
+                ' result BLOB,'
+                ' created_at REAL NOT NULL,'
+                ' finished_at REAL)'
+            )
+
+    def _connection(self):
+        # Uma conexão por thread (sqlite3 não compartilha conexões entre threads)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+            apply_sqlite_pragmas(conn)
+            self._local.conn = conn
+        return conn
+
+    def create(self, job_id, kind, owner, filename, status=PENDING, result=None):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute('DELETE FROM jobs WHERE created_at < ?', (now - self.ttl,))
+            conn.execute(
+                'INSERT INTO jobs (id, kind, owner, status, filename, result, created_at, finished_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, str(owner), status, filename, result, now, now if status != PENDING else None)
+            )
+
+    def finish(self, job_id, status, result=None, error=None):
+        with self._connection() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, result, error, time.time(), job_id)
+            )
+
+    def expire(self, kind, timeout):
+        """Marca como falha os jobs pendentes há mais de ``timeout`` segundos; retorna quantos"""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ?'
+                ' WHERE kind = ? AND status = ? AND created_at < ?',
+                (FAILED, 'Tempo limite excedido', now, kind, PENDING, now - timeout)
+            )
+        return cursor.rowcount
+
+    def get(self, job_id):
+        """Dados do job (sem o resultado) ou None"""
+        row = self._connection().execute(
+            'SELECT id, kind, owner, status, filename, error, created_at, finished_at FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('id', 'kind', 'owner', 'status', 'filename', 'error', 'created_at', 'finished_at')
+        return dict(zip(keys, row))
+
+    def result(self, job_id):
+        row = self._connection().execute('SELECT result FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row[0] if row else None
+
+
+class JobQueue:
+    """Fila de jobs executados em um pool de processos, com limite de pendentes.
+
+    ``submit`` falha com QueueFull quando já há ``max_pending`` jobs deste
+    processo aguardando ou em execução (backpressure). ``on_result`` é
+    chamado no processo pai com (chave, resultado) de cada job concluído.
+    Uma thread varre periodicamente o store e marca como falha os jobs
+    pendentes além de ``job_timeout``.
+    """
+
+    def __init__(self, kind, store, max_workers, max_pending, job_timeout, on_result=None,
+                 start_method=DEFAULT_START_METHOD):
+        self.kind = kind
+        self.store = store
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        # Jobs pendentes há mais tempo que isso são dados como perdidos (ex.: processo reiniciado)
+        self.job_timeout = job_timeout
+        self.on_result = on_result
+        self.start_method = start_method
+        self._lock = threading.Lock()
+        self._executor = None
+        self._sweeper = None
+        self._pending = 0
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.start_method) if self.start_method else None
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            self._start_sweeper()
+            return self._executor
+
+    def _start_sweeper(self):
+        # Chamado com self._lock; a thread não sobrevive a um fork, então é criada sob demanda
+        if self._sweeper is None or not self._sweeper.is_alive():
+            self._sweeper = threading.Thread(target=self._sweep, name=f'{self.kind}-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep(self):
+        interval = max(1, min(self.job_timeout, SWEEP_INTERVAL))
+        while True:
+            time.sleep(interval)
+            try:
+                self.expire_timed_out()
+            except Exception:
+                logger.exception('Erro ao expirar jobs de %s', self.kind)
+
+    def expire_timed_out(self):
+        """Marca como falha os jobs pendentes além de job_timeout (ex.: processo reiniciado)"""
+        expired = self.store.expire(self.kind, self.job_timeout)
+        if expired:
+            logger.warning('%d job(s) de %s excederam o tempo limite', expired, self.kind)
+        return expired
+
+    def submit(self, owner, key, filename, fn, *args):
+        """Enfileira ``fn(*args)`` e retorna o id do job; QueueFull se a fila estiver cheia"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise QueueFull(f'Fila de {self.kind} cheia ({self.max_pending} jobs pendentes)')
+            self._pending += 1
+            self._counters['submitted'] += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.create(job_id, self.kind, owner, filename)
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda done: self._finish(job_id, key, done))
+        return job_id
+
+    def completed(self, owner, filename, result):
+        """Registra como concluído um job cujo resultado já existe (sem usar o pool)"""
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, self.kind, owner, filename, status=DONE, result=result)
+        return job_id
+
+    def _finish(self, job_id, key, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.warning('Job %s (%s) falhou: %s', job_id, self.kind, e)
+            self.store.finish(job_id, FAILED, error=str(e))
+            status = 'failed'
+        else:
+            self.store.finish(job_id, DONE, result=result)
+            if self.on_result is not None:
+                try:
+                    self.on_result(key, result)
+                except Exception:
+                    logger.exception('Erro ao processar o resultado do job %s', job_id)
+            status = 'completed'
+        with self._lock:
+            self._pending -= 1
+            self._counters[status] += 1
+
+    def status(self, job_id):
+        """Dados do job ou None"""
+        with self._lock:
+            self._start_sweeper()
+        return self.store.get(job_id)
+
+    def result(self, job_id):
+        return self.store.result(job_id)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending'] = self._pending
+        stats['max_pending'] = self.max_pending
+        stats['max_workers'] = self.max_workers
+        return stats
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+
+from flask import g, has_request_context, request
+
+# Cabeçalho usado para propagar/retornar o ID da requisição
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Fração das requisições cujos payloads são registrados em DEBUG
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 0.01))
+
+# Tamanho máximo (caracteres) de um payload registrado
+LOG_PAYLOAD_MAX_CHARS = 2000
+
+# Atributos padrão de LogRecord (o resto vem de extra={...})
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id'}
+
+
+def default_log_level():
+    """LOG_LEVEL ou, sem ele, WARNING em produção e INFO nos demais ambientes"""
+    level = os.environ.get('LOG_LEVEL')
+    if level:
+        return level.upper()
+    return 'WARNING' if os.environ.get('FLASK_ENV') == 'production' else 'INFO'
+
+
+def default_log_format():
+    """LOG_FORMAT (json ou text); JSON em produção, texto nos demais ambientes"""
+    log_format = os.environ.get('LOG_FORMAT')
+    if log_format:
+        return log_format.lower()
+    return 'json' if os.environ.get('FLASK_ENV') == 'production' else 'text'
+
+
+def current_request_id():
+    if has_request_context():
+        return getattr(g, 'request_id', '-')
+    return '-'
+
+
+class RequestIdFilter(logging.Filter):
+    """Anexa o ID da requisição atual a cada registro"""
+
+    def filter(self, record):
+        record.request_id = current_request_id()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos passados em extra={...}"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(app=None, level=None, log_format=None, stream=None):
+    """Configura o logger raiz (nível, formato, request ID) e, se informado,
+    registra os hooks de request ID e log de acesso na aplicação Flask."""
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.addFilter(RequestIdFilter())
+    if (log_format or default_log_format()) == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+        ))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if getattr(existing, '_turistieer', False):
+            root.removeHandler(existing)
+    handler._turistieer = True
+    root.addHandler(handler)
+    root.setLevel(level or default_log_level())
+
+    if app is not None:
+        init_request_logging(app)
+    return handler
+
+
+def init_request_logging(app):
+    """Gera/propaga o X-Request-ID e registra uma linha de acesso por requisição"""
+    access_logger = logging.getLogger('turistieer.access')
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        response.headers[REQUEST_ID_HEADER] = g.get('request_id', '-')
+        if access_logger.isEnabledFor(logging.INFO):
+            elapsed_ms = (time.perf_counter() - g.get('request_started', time.perf_counter())) * 1000
+            access_logger.info(
+                '%s %s %s %.1fms', request.method, request.path, response.status_code, elapsed_ms,
+                extra={'method': request.method, 'path': request.path,
+                       'status': response.status_code, 'duration_ms': round(elapsed_ms, 1)}
+            )
+        return response
+
+
+def log_payload(logger, message, payload_fn, sample_rate=None):
+    """Registra em DEBUG, por amostragem, um payload calculado sob demanda.
+
+    ``payload_fn`` só é chamado se o DEBUG estiver ativo e a requisição for
+    sorteada; com o nível de produção não há custo de formatação.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    rate = LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate < 1 and random.random() >= rate:
+        return
+    payload = str(payload_fn())
+    if len(payload) > LOG_PAYLOAD_MAX_CHARS:
+        payload = payload[:LOG_PAYLOAD_MAX_CHARS] + '...'
+    logger.debug('%s: %s', message, payload)
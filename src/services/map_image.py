@@ -0,0 +1,74 @@
+import io
+import os
+import time
+
+from PIL import Image, ImageOps
+
+# Resolução com que a imagem do mapa é embutida no PDF
+MAP_IMAGE_DPI = int(os.environ.get('MAP_IMAGE_DPI', 150))
+MAP_IMAGE_JPEG_QUALITY = int(os.environ.get('MAP_IMAGE_JPEG_QUALITY', 80))
+
+# Imagens com até esse número de cores viram PNG com paleta; acima, JPEG
+PALETTE_MAX_COLORS = 256
+
+# Limite de pixels da imagem enviada (protege contra "bombas" de descompressão)
+MAX_INPUT_PIXELS = 40_000_000
+
+
+def prepare_map_image(data, width_in, height_in, dpi=MAP_IMAGE_DPI):
+    """Reduz e recomprime a imagem do mapa para embutir no PDF.
+
+    A imagem é decodificada uma única vez, reduzida (nunca ampliada) para
+    caber em width_in x height_in polegadas a ``dpi`` e regravada sem
+    metadados (EXIF, ICC, textos): PNG com paleta se tiver poucas cores
+    (desenhos, mapas vetoriais), JPEG caso contrário (fotos, satélite).
+    Transparência é achatada sobre branco, a cor da página.
+
+    Retorna um dict com os bytes, o formato, as dimensões, os tamanhos de
+    entrada e saída e o tempo gasto (s). ValueError se não for uma imagem.
+    """
+    started = time.perf_counter()
+    target = (round(width_in * dpi), round(height_in * dpi))
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width * image.height > MAX_INPUT_PIXELS:
+                raise ValueError(f'Imagem muito grande ({image.width}x{image.height})')
+            # JPEG: decodifica direto em escala reduzida (1/2, 1/4, 1/8) quando possível
+            image.draft('RGB', target)
+            image = _flatten(ImageOps.exif_transpose(image))
+            image.thumbnail(target, Image.LANCZOS, reducing_gap=3.0)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f'Imagem do mapa inválida: {e}') from e
+
+    colors = image.getcolors(PALETTE_MAX_COLORS)
+    output = io.BytesIO()
+    if colors is not None:
+        image.convert('P', palette=Image.ADAPTIVE, colors=len(colors)).save(output, 'PNG', optimize=True)
+        image_format = 'PNG'
+    else:
+        image.save(output, 'JPEG', quality=MAP_IMAGE_JPEG_QUALITY, optimize=True)
+        image_format = 'JPEG'
+    result = output.getvalue()
+
+    return {
+        'data': result,
+        'format': image_format,
+        'width': image.width,
+        'height': image.height,
+        'input_bytes': len(data),
+        'output_bytes': len(result),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def _flatten(image):
+    """Imagem em RGB, com a transparência (se houver) aplicada sobre fundo branco"""
+    if image.mode == 'P':
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    if image.mode in ('RGBA', 'LA', 'PA'):
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB') if image.mode != 'RGB' else image
@@ -0,0 +1,255 @@
+import time
+
+# Até este número de pontos a ordem ótima é calculada de forma exata (Held-Karp)
+EXACT_MAX_POINTS = 10
+
+# Tempo máximo (ms) da busca local para rotas maiores
+DEFAULT_TIME_BUDGET_MS = 200
+
+# Tamanhos de segmento testados pelo Or-opt
+OR_OPT_SEGMENT_SIZES = (1, 2, 3)
+
+# Tolerância para considerar que um movimento melhora a rota
+_EPSILON = 1e-9
+
+
+def tour_length(order, matrix, closed=False):
+    """Comprimento da sequência de índices; fechada volta ao primeiro ponto"""
+    total = 0.0
+    for a, b in zip(order, order[1:]):
+        total += matrix[a][b]
+    if closed and len(order) > 1:
+        total += matrix[order[-1]][order[0]]
+    return float(total)
+
+
+def held_karp(matrix, fixed_start=True, fixed_end=False, closed=False):
+    """Ordem ótima por programação dinâmica sobre subconjuntos (O(2^n · n²)).
+
+    Em rota fechada o primeiro ponto é sempre o início. Em rota aberta,
+    ``fixed_start``/``fixed_end`` prendem o primeiro/último ponto da entrada.
+    """
+    n = len(matrix)
+    if n <= 2:
+        return list(range(n))
+
+    end = n - 1 if fixed_end and not closed else None
+    if closed or fixed_start:
+        starts = [0]
+    else:
+        starts = [i for i in range(n) if i != end]
+
+    full = (1 << n) - 1
+    # best[mask][j]: menor custo para visitar ``mask`` terminando em j
+    best = [dict() for _ in range(1 << n)]
+    parent = [dict() for _ in range(1 << n)]
+    for s in starts:
+        best[1 << s][s] = 0.0
+        parent[1 << s][s] = None
+
+    for mask in range(1, full + 1):
+        row = best[mask]
+        if not row:
+            continue
+        for j, cost in row.items():
+            # O ponto final fixo só pode ser o último visitado
+            if j == end and mask != full:
+                continue
+            distances = matrix[j]
+            for k in range(n):
+                if mask & (1 << k):
+                    continue
+                next_mask = mask | (1 << k)
+                if k == end and next_mask != full:
+                    continue
+                candidate = cost + distances[k]
+                if candidate < best[next_mask].get(k, float('inf')):
+                    best[next_mask][k] = candidate
+                    parent[next_mask][k] = j
+
+    if closed:
+        last = min(best[full], key=lambda j: best[full][j] + matrix[j][0])
+    elif end is not None:
+        last = end
+    else:
+        last = min(best[full], key=best[full].get)
+
+    order = []
+    mask = full
+    while last is not None:
+        order.append(last)
+        last, mask = parent[mask][last], mask ^ (1 << last)
+    return order[::-1]
+
+
+def nearest_neighbor(matrix, start, end=None):
+    """Sequência gulosa: sempre o ponto mais próximo ainda não visitado"""
+    n = len(matrix)
+    unvisited = [i for i in range(n) if i not in (start, end)]
+    order = [start]
+    while unvisited:
+        distances = matrix[order[-1]]
+        nearest = min(unvisited, key=lambda i: distances[i])
+        unvisited.remove(nearest)
+        order.append(nearest)
+    if end is not None and end != start:
+        order.append(end)
+    return order
+
+
+def _distance(matrix, a, b):
+    # Extremidade aberta (sem vizinho) não tem custo
+    if a is None or b is None:
+        return 0.0
+    return matrix[a][b]
+
+
+def two_opt(order, matrix, closed=False, head=0, tail=0, deadline=None):
+    """Inverte trechos da sequência enquanto isso encurtar a rota.
+
+    ``head``/``tail`` são quantas posições do início/fim estão presas.
+    """
+    n = len(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(head, n - tail - 1):
+            if deadline is not None and time.perf_counter() > deadline:
+                return order
+            prev = order[i - 1] if i > 0 else (order[-1] if closed else None)
+            for j in range(i + 1, n - tail):
+                nxt = order[j + 1] if j < n - 1 else (order[0] if closed else None)
+                if prev == order[j] or nxt == order[i]:
+                    continue
+                delta = (_distance(matrix, prev, order[j]) + _distance(matrix, order[i], nxt)
+                         - _distance(matrix, prev, order[i]) - _distance(matrix, order[j], nxt))
+                if delta < -_EPSILON:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+    return order
+
+
+def or_opt(order, matrix, closed=False, head=0, tail=0, deadline=None):
+    """Move segmentos curtos (1 a 3 pontos, em qualquer sentido) para outra posição"""
+    n = len(order)
+    improved = True
+    while improved:
+        improved = False
+        for size in OR_OPT_SEGMENT_SIZES:
+            for i in range(head, n - tail - size + 1):
+                if deadline is not None and time.perf_counter() > deadline:
+                    return order
+                segment = order[i:i + size]
+                rest = order[:i] + order[i + size:]
+                prev = order[i - 1] if i > 0 else (order[-1] if closed else None)
+                nxt = order[i + size] if i + size < n else (order[0] if closed else None)
+                removed = (_distance(matrix, prev, nxt) - _distance(matrix, prev, segment[0])
+                           - _distance(matrix, segment[-1], nxt))
+
+                # Posições de inserção que não deslocam pontos presos
+                for g in range(head, len(rest) - tail + 1):
+                    if g == i:
+                        continue
+                    a = rest[g - 1] if g > 0 else (rest[-1] if closed else None)
+                    b = rest[g] if g < len(rest) else (rest[0] if closed else None)
+                    for candidate in (segment, segment[::-1]):
+                        added = (_distance(matrix, a, candidate[0]) + _distance(matrix, candidate[-1], b)
+                                 - _distance(matrix, a, b))
+                        if removed + added < -_EPSILON:
+                            order[:] = rest[:g] + candidate + rest[g:]
+                            improved = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return order
+
+
+def local_search(matrix, fixed_start=True, fixed_end=False, closed=False,
+                 time_budget_ms=DEFAULT_TIME_BUDGET_MS, initial=None):
+    """Vizinho mais próximo seguido de 2-opt e Or-opt até não melhorar
+    ou esgotar ``time_budget_ms``."""
+    n = len(matrix)
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    end = n - 1 if fixed_end and not closed else None
+    head = 1 if closed or fixed_start else 0
+    tail = 1 if end is not None else 0
+
+    starts = [0] if head else [i for i in range(n) if i != end]
+    candidates = [list(initial)] if initial is not None else []
+    for start in starts:
+        candidates.append(nearest_neighbor(matrix, start, end))
+        if time.perf_counter() > deadline:
+            break
+    order = min(candidates, key=lambda o: tour_length(o, matrix, closed))
+
+    while True:
+        before = tour_length(order, matrix, closed)
+        two_opt(order, matrix, closed, head, tail, deadline)
+        or_opt(order, matrix, closed, head, tail, deadline)
+        if time.perf_counter() > deadline or tour_length(order, matrix, closed) >= before - _EPSILON:
+            return order
+
+
+# Estratégias disponíveis, selecionáveis pelo nome
+OPTIMIZERS = {
+    'exact': lambda matrix, options: held_karp(
+        matrix, options['fixed_start'], options['fixed_end'], options['closed']),
+    'heuristic': lambda matrix, options: local_search(
+        matrix, options['fixed_start'], options['fixed_end'], options['closed'],
+        options['time_budget_ms'], initial=list(range(len(matrix)))),
+}
+
+
+def optimize_order(matrix, fixed_start=True, fixed_end=False, closed=False,
+                   strategy='auto', time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+    """Melhor ordem de visita para a matriz de distâncias informada.
+
+    ``strategy='auto'`` usa Held-Karp até ``EXACT_MAX_POINTS`` pontos e a busca
+    local acima disso; ``'exact'`` com mais pontos gera ValueError. Retorna a ordem (índices) e as estatísticas da
+    otimização: distância antes/depois, melhoria e tempo gasto.
+    """
+    n = len(matrix)
+    if strategy == 'auto':
+        strategy = 'exact' if n <= EXACT_MAX_POINTS else 'heuristic'
+    if strategy not in OPTIMIZERS:
+        raise ValueError(f"Estratégia de otimização desconhecida: {strategy}")
+    if strategy == 'exact' and n > EXACT_MAX_POINTS:
+        # Held-Karp é exponencial em tempo e memória
+        raise ValueError(f"Estratégia exata aceita no máximo {EXACT_MAX_POINTS} pontos")
+
+    options = {
+        'fixed_start': fixed_start,
+        'fixed_end': fixed_end,
+        'closed': closed,
+        'time_budget_ms': time_budget_ms,
+    }
+    started = time.perf_counter()
+    order = OPTIMIZERS[strategy](matrix, options) if n > 2 else list(range(n))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    initial_distance = tour_length(list(range(n)), matrix, closed)
+    distance = tour_length(order, matrix, closed)
+    if distance > initial_distance:
+        # Nunca piorar a ordem informada
+        order, distance = list(range(n)), initial_distance
+    improvement = initial_distance - distance
+
+    return order, {
+        'strategy': strategy,
+        'points': n,
+        'fixed_start': fixed_start,
+        'fixed_end': fixed_end,
+        'closed': closed,
+        'initial_distance': round(initial_distance, 2),
+        'optimized_distance': round(distance, 2),
+        'improvement': round(improvement, 2),
+        'improvement_percent': round(improvement / initial_distance * 100, 2) if initial_distance else 0.0,
+        'elapsed_ms': round(elapsed_ms, 2),
+    }
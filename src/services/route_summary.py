@@ -0,0 +1,46 @@
+from src.services.geo import haversine_km, spot_coordinates
+
+# Velocidade média usada para estimar o tempo de percurso (km/h)
+AVERAGE_SPEED_KMH = 50
+
+
+def estimated_minutes(distance_km):
+    """Tempo estimado (minutos inteiros) para percorrer a distância"""
+    return int(distance_km / AVERAGE_SPEED_KMH * 60)
+
+
+def summarize_points(points):
+    """Métricas de geometria de uma sequência de pontos turísticos.
+
+    Retorna distância total (km, pelos trechos consecutivos), tempo estimado,
+    caixa envolvente e centróide. Pontos sem coordenadas são ignorados; sem
+    nenhuma coordenada, as métricas espaciais ficam como None.
+    """
+    coordinates = [c for c in (spot_coordinates(point) for point in points) if c is not None]
+
+    total_distance = sum(
+        haversine_km(lat1, lng1, lat2, lng2)
+        for (lat1, lng1), (lat2, lng2) in zip(coordinates, coordinates[1:])
+    )
+    summary = {
+        'total_distance': round(total_distance, 2),
+        'estimated_time': estimated_minutes(total_distance),
+        'min_lat': None,
+        'min_lng': None,
+        'max_lat': None,
+        'max_lng': None,
+        'centroid_lat': None,
+        'centroid_lng': None,
+    }
+    if coordinates:
+        lats = [lat for lat, _ in coordinates]
+        lngs = [lng for _, lng in coordinates]
+        summary.update({
+            'min_lat': min(lats),
+            'min_lng': min(lngs),
+            'max_lat': max(lats),
+            'max_lng': max(lngs),
+            'centroid_lat': sum(lats) / len(lats),
+            'centroid_lng': sum(lngs) / len(lngs),
+        })
+    return summary
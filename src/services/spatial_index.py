@@ -0,0 +1,116 @@
+import math
+
+from src.services.geo import EARTH_RADIUS_KM, KM_PER_DEGREE, haversine_km, spot_coordinates
+
+# Tamanho padrão da célula da grade em graus (~11 km no equador)
+DEFAULT_CELL_SIZE_DEG = 0.1
+
+# Maior distância possível na superfície da Terra (meia circunferência)
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+class SpatialGridIndex:
+    """Índice espacial em grade regular de latitude/longitude.
+
+    Cada item é colocado em uma célula de ``cell_size`` graus. Consultas por
+    raio visitam apenas as células que intersectam a caixa envolvente do
+    círculo e confirmam os candidatos com a distância Haversine exata.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE_DEG):
+        self.cell_size = cell_size
+        self.lng_cells = int(math.ceil(360.0 / cell_size))
+        self._cells = {}
+        self._size = 0
+
+    @classmethod
+    def build(cls, spots, cell_size=DEFAULT_CELL_SIZE_DEG):
+        """Constrói o índice a partir de pontos no formato do catálogo"""
+        index = cls(cell_size)
+        for spot in spots:
+            coords = spot_coordinates(spot)
+            if coords is not None:
+                index.insert(coords[0], coords[1], spot)
+        return index
+
+    def __len__(self):
+        return self._size
+
+    def _cell_row(self, lat):
+        return int(math.floor((lat + 90.0) / self.cell_size))
+
+    def _cell_col(self, lng):
+        return int(math.floor((lng + 180.0) / self.cell_size)) % self.lng_cells
+
+    def insert(self, lat, lng, item):
+        key = (self._cell_row(lat), self._cell_col(lng))
+        self._cells.setdefault(key, []).append((lat, lng, item))
+        self._size += 1
+
+    def _candidate_cells(self, lat, lng, radius_km):
+        """Células que podem conter pontos a até radius_km de (lat, lng)"""
+        dlat = radius_km / KM_PER_DEGREE
+        min_lat = max(-90.0, lat - dlat)
+        max_lat = min(90.0, lat + dlat)
+        rows = range(self._cell_row(min_lat), self._cell_row(max_lat) + 1)
+
+        # Largura em longitude no paralelo mais distante do equador da faixa
+        max_abs_lat = max(abs(min_lat), abs(max_lat))
+        cos_lat = math.cos(math.radians(max_abs_lat))
+        if max_abs_lat >= 90.0 or cos_lat <= 1e-9:
+            cols = range(self.lng_cells)
+        else:
+            dlng = dlat / cos_lat
+            if dlng >= 180.0:
+                cols = range(self.lng_cells)
+            else:
+                first = int(math.floor((lng - dlng + 180.0) / self.cell_size))
+                last = int(math.floor((lng + dlng + 180.0) / self.cell_size))
+                cols = [c % self.lng_cells for c in range(first, min(last, first + self.lng_cells - 1) + 1)]
+
+        # Com poucas células ocupadas é mais barato varrê-las diretamente
+        if len(rows) * len(cols) > len(self._cells):
+            row_set = set(rows)
+            col_set = set(cols)
+            return [entries for (row, col), entries in self._cells.items()
+                    if row in row_set and col in col_set]
+
+        cells = []
+        for row in rows:
+            for col in cols:
+                entries = self._cells.get((row, col))
+                if entries:
+                    cells.append(entries)
+        return cells
+
+    def within_radius(self, lat, lng, radius_km, predicate=None):
+        """Itens a até radius_km, como lista de (distância, item) ordenada"""
+        if radius_km < 0:
+            return []
+        results = []
+        for entries in self._candidate_cells(lat, lng, radius_km):
+            for spot_lat, spot_lng, item in entries:
+                if predicate is not None and not predicate(item):
+                    continue
+                distance = haversine_km(lat, lng, spot_lat, spot_lng)
+                if distance <= radius_km:
+                    results.append((distance, item))
+        results.sort(key=lambda pair: pair[0])
+        return results
+
+    def nearest(self, lat, lng, k, max_radius_km=None, predicate=None):
+        """Os k itens mais próximos, como lista de (distância, item) ordenada.
+
+        O raio de busca dobra a cada rodada até conter k itens; como a
+        consulta por raio é exata, os k menores dentro dele são os k vizinhos
+        mais próximos.
+        """
+        if k <= 0 or self._size == 0:
+            return []
+        limit = MAX_DISTANCE_KM if max_radius_km is None else min(max_radius_km, MAX_DISTANCE_KM)
+        radius = min(self.cell_size * KM_PER_DEGREE, limit)
+        while True:
+            found = self.within_radius(lat, lng, radius, predicate)
+            if len(found) >= k or radius >= limit:
+                return found[:k]
+            radius = min(radius * 2, limit)
@@ -0,0 +1,136 @@
+import bisect
+import functools
+import re
+import unicodedata
+
+# Peso de cada campo na pontuação de relevância
+DEFAULT_FIELD_WEIGHTS = {
+    'nome': 3.0,
+    'categoria': 2.0,
+    'descricao': 1.0,
+}
+
+# Termos mais curtos que isso só casam de forma exata (evita expandir "a" para todo o vocabulário)
+MIN_PREFIX_LENGTH = 2
+
+# Fator aplicado quando o termo casa apenas como prefixo
+PREFIX_MATCH_FACTOR = 0.5
+
+# Consultas recentes com o ranking já calculado (o índice não muda depois de build)
+QUERY_CACHE_SIZE = 64
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def fold_text(text):
+    """Remove acentos e normaliza caixa ("Pão de Açúcar" -> "pao de acucar")"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    """Divide o texto (já sem acentos) em termos"""
+    return _TOKEN_RE.findall(fold_text(text))
+
+
+class InvertedIndex:
+    """Índice invertido com dobra de acentos e busca por prefixo.
+
+    Para cada campo indexado guarda ``termo -> {documento: frequência}``; o
+    vocabulário ordenado permite expandir prefixos com busca binária. Cada
+    token da consulta vira um ``{documento: pontos}`` (união das listas dos
+    seus termos); a consulta intersecta esses dicts, começando pelo menor.
+    """
+
+    def __init__(self, field_weights=None):
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+        self._postings = {field: {} for field in self.field_weights}
+        self._vocabulary = []
+        self._docs = []
+        self._ranked = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._rank)
+
+    @classmethod
+    def build(cls, docs, field_weights=None):
+        index = cls(field_weights)
+        for doc in docs:
+            index._add(doc)
+        index._vocabulary = sorted({term for postings in index._postings.values() for term in postings})
+        return index
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _add(self, doc):
+        doc_idx = len(self._docs)
+        self._docs.append(doc)
+        for field, postings in self._postings.items():
+            for term in tokenize(doc.get(field)):
+                docs = postings.setdefault(term, {})
+                docs[doc_idx] = docs.get(doc_idx, 0) + 1
+
+    def _expand(self, token):
+        """Termos do vocabulário que casam com o token (exato ou prefixo)"""
+        if len(token) < MIN_PREFIX_LENGTH:
+            return [token]
+        vocabulary = self._vocabulary
+        position = bisect.bisect_left(vocabulary, token)
+        terms = []
+        while position < len(vocabulary) and vocabulary[position].startswith(token):
+            terms.append(vocabulary[position])
+            position += 1
+        return terms
+
+    def _token_scores(self, token, fields):
+        """Pontuação de cada documento que casa com o token: ``{documento: pontos}``.
+
+        Une uma única vez as listas dos termos expandidos; em cada campo o
+        documento conta pelo melhor termo (exato vale mais que prefixo).
+        """
+        terms = self._expand(token)
+        scores = {}
+        for field in fields:
+            postings = self._postings[field]
+            weight = self.field_weights[field]
+            best = {}
+            # O termo exato (se existir) vem primeiro: nos demais só entram documentos novos
+            if token in postings:
+                best = dict.fromkeys(postings[token], weight)
+            prefix_weight = weight * PREFIX_MATCH_FACTOR
+            for term in terms:
+                if term == token:
+                    continue
+                docs = postings.get(term)
+                if docs:
+                    for doc_idx in docs:
+                        best.setdefault(doc_idx, prefix_weight)
+            for doc_idx, score in best.items():
+                scores[doc_idx] = scores.get(doc_idx, 0) + score
+        return scores
+
+    def _rank(self, tokens, fields):
+        """Índices dos documentos que contêm todos os tokens, por relevância"""
+        # Interseção começando pelo token com menos documentos; o resto é consulta em dict
+        per_token = sorted((self._token_scores(token, fields) for token in tokens), key=len)
+        totals = per_token[0]
+        for scores in per_token[1:]:
+            totals = {doc_idx: total + scores[doc_idx] for doc_idx, total in totals.items() if doc_idx in scores}
+            if not totals:
+                return ()
+        # Maior pontuação primeiro; empates pela ordem de inserção (sort estável)
+        ranked = sorted(totals)
+        ranked.sort(key=totals.__getitem__, reverse=True)
+        return tuple(ranked)
+
+    def search(self, query, fields=None, limit=None):
+        """Documentos que contêm todos os termos da consulta, por relevância"""
+        tokens = tuple(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        fields = tuple(f for f in (fields or self.field_weights) if f in self._postings)
+
+        ranked = self._ranked(tokens, fields)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self._docs[doc_idx] for doc_idx in ranked]
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from src.services.spatial_index import SpatialGridIndex
+from src.services.text_index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+# Caminho padrão do catálogo: tourist_spots.json na raiz do projeto
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'tourist_spots.json'
+)
+
+
+class TouristSpotCatalog:
+    """Catálogo de pontos turísticos mantido em memória.
+
+    O arquivo JSON é lido uma única vez e recarregado apenas quando seu
+    mtime/tamanho muda ou quando ``reload()`` é chamado explicitamente.
+    É seguro para uso em workers WSGI multi-thread.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH, check_interval=1.0):
+        self.path = path
+        # Intervalo mínimo (segundos) entre verificações do arquivo em disco
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._spots = []
+        self._by_id = {}
+        self._spatial_index = SpatialGridIndex()
+        self._text_index = InvertedIndex()
+        self._signature = None
+        self._last_check = 0.0
+        self._loaded = False
+        self.hits = 0
+        self.reloads = 0
+        self.errors = 0
+
+    def _file_signature(self):
+        """Retorna (mtime, tamanho) do arquivo ou None se não existir"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_file(self):
+        """Lê e normaliza o conteúdo do arquivo JSON"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # Se contém um objeto com chave "tourist_spots", extrai a lista
+        if isinstance(data, dict) and 'tourist_spots' in data:
+            data = data['tourist_spots']
+        if not isinstance(data, list):
+            raise ValueError('Formato inválido do catálogo de pontos turísticos')
+        return data
+
+    def _load(self, signature):
+        """Recarrega o catálogo (deve ser chamado com o lock adquirido)"""
+        try:
+            spots = self._read_file()
+        except Exception as e:
+            self.errors += 1
+            logger.error('Erro ao carregar pontos turísticos: %s', e)
+            # Mantém a última versão válida em memória
+            if not self._loaded:
+                self._spots = []
+                self._by_id = {}
+                self._spatial_index = SpatialGridIndex()
+                self._text_index = InvertedIndex()
+            self._signature = signature
+            self._loaded = True
+            return
+
+        self._spots = spots
+        self._by_id = {spot['id']: spot for spot in spots if 'id' in spot}
+        self._spatial_index = SpatialGridIndex.build(spots)
+        self._text_index = InvertedIndex.build(spots)
+        self._signature = signature
+        self._loaded = True
+        self.reloads += 1
+
+    def _ensure_fresh(self):
+        """Recarrega o catálogo se o arquivo foi alterado desde a última leitura"""
+        now = time.monotonic()
+        if self._loaded and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            if self._loaded and now - self._last_check < self.check_interval:
+                return
+            signature = self._file_signature()
+            self._last_check = now
+            if not self._loaded or signature != self._signature:
+                self._load(signature)
+
+    def reload(self):
+        """Força a releitura do arquivo, independentemente de alterações"""
+        with self._lock:
+            self._last_check = time.monotonic()
+            self._load(self._file_signature())
+        return self.stats()
+
+    def get_all(self):
+        """Retorna a lista de pontos turísticos (cópia rasa da lista)"""
+        self._ensure_fresh()
+        with self._lock:
+            self.hits += 1
+            return list(self._spots)
+
+    def get(self, spot_id):
+        """Retorna um ponto turístico pelo id ou None"""
+        self._ensure_fresh()
+        with self._lock:
+            self.hits += 1
+            return self._by_id.get(spot_id)
+
+    def version(self):
+        """(mtime, tamanho) do arquivo carregado; muda a cada alteração do catálogo"""
+        self._ensure_fresh()
+        with self._lock:
+            return self._signature
+
+    def within_radius(self, lat, lng, radius_km, predicate=None):
+        """Pontos a até radius_km de (lat, lng), ordenados por distância"""
+        self._ensure_fresh()
+        with self._lock:
+            self.hits += 1
+            index = self._spatial_index
+        return index.within_radius(lat, lng, radius_km, predicate)
+
+    def nearest(self, lat, lng, k, max_radius_km=None, predicate=None):
+        """Os k pontos mais próximos de (lat, lng), ordenados por distância"""
+        self._ensure_fresh()
+        with self._lock:
+            self.hits += 1
+            index = self._spatial_index
+        return index.nearest(lat, lng, k, max_radius_km, predicate)
+
+    def search(self, query, fields=None, limit=None):
+        """Busca textual (sem acentos, por prefixo) ordenada por relevância"""
+        self._ensure_fresh()
+        with self._lock:
+            self.hits += 1
+            index = self._text_index
+        return index.search(query, fields, limit)
+
+    def stats(self):
+        """Contadores de uso do catálogo"""
+        with self._lock:
+            return {
+                'path': self.path,
+                'spots': len(self._spots),
+                'hits': self.hits,
+                'reloads': self.reloads,
+                'errors': self.errors,
+                'mtime_ns': self._signature[0] if self._signature else None,
+                'size': self._signature[1] if self._signature else None,
+            }
+
+
+# Instância compartilhada pelo processo
+catalog = TouristSpotCatalog()
@@ -7,6 +7,7 @@ let selectedSpots = [];
 let allSpots = [];
 let allRoutes = [];
 let availableSpots = []; // Todos os pontos disponíveis (locais + externos)
+let editingRouteETag = null; // Versão da rota em edição (If-Match no PUT)
 
 // Elementos DOM
 const sections = {
@@ -261,13 +262,23 @@ async function requestUserLocation() {
 async function loadRoutes() {
     try {
         showLoading('routes-list');
-        const response = await fetch(`${API_BASE_URL}/routes`);
+        // A listagem é paginada: seguir o cabeçalho X-Next-Cursor até a última página
+        const routes = [];
+        let cursor = null;
+        do {
+            const url = cursor
+                ? `${API_BASE_URL}/routes?cursor=${encodeURIComponent(cursor)}`
+                : `${API_BASE_URL}/routes`;
+            const response = await fetch(url);
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
 
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
+            routes.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
 
-        const routes = await response.json();
         allRoutes = routes;
         displayRoutes(routes);
     } catch (error) {
@@ -2476,6 +2487,7 @@ async function editRoute(routeId) {
 
         if (response.ok) {
             const route = await response.json();
+            editingRouteETag = response.headers.get('ETag');
             console.log('Rota carregada para edição:', route);
 
             // Preencher dados da rota no formulário
@@ -2561,19 +2573,27 @@ async function updateRoute(routeId) {
     };
 
     try {
+        const headers = {
+            'Content-Type': 'application/json',
+        };
+        // Só grava se a rota não mudou desde que foi carregada (409 caso contrário)
+        if (editingRouteETag) {
+            headers['If-Match'] = editingRouteETag;
+        }
         const response = await fetch(`${API_BASE_URL}/routes/${routeId}`, {
             method: 'PUT',
-            headers: {
-                'Content-Type': 'application/json',
-            },
+            headers: headers,
             body: JSON.stringify(routeData)
         });
 
         if (response.ok) {
+            editingRouteETag = response.headers.get('ETag');
             showNotification('Rota atualizada com sucesso!', 'success');
             cancelEdit();
             loadRoutes();
             showSection('routes');
+        } else if (response.status === 409) {
+            showNotification('A rota foi alterada em outra aba ou dispositivo. Recarregue antes de salvar.', 'error');
         } else {
             throw new Error('Erro ao atualizar rota');
         }
@@ -2588,6 +2608,7 @@ function cancelEdit() {
     // Limpar formulário
     document.getElementById('create-route-form').reset();
     selectedSpots = [];
+    editingRouteETag = null;
     updateSelectedSpotsDisplay();
 
     // Restaurar botão submit
@@ -6,7 +6,11 @@ import pytest
 import tempfile
 import os
 import json
+import threading
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import func
 
 # Import da aplicação Flask
 import sys
@@ -120,6 +124,93 @@ def mock_geolocation_data():
     }
 
 
+class FakeHTTPServer:
+    """Servidor HTTP local que responde com JSON configurável e registra as requisições"""
+
+    def __init__(self):
+        self.requests = []
+        # Função (method, path, body) -> (status, payload)
+        self.handler = lambda method, path, body: (200, [])
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('utf-8') if length else ''
+                fake.requests.append((method, self.path, body))
+                status, payload = fake.handler(method, self.path, body)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def fake_http_server():
+    """Servidor HTTP local para simular APIs externas (Nominatim, Overpass, OSRM)"""
+    server = FakeHTTPServer()
+    yield server
+    server.close()
+
+
+class RouteFactory:
+    """Cria rotas no banco compartilhado pelos testes para um usuário exclusivo.
+
+    ``user_id`` é um usuário sem nenhuma rota no início do teste; ``cleanup``
+    remove todas as rotas dele, inclusive as criadas pela API durante o teste.
+    """
+
+    def __init__(self):
+        self.user_id = (db.session.query(func.max(Route.user_id)).scalar() or 0) + 1
+
+    def __call__(self, pontos=None, commit=True, **campos):
+        """Cria uma rota com os pontos informados; campos sobrescrevem nome, data_inicio, etc."""
+        campos.setdefault('nome', 'Rota de teste')
+        campos.setdefault('data_inicio', datetime(2030, 1, 1, 9, 0))
+        campos.setdefault('user_id', self.user_id)
+        rota = Route(**campos)
+        if pontos is not None:
+            rota.set_pontos_turisticos(pontos)
+        db.session.add(rota)
+        if commit:
+            db.session.commit()
+        return rota
+
+    def cleanup(self):
+        db.session.rollback()
+        for rota in Route.query.filter_by(user_id=self.user_id).all():
+            db.session.delete(rota)
+        db.session.commit()
+
+
+@pytest.fixture
+def route_factory(client):
+    """Fábrica de rotas de um usuário exclusivo do teste, removidas ao final"""
+    factory = RouteFactory()
+    yield factory
+    factory.cleanup()
+
+
 # Fixture para limpar banco de dados após cada teste
 @pytest.fixture(autouse=True)
 def cleanup_database():
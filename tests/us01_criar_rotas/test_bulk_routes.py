@@ -0,0 +1,134 @@
+"""
+Testes de API para importação e exportação de rotas em lote (NDJSON)
+Funcionalidade testada: US01 (Criar rotas turísticas)
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.route import Route
+from src.routes import routes
+
+
+def _rota(usuario, i, **campos):
+    rota = {
+        'nome': f'Rota importada {i}',
+        'data_inicio': (datetime.now() + timedelta(days=30)).replace(microsecond=0).isoformat(),
+        'pontos_turisticos': [{'id': i, 'nome': f'Ponto {i}',
+                               'localizacao': {'latitude': -22.9, 'longitude': -43.2}}],
+        'user_id': usuario,
+    }
+    rota.update(campos)
+    return rota
+
+
+def _ndjson(linhas):
+    return '\n'.join(linha if isinstance(linha, str) else json.dumps(linha) for linha in linhas) + '\n'
+
+
+@pytest.fixture
+def usuario(route_factory):
+    """Usuário do teste; as rotas importadas para ele são removidas ao final"""
+    return route_factory.user_id
+
+
+def _importar(client, usuario, linhas):
+    return client.post(f'/api/routes/bulk?user_id={usuario}', data=_ndjson(linhas),
+                       content_type='application/x-ndjson')
+
+
+class TestImportacaoEmLote:
+    """Testes para POST /api/routes/bulk"""
+
+    def test_importar_rotas_validas(self, client, usuario, monkeypatch):
+        """
+        Critério: Todas as linhas válidas são gravadas, em lotes
+        """
+        monkeypatch.setattr(routes, 'BULK_BATCH_SIZE', 4)
+
+        response = _importar(client, usuario, [_rota(usuario, i) for i in range(10)])
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['created'] == 10
+        assert data['failed'] == 0
+        assert Route.query.filter_by(user_id=usuario).count() == 10
+
+    def test_erros_por_linha(self, client, usuario):
+        """
+        Critério: Linhas inválidas são reportadas com número e motivo, sem impedir as demais
+        """
+        linhas = [
+            _rota(usuario, 1),
+            _rota(usuario, 2, nome=''),
+            '{json quebrado',
+            _rota(usuario, 4, data_inicio='2020-01-01T09:00:00'),
+            _rota(usuario, 5, pontos_turisticos=[{'id': i} for i in range(routes.MAX_ROUTE_POINTS + 1)]),
+            '',
+            _rota(usuario, 7),
+        ]
+
+        data = json.loads(_importar(client, usuario, linhas).data)
+
+        assert data['created'] == 2
+        assert data['failed'] == 4
+        erros = {erro['line']: erro['error'] for erro in data['errors']}
+        assert erros[2] == 'Nome da rota é obrigatório'
+        assert erros[3].startswith('JSON inválido')
+        assert erros[4] == 'Data de início deve ser futura'
+        assert 'Máximo de' in erros[5]
+
+    def test_datas_com_fuso(self, client, usuario):
+        """
+        Critério: Datas com "Z" ou deslocamento passam pela mesma validação das demais
+        """
+        linhas = [_rota(usuario, 1, data_inicio='2030-01-01T09:00:00Z'),
+                  _rota(usuario, 2, data_inicio='2020-01-01T09:00:00-03:00')]
+
+        data = json.loads(_importar(client, usuario, linhas).data)
+
+        assert data['created'] == 1
+        assert data['errors'] == [{'line': 2, 'error': 'Data de início deve ser futura'}]
+
+    def test_user_id_padrao_da_query(self, client, usuario):
+        rota = _rota(usuario, 1)
+        del rota['user_id']
+
+        _importar(client, usuario, [rota])
+
+        assert Route.query.filter_by(user_id=usuario).count() == 1
+
+    def test_corpo_vazio(self, client):
+        response = client.post('/api/routes/bulk', data='', content_type='application/x-ndjson')
+
+        assert response.status_code == 400
+
+
+class TestExportacao:
+    """Testes para GET /api/routes/export"""
+
+    def test_exportar_ndjson(self, client, usuario, monkeypatch):
+        """
+        Critério: Todas as rotas do usuário saem em NDJSON, uma por linha
+        """
+        monkeypatch.setattr(routes, 'EXPORT_BATCH_SIZE', 3)
+        _importar(client, usuario, [_rota(usuario, i) for i in range(7)])
+
+        response = client.get(f'/api/routes/export?user_id={usuario}')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        linhas = [json.loads(linha) for linha in response.data.decode('utf-8').splitlines()]
+        assert [linha['nome'] for linha in linhas] == [f'Rota importada {i}' for i in range(7)]
+        assert linhas[0]['pontos_turisticos'][0]['nome'] == 'Ponto 0'
+
+    def test_exportacao_pode_ser_reimportada(self, client, usuario):
+        _importar(client, usuario, [_rota(usuario, i) for i in range(3)])
+        exportado = client.get(f'/api/routes/export?user_id={usuario}').data.decode('utf-8')
+
+        data = json.loads(client.post('/api/routes/bulk', data=exportado,
+                                      content_type='application/x-ndjson').data)
+
+        assert data['created'] == 3
+        assert Route.query.filter_by(user_id=usuario).count() == 6
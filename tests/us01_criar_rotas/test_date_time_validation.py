@@ -53,3 +53,33 @@ class TestDateTimeValidation:
         assert response.status_code == 201
         data = json.loads(response.data)
         assert data['nome'] == sample_route_data['nome']
+
+    @pytest.mark.parametrize('sufixo, horas', [('Z', 0), ('+00:00', 0), ('-03:00', 3)])
+    def test_criar_rota_data_com_fuso(self, client, route_factory, sample_route_data, sufixo, horas):
+        """
+        Teste US01: Criar rota com data ISO com fuso horário (ex.: "Z" do JavaScript)
+
+        Critério: Deve aceitar e gravar a data convertida para UTC, em vez de falhar com 500
+        """
+        from src.models.route import Route
+
+        sample_route_data["nome"] = "Rota Data com Fuso"
+        sample_route_data["data_inicio"] = "2030-08-15T09:00:00" + sufixo
+        sample_route_data["user_id"] = route_factory.user_id
+
+        response = client.post('/api/routes',
+                             data=json.dumps(sample_route_data),
+                             content_type='application/json')
+
+        assert response.status_code == 201
+        rota = Route.query.filter_by(user_id=route_factory.user_id).one()
+        assert rota.data_inicio == datetime(2030, 8, 15, 9 + horas, 0)
+
+    def test_criar_rota_data_passada_com_fuso(self, client, sample_route_data):
+        sample_route_data["data_inicio"] = "2020-08-15T09:00:00Z"
+
+        response = client.post('/api/routes',
+                             data=json.dumps(sample_route_data),
+                             content_type='application/json')
+
+        assert response.status_code == 400
@@ -0,0 +1,178 @@
+"""
+Testes unitários para a matriz de distâncias Haversine
+Funcionalidade testada: US01 (Criar rotas e otimizar o planejamento)
+"""
+import json
+
+import pytest
+import numpy as np
+
+from src.routes import routes
+from src.routes.routes import calculate_route_data, optimize_points_order
+from src.services.distance_matrix import distance_matrix, haversine_matrix, leg_distances, matrix_cache
+from src.services.geo import haversine_km
+
+
+COORDENADAS = [
+    (-22.951916, -43.210487),  # Cristo Redentor
+    (-22.948658, -43.157444),  # Pão de Açúcar
+    (-22.971177, -43.182543),  # Copacabana
+    (-15.799800, -47.864500),  # Congresso Nacional
+]
+
+
+def _ponto(id_, lat, lng):
+    return {'id': id_, 'nome': f'Ponto {id_}', 'localizacao': {'latitude': lat, 'longitude': lng}}
+
+
+class TestDistanceMatrix:
+    """Testes para o cálculo vetorizado da matriz de distâncias"""
+
+    def test_matriz_igual_calculo_escalar(self):
+        """
+        Critério: Cada célula deve ser igual à distância Haversine do par
+        """
+        matrix = haversine_matrix(COORDENADAS)
+
+        assert matrix.shape == (4, 4)
+        for i, (lat1, lng1) in enumerate(COORDENADAS):
+            for j, (lat2, lng2) in enumerate(COORDENADAS):
+                assert matrix[i, j] == pytest.approx(haversine_km(lat1, lng1, lat2, lng2), abs=1e-6)
+
+    def test_matriz_simetrica_com_diagonal_zero(self):
+        matrix = haversine_matrix(COORDENADAS)
+
+        assert np.allclose(matrix, matrix.T)
+        assert np.allclose(np.diag(matrix), 0)
+
+    def test_cache_reaproveitado_para_permutacoes(self):
+        """
+        Critério: Outra ordem do mesmo conjunto reaproveita a matriz em cache
+        """
+        matrix_cache.clear()
+        original = distance_matrix(COORDENADAS)
+        hits_antes = matrix_cache.stats()['hits']
+
+        invertida = distance_matrix(COORDENADAS[::-1])
+
+        assert matrix_cache.stats()['hits'] == hits_antes + 1
+        assert np.allclose(invertida, original[::-1, ::-1])
+
+    def test_sem_cache(self):
+        matrix = distance_matrix(COORDENADAS, use_cache=False)
+
+        assert np.allclose(matrix, haversine_matrix(COORDENADAS))
+
+    def test_coordenadas_repetidas(self):
+        """
+        Critério: Pontos repetidos na rota têm distância zero entre si
+        """
+        matrix = distance_matrix([COORDENADAS[0], COORDENADAS[1], COORDENADAS[0]])
+
+        assert matrix.shape == (3, 3)
+        assert matrix[0, 2] == 0
+
+    def test_trechos_consecutivos(self):
+        """
+        Critério: Os N-1 trechos são os mesmos da diagonal acima da principal na matriz
+        """
+        trechos = leg_distances(COORDENADAS)
+
+        assert trechos.shape == (3,)
+        assert np.allclose(trechos, np.diag(haversine_matrix(COORDENADAS), 1))
+        assert leg_distances(COORDENADAS[:1]).shape == (0,)
+
+
+class TestUsoDaMatriz:
+    """Testes do otimizador e do cálculo da rota sobre a matriz compartilhada"""
+
+    def test_otimizador_usa_distancia_haversine(self):
+        """
+        Critério: O vizinho mais próximo é escolhido pela distância real
+        """
+        pontos = [_ponto(i + 1, lat, lng) for i, (lat, lng) in enumerate(COORDENADAS)]
+        pontos = [pontos[0], pontos[3], pontos[1], pontos[2]]
+
+        ordem = optimize_points_order(pontos)
+
+        assert [p['id'] for p in ordem] == [1, 3, 2, 4]
+
+    def test_dados_da_rota(self):
+        """
+        Critério: Distância total é a soma dos trechos consecutivos
+        """
+        pontos = [_ponto(i + 1, lat, lng) for i, (lat, lng) in enumerate(COORDENADAS[:3])]
+
+        dados = calculate_route_data(pontos)
+
+        esperado = (haversine_km(*COORDENADAS[0], *COORDENADAS[1]) +
+                    haversine_km(*COORDENADAS[1], *COORDENADAS[2]))
+        assert dados['total_distance'] == round(esperado, 2)
+        assert len(dados['segments']) == 2
+
+    def test_dados_da_rota_com_um_ponto(self):
+        dados = calculate_route_data([_ponto(1, *COORDENADAS[0])])
+
+        assert dados['total_distance'] == 0
+        assert dados['segments'] == []
+
+    def test_dados_da_rota_sem_matriz(self, monkeypatch):
+        """
+        Critério: Sem trechos informados, só os consecutivos são calculados (nada de N×N)
+        """
+        def proibida(*args, **kwargs):
+            raise AssertionError('matriz N×N não deveria ser montada')
+
+        monkeypatch.setattr(routes, 'distance_matrix', proibida)
+        pontos = [_ponto(i + 1, lat, lng) for i, (lat, lng) in enumerate(COORDENADAS)]
+
+        dados = calculate_route_data(pontos)
+
+        assert len(dados['segments']) == 3
+
+    def test_dados_da_rota_com_trechos_informados(self):
+        pontos = [_ponto(i + 1, lat, lng) for i, (lat, lng) in enumerate(COORDENADAS[:3])]
+
+        dados = calculate_route_data(pontos, [1.5, 2.25])
+
+        assert [segmento['distance'] for segmento in dados['segments']] == [1.5, 2.25]
+        assert dados['total_distance'] == 3.75
+
+    @pytest.fixture
+    def contar_matrizes(self, monkeypatch):
+        chamadas = []
+
+        def contar(coordinates, *args, **kwargs):
+            chamadas.append(len(coordinates))
+            return distance_matrix(coordinates, *args, **kwargs)
+
+        monkeypatch.setattr(routes, 'distance_matrix', contar)
+        return chamadas
+
+    @staticmethod
+    def _conferir_dados(response):
+        assert response.status_code == 200
+        dados = json.loads(response.data)['route_data']
+        assert len(dados['segments']) == 3
+        assert sum(segmento['distance'] for segmento in dados['segments']) == pytest.approx(
+            dados['total_distance'], abs=0.01)
+
+    def test_calculate_route_monta_a_matriz_uma_vez(self, client, contar_matrizes):
+        """
+        Critério: A matriz da otimização é reaproveitada para os dados da rota
+        """
+        pontos = [_ponto(i + 1, lat, lng) for i, (lat, lng) in enumerate(COORDENADAS)]
+
+        response = client.post('/api/calculate-route', data=json.dumps({'points': pontos}),
+                               content_type='application/json')
+
+        self._conferir_dados(response)
+        assert contar_matrizes == [4]
+
+    def test_optimize_monta_a_matriz_uma_vez(self, client, route_factory, contar_matrizes):
+        rota = route_factory([_ponto(i + 1, lat, lng) for i, (lat, lng) in enumerate(COORDENADAS)])
+
+        response = client.post(f'/api/routes/{rota.id}/optimize')
+
+        self._conferir_dados(response)
+        assert contar_matrizes == [4]
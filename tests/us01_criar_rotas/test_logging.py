@@ -0,0 +1,114 @@
+"""
+Testes do logging estruturado (níveis, request ID e amostragem de payloads)
+Funcionalidade testada: US01 (Criar rotas turísticas)
+"""
+import io
+import json
+import logging
+
+import pytest
+
+from src.services import logging_config
+from src.services.logging_config import JsonFormatter, RequestIdFilter, log_payload
+
+
+@pytest.fixture
+def logger_teste():
+    logger = logging.getLogger('teste.logging')
+    nivel = logger.level
+    yield logger
+    logger.setLevel(nivel)
+
+
+class TestRequestId:
+    """Testes do cabeçalho X-Request-ID"""
+
+    def test_gera_request_id(self, client):
+        response = client.get('/api/routes/0')
+
+        assert len(response.headers['X-Request-ID']) == 32
+
+    def test_propaga_request_id_recebido(self, client):
+        response = client.get('/api/routes/0', headers={'X-Request-ID': 'abc-123'})
+
+        assert response.headers['X-Request-ID'] == 'abc-123'
+
+
+class TestCriacaoDeRota:
+    """O POST /api/routes não deve despejar payloads nem tracebacks"""
+
+    def test_erro_sem_traceback_na_resposta(self, client):
+        response = client.post('/api/routes', data='{json quebrado', content_type='application/json')
+
+        data = json.loads(response.data)
+        assert 'traceback' not in data
+        assert 'error' in data
+
+    def test_nada_escrito_no_stdout(self, client, capsys):
+        client.post('/api/routes', data=json.dumps({'nome': ''}), content_type='application/json')
+
+        assert 'Headers' not in capsys.readouterr().out
+
+
+class TestLogPayload:
+    """Testes de log_payload (DEBUG com amostragem e avaliação preguiçosa)"""
+
+    def test_sem_debug_nao_calcula_payload(self, logger_teste):
+        logger_teste.setLevel(logging.WARNING)
+        chamadas = []
+
+        log_payload(logger_teste, 'payload', lambda: chamadas.append(1), sample_rate=1)
+
+        assert chamadas == []
+
+    def test_amostragem(self, logger_teste, caplog):
+        logger_teste.setLevel(logging.DEBUG)
+        chamadas = []
+
+        with caplog.at_level(logging.DEBUG, logger='teste.logging'):
+            log_payload(logger_teste, 'nunca', lambda: chamadas.append(1) or 'x', sample_rate=0)
+            log_payload(logger_teste, 'sempre', lambda: 'corpo', sample_rate=1)
+
+        assert chamadas == []
+        assert [r.getMessage() for r in caplog.records] == ['sempre: corpo']
+
+    def test_payload_truncado(self, logger_teste, caplog):
+        logger_teste.setLevel(logging.DEBUG)
+
+        with caplog.at_level(logging.DEBUG, logger='teste.logging'):
+            log_payload(logger_teste, 'grande', lambda: 'x' * 10000, sample_rate=1)
+
+        assert len(caplog.records[0].getMessage()) < logging_config.LOG_PAYLOAD_MAX_CHARS + 20
+
+
+class TestFormatoJson:
+    """Testes do formatter JSON"""
+
+    def test_registro_em_json(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.addFilter(RequestIdFilter())
+        handler.setFormatter(JsonFormatter())
+        logger = logging.getLogger('teste.json')
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            logger.warning('Rota %s lenta', 42, extra={'duration_ms': 1234.5})
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+
+        entrada = json.loads(stream.getvalue())
+        assert entrada['msg'] == 'Rota 42 lenta'
+        assert entrada['level'] == 'WARNING'
+        assert entrada['request_id'] == '-'
+        assert entrada['duration_ms'] == 1234.5
+
+    def test_nivel_padrao_por_ambiente(self, monkeypatch):
+        monkeypatch.delenv('LOG_LEVEL', raising=False)
+        monkeypatch.setenv('FLASK_ENV', 'production')
+        assert logging_config.default_log_level() == 'WARNING'
+        assert logging_config.default_log_format() == 'json'
+
+        monkeypatch.setenv('LOG_LEVEL', 'debug')
+        assert logging_config.default_log_level() == 'DEBUG'
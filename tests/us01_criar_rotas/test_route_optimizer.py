@@ -0,0 +1,251 @@
+"""
+Testes unitários para o otimizador de rotas (Held-Karp, 2-opt e Or-opt)
+Funcionalidade testada: US01 (Criar rotas e otimizar o planejamento)
+"""
+import itertools
+import json
+import random
+
+import pytest
+
+from src.routes import routes
+from src.services.distance_matrix import haversine_matrix
+from src.services.route_optimizer import (
+    EXACT_MAX_POINTS, held_karp, local_search, nearest_neighbor, optimize_order, tour_length
+)
+
+
+def _matriz_aleatoria(n, seed):
+    rng = random.Random(seed)
+    return haversine_matrix([(rng.uniform(-23.1, -22.8), rng.uniform(-43.6, -43.1)) for _ in range(n)])
+
+
+def _forca_bruta(matrix, fixed_start, fixed_end, closed):
+    n = len(matrix)
+    melhor = float('inf')
+    for order in itertools.permutations(range(n)):
+        if (closed or fixed_start) and order[0] != 0:
+            continue
+        if fixed_end and not closed and order[-1] != n - 1:
+            continue
+        melhor = min(melhor, tour_length(order, matrix, closed))
+    return melhor
+
+
+OPCOES = [
+    (True, False, False),
+    (False, False, False),
+    (True, True, False),
+    (False, True, False),
+    (True, False, True),
+]
+
+
+class TestHeldKarp:
+    """Testes da otimização exata para poucos pontos"""
+
+    @pytest.mark.parametrize('fixed_start,fixed_end,closed', OPCOES)
+    def test_igual_forca_bruta(self, fixed_start, fixed_end, closed):
+        """
+        Critério: A ordem exata tem o mesmo comprimento da melhor permutação
+        """
+        for seed in range(5):
+            matrix = _matriz_aleatoria(7, seed)
+            order = held_karp(matrix, fixed_start, fixed_end, closed)
+
+            assert sorted(order) == list(range(7))
+            assert tour_length(order, matrix, closed) == pytest.approx(
+                _forca_bruta(matrix, fixed_start, fixed_end, closed))
+
+    def test_respeita_inicio_e_fim(self):
+        matrix = _matriz_aleatoria(8, 42)
+
+        order = held_karp(matrix, fixed_start=True, fixed_end=True)
+
+        assert order[0] == 0
+        assert order[-1] == 7
+
+
+class TestBuscaLocal:
+    """Testes do vizinho mais próximo + 2-opt/Or-opt"""
+
+    def test_nunca_pior_que_vizinho_mais_proximo(self):
+        """
+        Critério: A busca local parte do vizinho mais próximo e só melhora
+        """
+        for seed in range(5):
+            matrix = _matriz_aleatoria(40, seed)
+            guloso = tour_length(nearest_neighbor(matrix, 0), matrix)
+
+            order = local_search(matrix, fixed_start=True, time_budget_ms=500)
+
+            assert sorted(order) == list(range(40))
+            assert order[0] == 0
+            assert tour_length(order, matrix) <= guloso + 1e-9
+
+    @pytest.mark.parametrize('fixed_start,fixed_end,closed', OPCOES)
+    def test_respeita_restricoes(self, fixed_start, fixed_end, closed):
+        matrix = _matriz_aleatoria(25, 7)
+
+        order = local_search(matrix, fixed_start, fixed_end, closed, time_budget_ms=500)
+
+        assert sorted(order) == list(range(25))
+        if fixed_start or closed:
+            assert order[0] == 0
+        if fixed_end and not closed:
+            assert order[-1] == 24
+
+    def test_proximo_do_otimo_em_rotas_pequenas(self):
+        """
+        Critério: Em rotas pequenas a heurística fica a até 5% do ótimo
+        """
+        for seed in range(5):
+            matrix = _matriz_aleatoria(9, seed)
+            otimo = tour_length(held_karp(matrix), matrix)
+
+            order, _ = optimize_order(matrix, strategy='heuristic')
+
+            assert tour_length(order, matrix) <= otimo * 1.05
+
+
+class TestOptimizeOrder:
+    """Testes da seleção de estratégia e das estatísticas"""
+
+    def test_estatisticas(self):
+        matrix = _matriz_aleatoria(8, 3)
+
+        order, stats = optimize_order(matrix)
+
+        assert stats['strategy'] == 'exact'
+        assert stats['points'] == 8
+        assert stats['optimized_distance'] == round(tour_length(order, matrix), 2)
+        assert stats['improvement'] == pytest.approx(stats['initial_distance'] - stats['optimized_distance'], abs=0.02)
+        assert stats['improvement'] >= 0
+        assert stats['elapsed_ms'] >= 0
+
+    def test_rotas_grandes_usam_heuristica(self):
+        order, stats = optimize_order(_matriz_aleatoria(60, 1), time_budget_ms=100)
+
+        assert stats['strategy'] == 'heuristic'
+        assert sorted(order) == list(range(60))
+
+    def test_estrategia_invalida(self):
+        with pytest.raises(ValueError):
+            optimize_order(_matriz_aleatoria(4, 1), strategy='genetico')
+
+    def test_exata_limitada(self):
+        """
+        Critério: Held-Karp (exponencial) não roda acima de EXACT_MAX_POINTS pontos
+        """
+        with pytest.raises(ValueError):
+            optimize_order(_matriz_aleatoria(EXACT_MAX_POINTS + 1, 1), strategy='exact')
+
+
+class TestEndpointOtimizacao:
+    """Testes do endpoint POST /api/routes/<id>/optimize"""
+
+    def test_retorna_estatisticas(self, client, route_factory):
+        """
+        Critério: A resposta informa a melhoria sobre a ordem original e o tempo gasto
+        """
+        coordenadas = [(-22.9519, -43.2105), (-15.7998, -47.8645), (-22.9712, -43.1825), (-22.9487, -43.1574)]
+        pontos = [{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': lat, 'longitude': lng}}
+                  for i, (lat, lng) in enumerate(coordenadas)]
+        route_id = route_factory(pontos, nome='Rota Otimização').id
+
+        response = client.post(f'/api/routes/{route_id}/optimize',
+                               data=json.dumps({'closed': False}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        ids = [p['id'] for p in data['optimized_order']]
+        assert ids[0] == 0
+        assert ids[-1] == 1  # Brasília fica por último
+        assert data['optimization']['strategy'] == 'exact'
+        assert data['optimization']['improvement'] > 0
+        assert data['total_distance'] == data['optimization']['optimized_distance']
+
+    def test_estrategia_invalida(self, client, route_factory):
+        pontos = [{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9 + i / 100, 'longitude': -43.2}}
+                  for i in range(3)]
+        route_id = route_factory(pontos, nome='Rota Otimização').id
+
+        response = client.post(f'/api/routes/{route_id}/optimize',
+                               data=json.dumps({'strategy': 'genetico'}),
+                               content_type='application/json')
+
+        assert response.status_code == 400
+
+    def test_exata_com_pontos_demais(self, client, route_factory):
+        pontos = [{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9 + i / 100, 'longitude': -43.2}}
+                  for i in range(EXACT_MAX_POINTS + 1)]
+        route_id = route_factory(pontos, nome='Rota Otimização').id
+
+        response = client.post(f'/api/routes/{route_id}/optimize',
+                               data=json.dumps({'strategy': 'exact'}),
+                               content_type='application/json')
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('corpo', [
+        '{"time_budget_ms": Infinity}',
+        '{"time_budget_ms": NaN}',
+        '{"time_budget_ms": "inf"}',
+        '{"time_budget_ms": "-inf"}',
+    ])
+    def test_tempo_limite_nao_finito(self, client, route_factory, corpo):
+        pontos = [{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9 + i / 100, 'longitude': -43.2}}
+                  for i in range(3)]
+        route_id = route_factory(pontos, nome='Rota Otimização').id
+
+        response = client.post(f'/api/routes/{route_id}/optimize', data=corpo, content_type='application/json')
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('pedido, usado', [
+        (10 ** 9, routes.OPTIMIZE_MAX_TIME_BUDGET_MS),
+        (-5, 0),
+        (50, 50),
+    ])
+    def test_tempo_limite_restrito_ao_maximo(self, client, route_factory, monkeypatch, pedido, usado):
+        """
+        Critério: O tempo pedido pelo cliente não passa do máximo configurado
+        """
+        pontos = [{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9 + i / 100, 'longitude': -43.2}}
+                  for i in range(3)]
+        route_id = route_factory(pontos, nome='Rota Otimização').id
+        recebidos = []
+        original = routes.optimize_points
+
+        def espiao(points, **options):
+            recebidos.append(options['time_budget_ms'])
+            return original(points, **options)
+
+        monkeypatch.setattr(routes, 'optimize_points', espiao)
+        response = client.post(f'/api/routes/{route_id}/optimize',
+                               data=json.dumps({'time_budget_ms': pedido}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        assert recebidos == [usado]
+
+    @pytest.mark.parametrize('opcoes', [
+        {'fixed_start': 'false'},
+        {'fixed_end': 1},
+        {'closed': None},
+        {'strategy': ['exact']},
+    ])
+    def test_opcoes_invalidas(self, client, route_factory, opcoes):
+        """
+        Critério: Opções booleanas só aceitam true/false ("false" em texto não vira True)
+        """
+        pontos = [{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9 + i / 100, 'longitude': -43.2}}
+                  for i in range(3)]
+        route_id = route_factory(pontos, nome='Rota Otimização').id
+
+        response = client.post(f'/api/routes/{route_id}/optimize',
+                               data=json.dumps(opcoes),
+                               content_type='application/json')
+
+        assert response.status_code == 400
@@ -0,0 +1,190 @@
+"""
+Testes unitários para a tabela route_points
+Funcionalidade testada: US01 (Criar rotas turísticas)
+"""
+import json
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import lazyload
+
+from src.models.migrations import backfill_point_coordinates, backfill_route_points
+from src.models.route import Route
+from src.models.route_point import RoutePoint
+from src.models.user import db
+
+
+PONTOS = [
+    {'id': 1, 'nome': 'Cristo Redentor', 'descricao': 'Corcovado',
+     'localizacao': {'latitude': -22.951916, 'longitude': -43.210487}},
+    {'id': 'ext_123', 'nome': 'Mirante', 'categoria': 'Turismo - Viewpoint', 'distancia': 1.5,
+     'localizacao': {'latitude': -22.948658, 'longitude': -43.157444}},
+    7,
+]
+
+
+class TestIdaEVolta:
+    """from_point seguido de to_point devolve o ponto exatamente como informado"""
+
+    @pytest.mark.parametrize('ponto', [
+        7,
+        '12',
+        'ext_123',
+        {'id': 7},
+        {'id': '12', 'nome': 'Ponto com ID em texto'},
+        {'nome': 'Ponto sem ID', 'localizacao': {'latitude': -22.9, 'longitude': -43.2}},
+        {'id': 1, 'localizacao': {'latitude': -22.9, 'longitude': -43.2, 'precisao': 10}},
+        {'id': 2, 'localizacao': None},
+        {'id': 3, 'lat': -22.9, 'lng': -43.2, 'tags': ['praia']},
+    ])
+    def test_formato_preservado(self, route_factory, ponto):
+        rota = route_factory(commit=False)
+        rota.set_pontos_turisticos([ponto])
+        db.session.commit()
+        db.session.expire_all()
+
+        assert db.session.get(Route, rota.id).get_pontos_turisticos() == [ponto]
+
+    def test_linhas_antigas_sem_json_original(self):
+        """
+        Critério: Linhas gravadas antes de point_json continuam legíveis (reconstruídas das colunas)
+        """
+        linha = RoutePoint.from_point(0, PONTOS[0])
+        linha.point_json = None
+
+        assert linha.to_point() == PONTOS[0]
+
+
+class TestRoutePoints:
+    """Testes de leitura e escrita dos pontos em route_points"""
+
+    def test_pontos_gravados_em_linhas(self, route_factory):
+        """
+        Critério: Os pontos ficam em route_points, na ordem informada
+        """
+        rota = route_factory(commit=False)
+        rota.set_pontos_turisticos(PONTOS)
+        db.session.commit()
+
+        linhas = RoutePoint.query.filter_by(route_id=rota.id).order_by(RoutePoint.position).all()
+        assert [linha.spot_id for linha in linhas] == ['1', 'ext_123', '7']
+        assert linhas[0].latitude == -22.951916
+        assert rota.pontos_turisticos == '[]'
+
+    def test_coordenadas_de_lat_lng(self, route_factory):
+        """
+        Critério: Pontos com lat/lng também têm latitude/longitude nas colunas (busca espacial)
+        """
+        ponto = {'id': 9, 'nome': 'Praia', 'lat': -22.9711, 'lng': -43.1822}
+        rota = route_factory([ponto])
+
+        linha = RoutePoint.query.filter_by(route_id=rota.id).one()
+        assert (linha.latitude, linha.longitude) == (-22.9711, -43.1822)
+        assert rota.get_pontos_turisticos() == [ponto]
+
+    def test_backfill_de_coordenadas(self, route_factory):
+        """
+        Critério: A migração preenche as coordenadas de pontos lat/lng já gravados sem elas
+        """
+        ponto = {'id': 9, 'lat': -22.9711, 'lng': -43.1822}
+        atual = route_factory([ponto, 7])
+        antiga = route_factory([ponto])
+        ids = [atual.id, antiga.id]
+        db.session.execute(update(RoutePoint).where(RoutePoint.route_id.in_(ids))
+                           .values(latitude=None, longitude=None))
+        # Linha anterior a point_json: o ponto só existe nos campos extras
+        db.session.execute(update(RoutePoint).where(RoutePoint.route_id == antiga.id).values(point_json=None))
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            assert backfill_point_coordinates(conn) >= 2
+        with db.engine.begin() as conn:
+            assert backfill_point_coordinates(conn) == 0
+
+        db.session.expire_all()
+        linhas = RoutePoint.query.filter(RoutePoint.route_id.in_(ids), RoutePoint.latitude.isnot(None)).all()
+        assert sorted((linha.latitude, linha.longitude) for linha in linhas) == [(-22.9711, -43.1822)] * 2
+        assert db.session.get(Route, antiga.id).get_pontos_turisticos() == [ponto]
+
+    def test_leitura_preserva_formato(self, route_factory):
+        """
+        Critério: to_dict devolve os pontos no mesmo formato gravado
+        """
+        rota = route_factory(commit=False)
+        rota.set_pontos_turisticos(PONTOS)
+        db.session.commit()
+        db.session.expire_all()
+
+        assert db.session.get(Route, rota.id).to_dict()['pontos_turisticos'] == PONTOS
+
+    def test_substituir_pontos(self, route_factory):
+        rota = route_factory(commit=False)
+        rota.set_pontos_turisticos(PONTOS)
+        db.session.commit()
+
+        rota.set_pontos_turisticos(PONTOS[:1])
+        db.session.commit()
+
+        assert RoutePoint.query.filter_by(route_id=rota.id).count() == 1
+        assert rota.get_pontos_turisticos() == PONTOS[:1]
+
+    def test_rotas_antigas_usam_json(self, route_factory):
+        rota = route_factory(commit=False, pontos_turisticos=json.dumps(PONTOS[:2]))
+        db.session.commit()
+
+        assert rota.to_dict()['pontos_turisticos'] == PONTOS[:2]
+
+    def test_backfill(self, route_factory):
+        """
+        Critério: A migração copia o JSON antigo para route_points uma única vez
+        """
+        rota = route_factory(commit=False, pontos_turisticos=json.dumps(PONTOS))
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            assert backfill_route_points(conn) >= 1
+        with db.engine.begin() as conn:
+            assert backfill_route_points(conn) == 0
+
+        db.session.expire_all()
+        assert RoutePoint.query.filter_by(route_id=rota.id).count() == 3
+        assert rota.pontos_turisticos == '[]'
+        assert rota.get_pontos_turisticos() == PONTOS
+
+    def test_rotas_com_ponto(self, route_factory):
+        """
+        Critério: Rotas que passam por um ponto são encontradas por consulta indexada
+        """
+        com_ponto = route_factory(commit=False)
+        com_ponto.set_pontos_turisticos(PONTOS)
+        sem_ponto = route_factory(commit=False)
+        sem_ponto.set_pontos_turisticos(PONTOS[:1])
+        db.session.commit()
+
+        ids = {rota.id for rota in Route.containing_spot('ext_123')}
+
+        assert com_ponto.id in ids
+        assert sem_ponto.id not in ids
+
+    def test_excluir_rota_remove_pontos(self, route_factory):
+        rota = route_factory(PONTOS, nome='Rota excluída')
+        route_id = rota.id
+
+        db.session.delete(rota)
+        db.session.commit()
+
+        assert RoutePoint.query.filter_by(route_id=route_id).count() == 0
+
+    def test_excluir_rota_sem_pontos_carregados(self, route_factory):
+        """
+        Critério: Sem PRAGMA foreign_keys no SQLite, o ORM apaga os pontos mesmo não carregados
+        """
+        rota = route_factory(PONTOS, nome='Rota excluída')
+        route_id = rota.id
+        db.session.expunge_all()
+
+        rota = db.session.get(Route, route_id, options=[lazyload(Route.points)])
+        db.session.delete(rota)
+        db.session.commit()
+
+        assert RoutePoint.query.filter_by(route_id=route_id).count() == 0
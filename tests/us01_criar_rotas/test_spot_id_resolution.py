@@ -0,0 +1,106 @@
+"""
+Testes unitários para a resolução em lote de IDs de pontos turísticos
+Funcionalidade testada: US01 (Criar rotas e otimizar o planejamento)
+"""
+import json
+
+import pytest
+from sqlalchemy import event
+
+from src.models.tourist_spot import TouristSpot
+from src.models.user import db
+from src.routes import routes
+
+
+IDS_TESTE = [9101, 9102, 9103]
+
+
+def _criar_pontos():
+    db.create_all()
+    for i, spot_id in enumerate(IDS_TESTE):
+        db.session.add(TouristSpot(id=spot_id, nome=f'Ponto {spot_id}',
+                                   latitude=-22.90 - i / 100, longitude=-43.20))
+    db.session.commit()
+
+
+def _remover_pontos():
+    TouristSpot.query.filter(TouristSpot.id.in_(IDS_TESTE)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+@pytest.fixture
+def pontos_no_banco(app_context):
+    """Cria pontos turísticos na tabela e remove ao final"""
+    _criar_pontos()
+    yield IDS_TESTE
+    _remover_pontos()
+
+
+@pytest.fixture
+def consultas():
+    """Registra os SELECTs executados na tabela de pontos turísticos"""
+    executadas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'tourist_spot' in statement:
+            executadas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    yield executadas
+    event.remove(db.engine, 'before_cursor_execute', registrar)
+
+
+class TestResolucaoDeIds:
+    """Testes de routes.resolve_spot_ids e do otimizador com IDs"""
+
+    def test_uma_consulta_para_todos_os_ids(self, pontos_no_banco, consultas):
+        """
+        Critério: Todos os IDs são resolvidos com uma única consulta IN
+        """
+        resolvidos = routes.resolve_spot_ids(IDS_TESTE)
+
+        assert sorted(resolvidos) == IDS_TESTE
+        assert len(consultas) == 1
+
+    def test_mapa_de_identidade_evita_nova_consulta(self, pontos_no_banco, consultas):
+        """
+        Critério: IDs já resolvidos no mesmo contexto não voltam ao banco
+        """
+        routes.resolve_spot_ids(IDS_TESTE)
+        routes.resolve_spot_ids(IDS_TESTE + [str(IDS_TESTE[0])])
+
+        assert len(consultas) == 1
+
+    def test_ids_do_catalogo(self, app_context, consultas):
+        """
+        Critério: IDs ausentes da tabela são buscados no catálogo em memória
+        """
+        resolvidos = routes.resolve_spot_ids([1, '2'])
+
+        assert resolvidos[1]['nome'] == 'Cristo Redentor'
+        assert '2' in resolvidos
+        assert len(consultas) <= 1
+
+    def test_ids_nao_encontrados_sao_informados(self, pontos_no_banco):
+        """
+        Critério: IDs inexistentes não recebem coordenada padrão; são reportados
+        """
+        ordem, stats, _ = routes.optimize_points([9101, 999999, 9103, 'abc', 9102])
+
+        assert [p['id'] for p in ordem] == [9101, 9102, 9103]
+        assert stats['unresolved_ids'] == [999999, 'abc']
+        assert all(p['localizacao']['latitude'] != -15.7801 for p in ordem)
+
+    def test_endpoint_calculate_route(self, client):
+        _criar_pontos()
+        try:
+            response = client.post('/api/calculate-route',
+                                   data=json.dumps({'points': [9101, 9102, 888888]}),
+                                   content_type='application/json')
+        finally:
+            _remover_pontos()
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [p['id'] for p in data['optimized_points']] == [9101, 9102]
+        assert data['unresolved_ids'] == [888888]
@@ -0,0 +1,122 @@
+"""
+Testes da configuração do banco (pragmas do SQLite, pool e DATABASE_URL)
+Funcionalidade testada: US01 (Criar rotas turísticas)
+"""
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from src.models.route import Route
+from src.models.user import db
+from src.services import database
+
+
+@pytest.fixture
+def app_sqlite():
+    """Aplicação com um banco SQLite temporário configurado por configure_database"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = Flask('teste_sqlite')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    database.configure_database(app, db)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+class TestConfiguracaoBanco:
+    """Testes de database_uri, engine_options e pragmas"""
+
+    def test_pragmas_aplicados(self, app_sqlite):
+        with app_sqlite.app_context():
+            with db.engine.connect() as conn:
+                pragma = lambda name: conn.execute(text(f'PRAGMA {name}')).scalar()
+                assert pragma('journal_mode') == 'wal'
+                assert pragma('synchronous') == 1  # NORMAL
+                assert pragma('busy_timeout') == database.SQLITE_BUSY_TIMEOUT_MS
+                assert pragma('cache_size') == dict(database.SQLITE_PRAGMAS)['cache_size']
+
+    def test_database_url(self, monkeypatch):
+        """
+        Critério: DATABASE_URL troca o banco sem alterar código
+        """
+        monkeypatch.setenv('DATABASE_URL', 'postgres://usuario:senha@db:5432/turistieer')
+
+        uri = database.database_uri()
+
+        assert uri == 'postgresql://usuario:senha@db:5432/turistieer'
+        assert database.engine_options(uri)['pool_pre_ping'] is True
+
+    def test_sqlite_padrao(self, monkeypatch, tmp_path):
+        monkeypatch.delenv('DATABASE_URL', raising=False)
+
+        uri = database.database_uri(str(tmp_path))
+
+        assert uri == f"sqlite:///{tmp_path / 'app.db'}"
+        assert database.engine_options(uri)['connect_args']['check_same_thread'] is False
+
+
+class TestConcorrencia:
+    """Leituras e escritas simultâneas não devem gerar "database is locked" """
+
+    def test_escritas_e_leituras_concorrentes(self, app_sqlite):
+        escritores, rotas_por_escritor, leitores = 8, 25, 4
+        erros = []
+        inicio = threading.Barrier(escritores + leitores)
+        fim_escrita = threading.Event()
+
+        def escrever(numero):
+            with app_sqlite.app_context():
+                try:
+                    inicio.wait()
+                    for i in range(rotas_por_escritor):
+                        rota = Route(nome=f'Rota {numero}-{i}', user_id=numero,
+                                     data_inicio=datetime.now() + timedelta(days=1))
+                        rota.set_pontos_turisticos([{'id': i, 'nome': f'Ponto {i}'}])
+                        db.session.add(rota)
+                        db.session.commit()
+                        # Leitura seguida de escrita na mesma sessão
+                        rota.nome = rota.nome + ' (editada)'
+                        db.session.commit()
+                except Exception as e:
+                    erros.append(e)
+                finally:
+                    db.session.remove()
+
+        def ler():
+            with app_sqlite.app_context():
+                try:
+                    inicio.wait()
+                    while not fim_escrita.is_set():
+                        Route.query.filter_by(user_id=1).count()
+                        db.session.rollback()
+                except Exception as e:
+                    erros.append(e)
+                finally:
+                    db.session.remove()
+
+        threads = [threading.Thread(target=escrever, args=(n,)) for n in range(escritores)]
+        threads += [threading.Thread(target=ler) for _ in range(leitores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads[:escritores]:
+            thread.join()
+        fim_escrita.set()
+        for thread in threads[escritores:]:
+            thread.join()
+
+        assert erros == []
+        with app_sqlite.app_context():
+            assert Route.query.count() == escritores * rotas_por_escritor
+            assert Route.query.filter(Route.nome.like('%(editada)')).count() == escritores * rotas_por_escritor
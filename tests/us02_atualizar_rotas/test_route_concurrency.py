@@ -0,0 +1,165 @@
+"""
+Testes de API para controle de concorrência otimista das rotas
+Valida If-Match/version no PUT e a atualização parcial (PATCH)
+"""
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from src.models.user import db
+
+
+PONTOS = [
+    {'id': 1, 'nome': 'Cristo Redentor', 'localizacao': {'latitude': -22.951916, 'longitude': -43.210487}},
+    {'id': 2, 'nome': 'Pão de Açúcar', 'localizacao': {'latitude': -22.948658, 'longitude': -43.157444}},
+]
+
+
+@pytest.fixture
+def rota(route_factory):
+    return route_factory(PONTOS, nome='Rota concorrente', data_inicio=datetime(2030, 4, 1, 9, 0)).id
+
+
+def _enviar(client, method, route_id, data, etag=None):
+    headers = {'If-Match': etag} if etag else {}
+    return client.open(f'/api/routes/{route_id}', method=method, data=json.dumps(data),
+                       content_type='application/json', headers=headers)
+
+
+class TestAtualizacaoComVersao:
+    """PUT /api/routes/<id> com If-Match ou version"""
+
+    def test_versao_incrementa_a_cada_escrita(self, client, rota):
+        leitura = client.get(f'/api/routes/{rota}')
+        assert json.loads(leitura.data)['version'] == 1
+
+        response = _enviar(client, 'PUT', rota, {'nome': 'Nova'}, leitura.headers['ETag'])
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['version'] == 2
+        assert response.headers['ETag'] != leitura.headers['ETag']
+
+    def test_escrita_com_etag_antiga_falha(self, client, rota):
+        """
+        Critério: Duas edições a partir da mesma leitura: a segunda recebe 409 e não sobrescreve
+        """
+        etag = client.get(f'/api/routes/{rota}').headers['ETag']
+        assert _enviar(client, 'PUT', rota, {'nome': 'Primeira'}, etag).status_code == 200
+
+        response = _enviar(client, 'PUT', rota, {'nome': 'Segunda'}, etag)
+
+        assert response.status_code == 409
+        assert json.loads(response.data)['version'] == 2
+        assert json.loads(client.get(f'/api/routes/{rota}').data)['nome'] == 'Primeira'
+
+    def test_version_no_corpo(self, client, rota):
+        assert _enviar(client, 'PUT', rota, {'nome': 'X', 'version': 5}).status_code == 409
+        assert _enviar(client, 'PUT', rota, {'nome': 'X', 'version': 1}).status_code == 200
+
+    def test_sem_precondicao_mantem_comportamento(self, client, rota):
+        assert _enviar(client, 'PUT', rota, {'nome': 'Sem versão'}).status_code == 200
+
+    def test_etag_de_outra_rota(self, client, rota):
+        assert _enviar(client, 'PUT', rota, {'nome': 'X'}, '"route-0-v1"').status_code == 409
+
+    def test_conflito_entre_leitura_e_commit(self, client, rota):
+        """
+        Critério: Uma escrita concorrente entre o SELECT e o UPDATE também resulta em 409
+        """
+        executada = []
+
+        def escrita_concorrente(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('UPDATE route SET') and not executada:
+                executada.append(True)
+                cursor.execute('UPDATE route SET version = version + 1 WHERE id = ?', (rota,))
+
+        event.listen(db.engine, 'before_cursor_execute', escrita_concorrente)
+        try:
+            response = _enviar(client, 'PUT', rota, {'nome': 'Perdida'})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', escrita_concorrente)
+
+        assert response.status_code == 409
+        assert json.loads(client.get(f'/api/routes/{rota}').data)['nome'] == 'Rota concorrente'
+
+    def test_rota_inexistente(self, client):
+        assert _enviar(client, 'PUT', 999999999, {'nome': 'X'}).status_code == 404
+
+
+class TestAtualizacaoParcial:
+    """PATCH /api/routes/<id>"""
+
+    def test_um_unico_update_sem_carregar_pontos(self, client, rota):
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = _enviar(client, 'PATCH', rota, {'nome': 'Renomeada'}, f'"route-{rota}-v1"')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['version'] == 2
+        assert data['updated_fields'] == ['nome']
+        assert response.headers['ETag'] == f'"route-{rota}-v2"'
+        assert len(consultas) == 1 and consultas[0].startswith('UPDATE route SET')
+        assert 'RETURNING' not in consultas[0]
+
+        rota_atual = json.loads(client.get(f'/api/routes/{rota}').data)
+        assert rota_atual['nome'] == 'Renomeada'
+        assert rota_atual['pontos_turisticos'] == PONTOS
+
+    def test_sem_precondicao_devolve_nova_versao(self, client, rota):
+        """
+        Critério: Sem If-Match a versão gravada é devolvida sem UPDATE ... RETURNING
+        """
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            primeira = _enviar(client, 'PATCH', rota, {'nome': 'A'})
+            segunda = _enviar(client, 'PATCH', rota, {'nome': 'B'})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        assert json.loads(primeira.data)['version'] == 2
+        assert json.loads(segunda.data)['version'] == 3
+        assert segunda.headers['ETag'] == f'"route-{rota}-v3"'
+        assert not any('RETURNING' in consulta for consulta in consultas)
+
+    def test_substitui_pontos_e_resumo(self, client, rota):
+        response = _enviar(client, 'PATCH', rota, {'pontos_turisticos': PONTOS[::-1]})
+
+        assert response.status_code == 200
+        rota_atual = json.loads(client.get(f'/api/routes/{rota}').data)
+        assert rota_atual['pontos_turisticos'] == PONTOS[::-1]
+        assert rota_atual['summary']['total_distance'] == pytest.approx(5.43, abs=0.05)
+
+    def test_versao_desatualizada(self, client, rota):
+        assert _enviar(client, 'PATCH', rota, {'nome': 'A'}, f'"route-{rota}-v1"').status_code == 200
+
+        response = _enviar(client, 'PATCH', rota, {'nome': 'B'}, f'"route-{rota}-v1"')
+
+        assert response.status_code == 409
+        assert json.loads(client.get(f'/api/routes/{rota}').data)['nome'] == 'A'
+
+    @pytest.mark.parametrize('data', [
+        {},
+        {'nome': ''},
+        {'data_inicio': 'ontem'},
+        {'pontos_turisticos': 'nao-e-lista'},
+    ])
+    def test_corpo_invalido(self, client, rota, data):
+        assert _enviar(client, 'PATCH', rota, data).status_code == 400
+
+    def test_rota_inexistente(self, client):
+        assert _enviar(client, 'PATCH', 999999999, {'nome': 'X'}).status_code == 404
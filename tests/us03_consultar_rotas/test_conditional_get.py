@@ -0,0 +1,99 @@
+"""
+Testes de API para GET condicional (ETag/If-None-Match) das rotas
+Funcionalidade testada: US03 (Consultar rotas)
+"""
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.models.route import Route
+from src.models.user import db
+
+
+
+@pytest.fixture
+def rota(route_factory):
+    return route_factory([{'id': 1, 'nome': 'Cristo Redentor',
+                           'localizacao': {'latitude': -22.95, 'longitude': -43.21}}],
+                         nome='Rota condicional', data_inicio=datetime(2030, 2, 1, 9, 0)).id
+
+
+class TestRotaCondicional:
+    """GET /api/routes/<id> com ETag"""
+
+    def test_304_sem_serializar(self, client, rota):
+        """
+        Critério: Com If-None-Match igual, 304 sem corpo e sem montar o JSON da rota
+        """
+        response = client.get(f'/api/routes/{rota}')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        with patch.object(Route, 'to_dict') as serializar:
+            revalidacao = client.get(f'/api/routes/{rota}', headers={'If-None-Match': response.headers['ETag']})
+
+        assert revalidacao.status_code == 304
+        assert revalidacao.data == b''
+        serializar.assert_not_called()
+
+    def test_etag_muda_apos_atualizacao(self, client, rota):
+        etag = client.get(f'/api/routes/{rota}').headers['ETag']
+        client.put(f'/api/routes/{rota}', data=json.dumps({'nome': 'Outro nome'}),
+                   content_type='application/json')
+
+        response = client.get(f'/api/routes/{rota}', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['nome'] == 'Outro nome'
+        assert response.headers['ETag'] != etag
+
+    def test_rota_inexistente(self, client):
+        assert client.get('/api/routes/999999999').status_code == 404
+
+
+class TestListagemCondicional:
+    """GET /api/routes com ETag"""
+
+    def _listar(self, client, user_id, etag=None, **params):
+        params['user_id'] = user_id
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        headers = {'If-None-Match': etag} if etag else {}
+        return client.get(f'/api/routes?{query}', headers=headers)
+
+    def test_304_na_revalidacao(self, client, rota, route_factory):
+        primeira = self._listar(client, route_factory.user_id)
+        assert len(json.loads(primeira.data)) == 1
+        etag = primeira.headers['ETag']
+
+        response = self._listar(client, route_factory.user_id, etag)
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+
+    def test_etag_depende_dos_parametros(self, client, rota, route_factory):
+        primeira = self._listar(client, route_factory.user_id)
+        assert primeira.data
+        etag = primeira.headers['ETag']
+
+        response = self._listar(client, route_factory.user_id, etag, fields='id')
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == [{'id': rota}]
+
+    def test_etag_muda_com_nova_rota_ou_exclusao(self, client, rota, route_factory):
+        primeira = self._listar(client, route_factory.user_id)
+        assert primeira.data
+        etag = primeira.headers['ETag']
+        nova = route_factory(nome='Mais uma', data_inicio=datetime(2030, 2, 2, 9, 0))
+
+        depois_da_criacao = self._listar(client, route_factory.user_id, etag)
+        assert depois_da_criacao.status_code == 200
+        assert len(json.loads(depois_da_criacao.data)) == 2
+
+        db.session.delete(nova)
+        db.session.commit()
+        depois_da_exclusao = self._listar(client, route_factory.user_id, depois_da_criacao.headers['ETag'])
+        assert depois_da_exclusao.status_code == 200
+        assert len(json.loads(depois_da_exclusao.data)) == 1
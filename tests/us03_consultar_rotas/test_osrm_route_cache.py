@@ -0,0 +1,140 @@
+"""
+Testes para o cache de rotas e trechos do OSRM
+Funcionalidade testada: US03 (Visualizar a rota selecionada no mapa)
+"""
+import pytest
+import json
+from urllib.parse import urlsplit
+
+from src.routes import routes
+from src.services.cache import TTLCache
+
+
+def _osrm_handler(method, path, body):
+    """Simula o OSRM: um trecho em linha reta por par de coordenadas"""
+    coords_str = urlsplit(path).path.rsplit('/', 1)[-1]
+    coords = [[float(v) for v in pair.split(',')] for pair in coords_str.split(';')]
+    legs = []
+    for start, end in zip(coords, coords[1:]):
+        legs.append({
+            'distance': 1000.0,
+            'duration': 120.0,
+            'steps': [
+                {'distance': 1000.0, 'duration': 120.0,
+                 'geometry': {'type': 'LineString', 'coordinates': [start, end]},
+                 'maneuver': {'type': 'depart'}},
+                {'distance': 0.0, 'duration': 0.0,
+                 'geometry': {'type': 'LineString', 'coordinates': [end, end]},
+                 'maneuver': {'type': 'arrive'}},
+            ]
+        })
+    return 200, {'code': 'Ok', 'routes': [{'legs': legs}]}
+
+
+def _ponto(id_, lat, lng):
+    return {'id': id_, 'nome': f'Ponto {id_}', 'localizacao': {'latitude': lat, 'longitude': lng}}
+
+
+PONTOS = [
+    _ponto(1, -22.951916, -43.210487),
+    _ponto(2, -22.948658, -43.157444),
+    _ponto(3, -22.971177, -43.182543),
+    _ponto(4, -22.983820, -43.204450),
+]
+
+
+@pytest.fixture
+def osrm(fake_http_server, monkeypatch):
+    """Aponta o OSRM para o servidor falso com caches isolados"""
+    monkeypatch.setattr(routes, 'OSRM_URL', fake_http_server.url)
+    monkeypatch.setattr(routes, 'osrm_route_cache', TTLCache('rotas-teste', ttl=60, max_entries=10))
+    monkeypatch.setattr(routes, 'osrm_leg_cache', TTLCache('trechos-teste', ttl=60, max_entries=100))
+    fake_http_server.handler = _osrm_handler
+    return fake_http_server
+
+
+class TestOSRMRouteCache:
+    """Testes do cache de rotas em /api/calculate-real-route"""
+
+    def test_rota_repetida_nao_acessa_rede(self, client, osrm):
+        """
+        Critério: Recalcular a mesma rota usa o cache sem chamar o OSRM
+        """
+        payload = json.dumps({'points': PONTOS[:3]})
+
+        primeira = client.post('/api/calculate-real-route', data=payload, content_type='application/json')
+        segunda = client.post('/api/calculate-real-route', data=payload, content_type='application/json')
+
+        assert primeira.status_code == 200
+        dados1 = json.loads(primeira.data)
+        dados2 = json.loads(segunda.data)
+        assert dados1['cache'] == 'miss'
+        assert dados2['cache'] == 'hit'
+        assert dados1['geometry'] == dados2['geometry']
+        assert dados1['total_distance'] == 2.0
+        assert dados1['estimated_time'] == 4
+        assert len(osrm.requests) == 1
+
+    def test_chave_usa_coordenadas_arredondadas(self, osrm):
+        """
+        Critério: Diferenças abaixo da precisão (~1 m) compartilham a entrada
+        """
+        ajustados = [_ponto(p['id'], p['localizacao']['latitude'] + 1e-7, p['localizacao']['longitude'])
+                     for p in PONTOS[:2]]
+
+        routes.calculate_real_route_data(PONTOS[:2])
+        resultado = routes.calculate_real_route_data(ajustados)
+
+        assert resultado['cache'] == 'hit'
+        assert resultado['optimized_points'] == ajustados
+        assert len(osrm.requests) == 1
+
+    def test_apenas_trechos_novos_sao_buscados(self, osrm):
+        """
+        Critério: Uma rota que reaproveita trechos só pede ao OSRM os trechos novos
+        """
+        routes.calculate_real_route_data(PONTOS[:3])
+
+        resultado = routes.calculate_real_route_data(PONTOS)
+
+        assert len(osrm.requests) == 2
+        coords_pedidas = urlsplit(osrm.requests[1][1]).path.rsplit('/', 1)[-1].split(';')
+        assert len(coords_pedidas) == 2
+        assert resultado['total_distance'] == 3.0
+        geometria = resultado['geometry']['coordinates']
+        assert geometria[0] == [-43.21049, -22.95192]
+        assert geometria[-1] == [-43.20445, -22.98382]
+
+    def test_geometria_sem_pontos_duplicados(self, osrm):
+        """
+        Critério: A geometria montada não repete os pontos de junção dos trechos
+        """
+        resultado = routes.calculate_real_route_data(PONTOS)
+
+        geometria = resultado['geometry']['coordinates']
+        assert len(geometria) == len(PONTOS)
+
+    def test_falha_do_osrm_usa_fallback(self, client, osrm):
+        """
+        Critério: Com o OSRM indisponível, a rota aproximada é retornada e nada é guardado
+        """
+        osrm.handler = lambda method, path, body: (400, {'code': 'InvalidQuery'})
+
+        response = client.post('/api/calculate-real-route',
+                               data=json.dumps({'points': PONTOS[:2]}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['type'] == 'approximated'
+        assert routes.osrm_route_cache.stats()['entries'] == 0
+
+    def test_direcoes_entre_dois_pontos_usam_cache_de_trechos(self, osrm):
+        """
+        Critério: Direções ponto a ponto reaproveitam trechos já calculados
+        """
+        routes.calculate_real_route_data(PONTOS[:2])
+
+        direcoes = routes.get_real_directions_between_points(PONTOS[0], PONTOS[1])
+
+        assert direcoes['distance'] == 1.0
+        assert len(osrm.requests) == 1
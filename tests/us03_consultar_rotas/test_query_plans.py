@@ -0,0 +1,172 @@
+"""
+Testes do esquema do banco: migrações versionadas e uso dos índices
+Funcionalidade testada: US03 (Consultar rotas)
+"""
+import json
+import os
+import tempfile
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event, inspect, text
+
+from src.models.migrations import MIGRATIONS, run_migrations
+from src.models.route import Route
+from src.models.user import db
+
+
+ESQUEMA_ANTIGO = [
+    'CREATE TABLE user (id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, email VARCHAR(120) NOT NULL,'
+    ' PRIMARY KEY (id), UNIQUE (username), UNIQUE (email))',
+    'CREATE TABLE route (id INTEGER NOT NULL, nome VARCHAR(200) NOT NULL, data_inicio DATETIME NOT NULL,'
+    ' pontos_turisticos TEXT NOT NULL, user_id INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME,'
+    ' PRIMARY KEY (id))',
+]
+
+# route_points como criada pela migração 1 (antes de point_json)
+ROUTE_POINTS_ANTIGA = (
+    'CREATE TABLE route_points (id INTEGER PRIMARY KEY, route_id INTEGER NOT NULL, position INTEGER NOT NULL,'
+    ' spot_id VARCHAR(64), nome VARCHAR(200), descricao TEXT, categoria VARCHAR(100), imagem_url VARCHAR(500),'
+    ' latitude FLOAT, longitude FLOAT, extra TEXT)'
+)
+
+
+@pytest.fixture
+def banco_antigo():
+    """Aplicação apontando para um banco SQLite com o esquema anterior às migrações"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = Flask('teste_migracoes')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            for sql in ESQUEMA_ANTIGO:
+                conn.execute(text(sql))
+            conn.execute(text(
+                "INSERT INTO route (id, nome, data_inicio, pontos_turisticos, user_id, created_at)"
+                " VALUES (1, 'Rota antiga', '2030-01-01 09:00:00', :pontos, 1, '2030-01-01 08:00:00')"
+            ), {'pontos': json.dumps([{'id': 1, 'nome': 'Cristo Redentor',
+                                       'localizacao': {'latitude': -22.95, 'longitude': -43.21}}])})
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+    os.unlink(path)
+
+
+class TestMigracoes:
+    """Testes de run_migrations sobre um banco antigo"""
+
+    def test_migra_banco_antigo(self, banco_antigo):
+        """
+        Critério: Todas as migrações são aplicadas em ordem e registradas
+        """
+        db.create_all()
+        aplicadas = run_migrations()
+
+        assert aplicadas == [numero for numero, _, _ in MIGRATIONS]
+        inspetor = inspect(db.engine)
+        indices = {index['name'] for index in inspetor.get_indexes('route')}
+        assert {'ix_route_user_created_at', 'ix_route_user_data_inicio', 'ix_route_user_bbox',
+                'ix_route_user_updated_at'} <= indices
+        assert [fk['referred_table'] for fk in inspetor.get_foreign_keys('route')] == ['user']
+
+        rota = db.session.get(Route, 1)
+        assert rota.nome == 'Rota antiga'
+        assert rota.pontos_turisticos == '[]'
+        assert rota.get_pontos_turisticos()[0]['nome'] == 'Cristo Redentor'
+        assert rota.get_summary()['centroid'] == {'latitude': -22.95, 'longitude': -43.21}
+
+    def test_migracoes_nao_sao_reaplicadas(self, banco_antigo):
+        db.create_all()
+        run_migrations()
+
+        assert run_migrations() == []
+
+
+    @pytest.mark.parametrize('numero, indice', [
+        (5, 'ix_route_user_bbox'),
+        (6, 'ix_route_user_updated_at'),
+    ])
+    def test_migracao_cria_o_indice_que_anuncia(self, tmp_path, numero, indice):
+        """
+        Critério: O índice é criado pela migração que o introduz, e não por uma anterior
+        """
+        migracoes = {n: migrate for n, _, migrate in MIGRATIONS}
+        engine = create_engine(f"sqlite:///{tmp_path / 'antigo.db'}")
+        with engine.begin() as conn:
+            for sql in ESQUEMA_ANTIGO + [ROUTE_POINTS_ANTIGA]:
+                conn.execute(text(sql))
+            # A partir da versão 3 (a 3 recria route já no formato final)
+            for n in range(4, numero):
+                migracoes[n](conn)
+            antes = {index['name'] for index in inspect(conn).get_indexes('route')}
+            migracoes[numero](conn)
+            depois = {index['name'] for index in inspect(conn).get_indexes('route')}
+        engine.dispose()
+
+        assert indice not in antes
+        assert indice in depois
+
+
+@pytest.fixture
+def planos(client):
+    """Executa as consultas capturadas com EXPLAIN QUERY PLAN"""
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            consultas.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+
+    def explicar():
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+        with db.engine.connect() as conn:
+            return [(statement, ' | '.join(row[-1] for row in conn.exec_driver_sql(
+                'EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()))
+                for statement, parameters in consultas]
+
+    yield explicar
+
+
+class TestPlanosDeConsulta:
+    """As consultas dos endpoints de listagem/consulta devem usar índices"""
+
+    def test_listagem_usa_indice_do_usuario(self, client, planos):
+        client.get('/api/routes?user_id=1&limit=2')
+
+        resultado = planos()
+
+        listagem = [plano for sql, plano in resultado if 'FROM route ' in sql and 'ORDER BY' in sql]
+        contagem = [plano for sql, plano in resultado if 'count(' in sql]
+        assert listagem and all('USING INDEX ix_route_user_created_at' in plano for plano in listagem)
+        assert all('ORDER BY' not in plano for plano in listagem)  # sem ordenação em memória
+        # A contagem pode usar qualquer índice que comece por user_id
+        assert contagem and all('COVERING INDEX ix_route_user_' in plano for plano in contagem)
+
+    def test_pontos_da_rota_usam_indice(self, client, route_factory, planos):
+        route_factory([{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9 + i / 100, 'longitude': -43.2}}
+                       for i in range(2)])
+        client.get(f'/api/routes?user_id={route_factory.user_id}&limit=2')
+
+        resultado = planos()
+
+        pontos = [plano for sql, plano in resultado if 'FROM route_points' in sql]
+        assert pontos and all('ix_route_points_route_position' in plano for plano in pontos)
+
+    def test_consulta_por_id_usa_chave_primaria(self, client, planos):
+        client.get('/api/routes/1')
+
+        resultado = planos()
+
+        rota = [plano for sql, plano in resultado if 'FROM route ' in sql]
+        assert rota and all('INTEGER PRIMARY KEY' in plano for plano in rota)
+
+    def test_rotas_proximas_usam_caixa_envolvente(self, client, planos):
+        client.get('/api/routes?user_id=1&lat=-22.97&lng=-43.18&radius=10')
+
+        resultado = planos()
+
+        candidatos = [plano for sql, plano in resultado if 'FROM route_points' in sql and 'min_lat' in sql]
+        assert candidatos and all('COVERING INDEX ix_route_user_bbox' in plano for plano in candidatos)
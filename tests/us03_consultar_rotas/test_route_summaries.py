@@ -0,0 +1,153 @@
+"""
+Testes do resumo pré-calculado das rotas (distância, tempo e caixa envolvente)
+Funcionalidade testada: US03 (Consultar rotas)
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.models.migrations import MIGRATIONS, backfill_route_summaries
+from src.models.route import Route
+from src.models.user import db
+from src.services.route_summary import summarize_points
+
+
+CRISTO = {'id': 1, 'nome': 'Cristo Redentor', 'localizacao': {'latitude': -22.951916, 'longitude': -43.210487}}
+PAO_DE_ACUCAR = {'id': 2, 'nome': 'Pão de Açúcar', 'localizacao': {'latitude': -22.948658, 'longitude': -43.157444}}
+MASP = {'id': 3, 'nome': 'MASP', 'localizacao': {'latitude': -23.561414, 'longitude': -46.655881}}
+
+
+@pytest.fixture
+def usuario(route_factory):
+    """Usuário do teste, sem rotas além das criadas pelo próprio teste"""
+    return route_factory.user_id
+
+
+@pytest.fixture
+def rota_criada(client, usuario):
+    """Cria uma rota pela API para o usuário do teste"""
+    response = client.post('/api/routes', data=json.dumps({
+        'nome': 'Rota resumo',
+        'data_inicio': '2030-05-01T09:00:00',
+        'pontos_turisticos': [CRISTO, PAO_DE_ACUCAR],
+        'user_id': usuario
+    }), content_type='application/json')
+    assert response.status_code == 201
+    route_id = Route.query.filter_by(user_id=usuario).one().id
+    return json.loads(client.get(f'/api/routes/{route_id}').data)
+
+
+class TestResumoDaRota:
+    """O resumo é calculado ao gravar os pontos e apenas lido nas consultas"""
+
+    def test_resumo_calculado_na_criacao(self, rota_criada):
+        resumo = rota_criada['summary']
+
+        assert resumo['total_distance'] == pytest.approx(5.43, abs=0.05)
+        assert resumo['estimated_time'] == 6
+        assert resumo['bbox'] == {
+            'min_lat': CRISTO['localizacao']['latitude'],
+            'min_lng': CRISTO['localizacao']['longitude'],
+            'max_lat': PAO_DE_ACUCAR['localizacao']['latitude'],
+            'max_lng': PAO_DE_ACUCAR['localizacao']['longitude']
+        }
+        assert resumo['centroid']['latitude'] == pytest.approx(-22.950287)
+
+    def test_resumo_recalculado_na_atualizacao(self, client, rota_criada):
+        response = client.put(f"/api/routes/{rota_criada['id']}",
+                              data=json.dumps({'pontos_turisticos': [CRISTO, MASP]}),
+                              content_type='application/json')
+
+        resumo = json.loads(response.data)['summary']
+        assert resumo['total_distance'] > 300
+        assert resumo['bbox']['min_lng'] == MASP['localizacao']['longitude']
+
+    def test_consultas_nao_recalculam(self, client, rota_criada, usuario):
+        """
+        Critério: GET de uma rota e a listagem usam os valores gravados
+        """
+        db.session.expire_all()
+        with patch('src.models.route.summarize_points') as resumir:
+            unica = json.loads(client.get(f"/api/routes/{rota_criada['id']}").data)
+            lista = json.loads(client.get(f'/api/routes?user_id={usuario}').data)
+
+        resumir.assert_not_called()
+        assert unica['summary'] == rota_criada['summary']
+        assert lista[0]['summary'] == rota_criada['summary']
+
+    def test_projecao_apenas_do_resumo(self, client, rota_criada, usuario):
+        response = client.get(f'/api/routes?user_id={usuario}&fields=id,summary')
+
+        assert json.loads(response.data) == [{'id': rota_criada['id'], 'summary': rota_criada['summary']}]
+
+    def test_rota_sem_coordenadas(self):
+        resumo = summarize_points([7, 8])
+
+        assert resumo['total_distance'] == 0
+        assert resumo['min_lat'] is None and resumo['centroid_lng'] is None
+
+
+class TestMigracaoDoResumo:
+
+    def test_preenche_rotas_sem_resumo(self, client, rota_criada):
+        """
+        Critério: A migração calcula o resumo de rotas gravadas antes das colunas existirem
+        """
+        with db.engine.begin() as conn:
+            conn.execute(text('UPDATE route SET total_distance = NULL, min_lat = NULL WHERE id = :id'),
+                         {'id': rota_criada['id']})
+
+        with db.engine.begin() as conn:
+            backfill_route_summaries(conn)
+
+        db.session.expire_all()
+        rota = db.session.get(Route, rota_criada['id'])
+        assert rota.get_summary() == rota_criada['summary']
+
+    def test_atualiza_banco_na_versao_3(self, tmp_path):
+        """
+        Critério: Um banco anterior às colunas de resumo e de versão é migrado sem erro,
+        sem alterar updated_at (ETags e PDFs em cache continuam válidos)
+        """
+        engine = create_engine(f"sqlite:///{tmp_path / 'v3.db'}")
+        with engine.begin() as conn:
+            for ddl in ESQUEMA_VERSAO_3:
+                conn.execute(text(ddl))
+            conn.execute(text("INSERT INTO user (id) VALUES (1)"))
+            conn.execute(text(
+                "INSERT INTO route (id, nome, data_inicio, pontos_turisticos, user_id, created_at, updated_at)"
+                " VALUES (1, 'Antiga', '2030-01-01 09:00:00', '[]', 1, '2024-01-01 00:00:00', '2024-01-02 00:00:00')"
+            ))
+            for position, ponto in enumerate([CRISTO, PAO_DE_ACUCAR]):
+                conn.execute(text(
+                    "INSERT INTO route_points (route_id, position, spot_id, nome, latitude, longitude)"
+                    " VALUES (1, :position, :spot_id, :nome, :lat, :lng)"
+                ), {'position': position, 'spot_id': str(ponto['id']), 'nome': ponto['nome'],
+                    'lat': ponto['localizacao']['latitude'], 'lng': ponto['localizacao']['longitude']})
+
+        for number, _, migrate in MIGRATIONS:
+            if number > 3:
+                with engine.begin() as conn:
+                    migrate(conn)
+
+        with engine.connect() as conn:
+            row = conn.execute(text('SELECT total_distance, min_lat, version, updated_at FROM route')).one()
+        engine.dispose()
+        assert row.total_distance == pytest.approx(5.43, abs=0.05)
+        assert row.min_lat == CRISTO['localizacao']['latitude']
+        assert row.version == 1
+        assert row.updated_at == '2024-01-02 00:00:00'
+
+
+# Tabelas como estavam na versão 3 do esquema (antes do resumo e da versão da rota)
+ESQUEMA_VERSAO_3 = [
+    'CREATE TABLE user (id INTEGER PRIMARY KEY)',
+    'CREATE TABLE route (id INTEGER PRIMARY KEY, nome VARCHAR(200) NOT NULL, data_inicio DATETIME NOT NULL,'
+    ' pontos_turisticos TEXT NOT NULL, user_id INTEGER NOT NULL REFERENCES user (id),'
+    ' created_at DATETIME, updated_at DATETIME)',
+    'CREATE TABLE route_points (id INTEGER PRIMARY KEY, route_id INTEGER NOT NULL REFERENCES route (id) ON DELETE CASCADE,'
+    ' position INTEGER NOT NULL, spot_id VARCHAR(64), nome VARCHAR(200), descricao TEXT, categoria VARCHAR(100),'
+    ' imagem_url VARCHAR(500), latitude FLOAT, longitude FLOAT, extra TEXT)',
+]
@@ -0,0 +1,133 @@
+"""
+Testes de API para a busca de rotas próximas ao usuário
+Funcionalidade testada: US03 (Consultar rotas)
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from src.services.geo import bounding_box, haversine_km
+
+
+# Usuário em Copacabana
+LAT, LNG = -22.9711, -43.1822
+
+
+def _ponto(spot_id, lat, lng):
+    return {'id': spot_id, 'nome': f'Ponto {spot_id}', 'localizacao': {'latitude': lat, 'longitude': lng}}
+
+
+ROTAS = {
+    'copacabana': [_ponto(1, -22.9714, -43.1823)],
+    'centro': [_ponto(2, -22.9068, -43.1729), _ponto(3, -22.9121, -43.2302)],
+    'niteroi': [_ponto(4, -22.8832, -43.1034)],
+    # A caixa envolvente cobre o usuário, mas nenhum ponto fica a menos de 20 km
+    'caixa_sem_ponto': [_ponto(5, -22.70, -43.45), _ponto(6, -23.25, -42.90)],
+    'sao_paulo': [_ponto(7, -23.5614, -46.6559)],
+    'sem_coordenadas': [8],
+}
+
+
+@pytest.fixture
+def rotas(route_factory):
+    """Cria as rotas de ROTAS para o usuário do teste"""
+    return {nome: route_factory(pontos, nome=nome, data_inicio=datetime(2030, 3, 1, 9, 0)).id
+            for nome, pontos in ROTAS.items()}
+
+
+@pytest.fixture
+def proximas(client, route_factory):
+    """GET /api/routes do usuário do teste, a partir de LAT/LNG"""
+    def _proximas(**params):
+        params.setdefault('user_id', route_factory.user_id)
+        params.setdefault('lat', LAT)
+        params.setdefault('lng', LNG)
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return client.get(f'/api/routes?{query}')
+    return _proximas
+
+
+class TestRotasProximas:
+    """Testes para GET /api/routes?lat=&lng=&radius="""
+
+    def test_filtra_e_ordena_por_distancia(self, proximas, rotas):
+        """
+        Critério: Só rotas com algum ponto dentro do raio, da mais próxima para a mais distante
+        """
+        response = proximas(radius=20)
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [rota['nome'] for rota in data] == ['copacabana', 'centro', 'niteroi']
+        assert response.headers['X-Total-Count'] == '3'
+        distancias = [rota['distance_km'] for rota in data]
+        assert distancias == sorted(distancias)
+        assert data[1]['distance_km'] == pytest.approx(haversine_km(LAT, LNG, -22.9068, -43.1729), abs=1e-3)
+
+    def test_raio_padrao(self, proximas, rotas):
+        data = json.loads(proximas().data)
+
+        assert [rota['nome'] for rota in data] == ['copacabana', 'centro']
+
+    def test_paginacao_por_distancia(self, proximas, rotas):
+        vistos = []
+        cursor = None
+        while True:
+            params = {'radius': 500, 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            response = proximas(**params)
+            assert response.headers['X-Total-Count'] == '5'
+            vistos.extend(rota['nome'] for rota in json.loads(response.data))
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        assert vistos == ['copacabana', 'centro', 'niteroi', 'caixa_sem_ponto', 'sao_paulo']
+
+    def test_projecao_de_campos(self, proximas, rotas):
+        data = json.loads(proximas(radius=5, fields='id').data)
+
+        assert data == [{'id': rotas['copacabana'], 'distance_km': pytest.approx(0.03, abs=0.01)}]
+
+    @pytest.mark.parametrize('params', [
+        {'lat': 'abc'},
+        {'lat': 95},
+        {'radius': 0},
+        {'radius': 10000},
+        {'cursor': 'invalido'},
+    ])
+    def test_parametros_invalidos(self, proximas, params):
+        assert proximas(**params).status_code == 400
+
+    def test_pontos_com_lat_lng(self, proximas, route_factory):
+        """
+        Critério: Rotas com pontos no formato lat/lng entram na busca como as de "localizacao"
+        """
+        com_localizacao = route_factory([_ponto(1, LAT, LNG)], nome='localizacao').id
+        com_lat_lng = route_factory([{'id': 2, 'nome': 'Ponto 2', 'lat': LAT, 'lng': LNG}], nome='lat_lng').id
+
+        data = json.loads(proximas(radius=5, fields='id').data)
+
+        assert {rota['id'] for rota in data} == {com_localizacao, com_lat_lng}
+        assert all(rota['distance_km'] == pytest.approx(0, abs=1e-6) for rota in data)
+
+    def test_lng_obrigatoria(self, client, route_factory):
+        response = client.get(f'/api/routes?user_id={route_factory.user_id}&lat={LAT}')
+
+        assert response.status_code == 400
+
+
+class TestCaixaEnvolvente:
+    """Testes da caixa usada no pré-filtro"""
+
+    def test_contem_o_circulo(self):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(LAT, LNG, 20)
+
+        for lat, lng in [(min_lat, LNG), (max_lat, LNG), (LAT, min_lng), (LAT, max_lng)]:
+            assert haversine_km(LAT, LNG, lat, lng) >= 20 - 1e-6
+
+    def test_antimeridiano_sem_limite_de_longitude(self):
+        assert bounding_box(-17.0, 179.9, 50)[2:] == (None, None)
+        assert bounding_box(89.9, 0.0, 50)[2:] == (None, None)
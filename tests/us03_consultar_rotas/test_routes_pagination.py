@@ -0,0 +1,107 @@
+"""
+Testes de API para a listagem paginada de rotas
+Funcionalidade testada: US03 (Consultar rotas)
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.models.route import Route
+from src.models.user import db
+
+
+TOTAL_ROTAS = 7
+
+
+@pytest.fixture
+def rotas(route_factory):
+    """Cria TOTAL_ROTAS rotas para o usuário do teste"""
+    base = datetime(2030, 1, 1, 12, 0)
+    return [
+        route_factory([{'id': i, 'nome': f'Ponto {i}', 'localizacao': {'latitude': -22.9, 'longitude': -43.2}}],
+                      nome=f'Rota {i}', data_inicio=base + timedelta(days=i),
+                      created_at=base + timedelta(minutes=i // 2)).id  # pares com o mesmo created_at
+        for i in range(TOTAL_ROTAS)
+    ]
+
+
+@pytest.fixture
+def listar(client, route_factory):
+    """GET /api/routes do usuário do teste"""
+    def _listar(**params):
+        params.setdefault('user_id', route_factory.user_id)
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return client.get(f'/api/routes?{query}')
+    return _listar
+
+
+class TestPaginacaoRotas:
+    """Testes para GET /api/routes com cursor, projeção e total"""
+
+    def test_percorrer_todas_as_paginas(self, listar, rotas):
+        """
+        Critério: Seguindo o cursor, todas as rotas aparecem uma única vez e em ordem
+        """
+        vistos = []
+        cursor = None
+        paginas = 0
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = listar(**params)
+            assert response.status_code == 200
+            assert response.headers['X-Total-Count'] == str(TOTAL_ROTAS)
+            vistos.extend(rota['id'] for rota in json.loads(response.data))
+            paginas += 1
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        assert vistos == rotas
+        assert paginas == 3
+
+    def test_link_proxima_pagina(self, listar, rotas):
+        response = listar(limit=5)
+
+        assert 'rel="next"' in response.headers['Link']
+        assert response.headers['X-Next-Cursor'] in response.headers['Link']
+
+    def test_projecao_sem_pontos(self, listar, rotas):
+        """
+        Critério: fields= sem pontos_turisticos não carrega os pontos
+        """
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = listar(fields='id,nome')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert all(set(rota) == {'id', 'nome'} for rota in data)
+        assert not any('route_points' in consulta for consulta in consultas)
+
+    def test_projecao_com_pontos(self, listar, rotas):
+        data = json.loads(listar(fields='id,pontos_turisticos').data)
+
+        assert data[0]['pontos_turisticos'][0]['nome'] == 'Ponto 0'
+
+    def test_resposta_completa_por_padrao(self, listar, rotas):
+        data = json.loads(listar().data)
+
+        assert len(data) == TOTAL_ROTAS
+        assert set(data[0]) == set(Route.FIELDS)
+
+    @pytest.mark.parametrize('params', [{'fields': 'id,senha'}, {'limit': 0}, {'limit': 'abc'}, {'cursor': 'xyz'}])
+    def test_parametros_invalidos(self, listar, params):
+        response = listar(**params)
+
+        assert response.status_code == 400
@@ -0,0 +1,159 @@
+"""
+Testes para o cliente HTTP compartilhado das integrações externas
+(OSRM, Nominatim e Overpass)
+"""
+import pytest
+import json
+
+import requests
+
+from src.services.http_client import CircuitBreaker, CircuitOpenError, UpstreamClient, get_client
+
+
+@pytest.fixture
+def upstream():
+    """Cliente sem espera real entre tentativas"""
+    return UpstreamClient('teste', timeout=2, retries=2, failure_threshold=3,
+                          reset_timeout=60, sleep=lambda seconds: None)
+
+
+class TestUpstreamClient:
+    """Testes para retentativas, circuit breaker e métricas"""
+
+    def test_repete_falhas_transitorias(self, upstream, fake_http_server):
+        """
+        Critério: Respostas 503 são repetidas com backoff até o sucesso
+        """
+        respostas = [(503, {}), (503, {}), (200, {'ok': True})]
+        fake_http_server.handler = lambda method, path, body: respostas.pop(0)
+
+        response = upstream.get(fake_http_server.url + '/rota')
+
+        assert response.status_code == 200
+        assert response.json() == {'ok': True}
+        stats = upstream.stats()
+        assert stats['attempts'] == 3
+        assert stats['retries'] == 2
+
+    def test_numero_de_tentativas_limitado(self, upstream, fake_http_server):
+        """
+        Critério: Após esgotar as tentativas, a última resposta é retornada
+        """
+        fake_http_server.handler = lambda method, path, body: (503, {})
+
+        response = upstream.get(fake_http_server.url + '/rota')
+
+        assert response.status_code == 503
+        assert len(fake_http_server.requests) == 3
+
+    def test_erro_4xx_nao_e_repetido(self, upstream, fake_http_server):
+        """
+        Critério: Erros do cliente (4xx) não são repetidos
+        """
+        fake_http_server.handler = lambda method, path, body: (400, {})
+
+        response = upstream.get(fake_http_server.url + '/rota')
+
+        assert response.status_code == 400
+        assert len(fake_http_server.requests) == 1
+
+    def test_circuito_abre_e_falha_rapido(self, fake_http_server):
+        """
+        Critério: Com o serviço fora do ar, o circuito abre e as chamadas falham sem rede
+        """
+        client = UpstreamClient('fora', retries=0, failure_threshold=2,
+                                reset_timeout=60, sleep=lambda seconds: None)
+        fake_http_server.handler = lambda method, path, body: (500, {})
+
+        client.get(fake_http_server.url)
+        client.get(fake_http_server.url)
+        with pytest.raises(CircuitOpenError):
+            client.get(fake_http_server.url)
+
+        assert len(fake_http_server.requests) == 2
+        assert client.stats()['circuit']['state'] == 'open'
+        assert client.stats()['short_circuited'] == 1
+
+    def test_circuito_aberto_e_erro_de_requests(self):
+        """
+        Critério: CircuitOpenError é tratado pelos handlers de RequestException existentes
+        """
+        assert issubclass(CircuitOpenError, requests.exceptions.RequestException)
+
+    def test_erro_de_conexao(self, upstream):
+        """
+        Critério: Erros de conexão são repetidos e depois propagados
+        """
+        with pytest.raises(requests.exceptions.ConnectionError):
+            upstream.get('http://127.0.0.1:9/indisponivel')
+
+        assert upstream.stats()['attempts'] == 3
+        assert upstream.stats()['errors'] == 3
+
+    def test_histograma_de_latencia(self, upstream, fake_http_server):
+        """
+        Critério: Cada tentativa é registrada no histograma de latência
+        """
+        upstream.get(fake_http_server.url)
+        upstream.get(fake_http_server.url)
+
+        latency = upstream.stats()['latency_ms']
+        assert latency['count'] == 2
+        assert sum(latency['buckets'].values()) == 2
+
+    def test_cliente_compartilhado(self):
+        """
+        Critério: Cada serviço externo usa um único cliente (pool) por processo
+        """
+        assert get_client('osrm') is get_client('osrm')
+        assert get_client('overpass').timeout == 30
+
+
+class TestCircuitBreaker:
+    """Testes para o circuit breaker"""
+
+    def test_meio_aberto_apos_timeout(self):
+        """
+        Critério: Após reset_timeout, uma única chamada de teste é permitida
+        """
+        agora = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: agora[0])
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        agora[0] = 11
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_falha_no_meio_aberto_reabre(self):
+        agora = [0.0]
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: agora[0])
+        for _ in range(3):
+            breaker.record_failure()
+        agora[0] = 11
+        assert breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+
+class TestMetricasUpstream:
+    """Testes das métricas expostas em /api/metrics"""
+
+    def test_metricas_incluem_servicos_externos(self, client):
+        """
+        Endpoint: GET /api/metrics
+        """
+        get_client('nominatim')
+
+        response = client.get('/api/metrics')
+
+        data = json.loads(response.data)
+        assert 'nominatim' in data['upstreams']
+        assert 'latency_ms' in data['upstreams']['nominatim']
@@ -0,0 +1,164 @@
+"""
+Testes para o cache de resultados do Nominatim
+Funcionalidade testada: US07 (Buscar pontos turísticos via API externa)
+"""
+import pytest
+import json
+
+from src.routes import tourist_spots
+from src.services.cache import MISSING, TTLCache
+
+
+NOMINATIM_RESPONSE = [
+    {
+        "place_id": 101,
+        "display_name": "Cristo Redentor, Rio de Janeiro, Brasil",
+        "lat": "-22.9519",
+        "lon": "-43.2105",
+        "type": "attraction",
+        "class": "tourism",
+        "importance": 0.8
+    },
+    {
+        "place_id": 102,
+        "display_name": "Rua Qualquer, Rio de Janeiro",
+        "lat": "-22.9",
+        "lon": "-43.2",
+        "type": "residential",
+        "class": "highway",
+        "importance": 0.1
+    }
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def nominatim(fake_http_server, tmp_path, clock, monkeypatch):
+    """Aponta search_nominatim para o servidor falso com um cache isolado"""
+    cache = TTLCache('nominatim-test', ttl=3600, negative_ttl=60,
+                     max_entries=2, db_path=str(tmp_path / 'cache.db'), clock=clock)
+    monkeypatch.setattr(tourist_spots, 'NOMINATIM_URL', fake_http_server.url + '/search')
+    monkeypatch.setattr(tourist_spots, 'nominatim_cache', cache)
+    fake_http_server.handler = lambda method, path, body: (200, NOMINATIM_RESPONSE)
+    return cache
+
+
+class TestTTLCache:
+    """Testes para o cache em duas camadas"""
+
+    def test_expiracao_por_ttl(self, clock):
+        """
+        Critério: Entradas expiram após o TTL
+        """
+        cache = TTLCache('ttl', ttl=10, clock=clock)
+        cache.set('a', [1])
+
+        assert cache.get('a') == [1]
+        clock.now += 11
+        assert cache.get('a') is MISSING
+        assert cache.stats()['expirations'] == 1
+
+    def test_ttl_negativo_mais_curto(self, clock):
+        """
+        Critério: Entradas negativas usam o TTL negativo
+        """
+        cache = TTLCache('neg', ttl=100, negative_ttl=5, clock=clock)
+        cache.set('vazio', [], negative=True)
+
+        assert cache.get('vazio') == []
+        assert cache.stats()['negative_hits'] == 1
+        clock.now += 6
+        assert cache.get('vazio') is MISSING
+
+    def test_eviccao_lru(self, clock):
+        """
+        Critério: A camada em memória respeita o limite de entradas (LRU)
+        """
+        cache = TTLCache('lru', ttl=100, max_entries=2, clock=clock)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is MISSING
+        assert cache.get('a') == 1
+        assert cache.stats()['evictions'] == 1
+
+    def test_persistencia_entre_instancias(self, tmp_path, clock):
+        """
+        Critério: A camada SQLite sobrevive a reinícios do processo
+        """
+        db_path = str(tmp_path / 'cache.db')
+        TTLCache('persist', ttl=100, db_path=db_path, clock=clock).set('chave', {'x': 1})
+
+        novo = TTLCache('persist', ttl=100, db_path=db_path, clock=clock)
+
+        assert novo.get('chave') == {'x': 1}
+        assert novo.stats()['disk_hits'] == 1
+        assert novo.get('chave') == {'x': 1}
+        assert novo.stats()['memory_hits'] == 1
+
+
+class TestNominatimCache:
+    """Testes do cache aplicado a search_nominatim"""
+
+    def test_consulta_repetida_usa_cache(self, nominatim, fake_http_server):
+        """
+        Critério: A mesma busca só chega ao Nominatim uma vez
+        """
+        primeiro = tourist_spots.search_nominatim('Cristo')
+        segundo = tourist_spots.search_nominatim('Cristo')
+
+        assert len(fake_http_server.requests) == 1
+        assert primeiro == segundo
+        assert [s['nome'] for s in primeiro] == ['Cristo Redentor']
+        stats = nominatim.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+
+    def test_chave_normalizada(self, nominatim, fake_http_server):
+        """
+        Critério: Variações de caixa, acento e espaços compartilham a entrada
+        """
+        tourist_spots.search_nominatim('Brasília')
+        tourist_spots.search_nominatim('  brasilia ')
+
+        assert len(fake_http_server.requests) == 1
+
+    def test_cache_negativo_para_falhas(self, nominatim, fake_http_server, clock):
+        """
+        Critério: Falhas ficam em cache negativo e expiram com o TTL negativo
+        """
+        fake_http_server.handler = lambda method, path, body: (500, {'error': 'indisponível'})
+
+        assert tourist_spots.search_nominatim('Maracanã') == []
+        assert tourist_spots.search_nominatim('Maracanã') == []
+        assert len(fake_http_server.requests) == 1
+
+        fake_http_server.handler = lambda method, path, body: (200, NOMINATIM_RESPONSE)
+        clock.now += 61
+        assert len(tourist_spots.search_nominatim('Maracanã')) == 1
+        assert len(fake_http_server.requests) == 2
+
+    def test_endpoint_metricas(self, client, nominatim):
+        """
+        Endpoint: GET /api/metrics
+        """
+        response = client.get('/api/metrics')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert 'catalog' in data
+        assert 'nominatim' in data['caches']
@@ -0,0 +1,110 @@
+"""
+Testes para o cache por tiles das consultas ao Overpass
+Funcionalidade testada: US07 (Buscar pontos turísticos próximos)
+"""
+import pytest
+import json
+
+from src.routes import tourist_spots
+from src.services.cache import TTLCache
+
+
+OVERPASS_RESPONSE = {
+    "elements": [
+        {"type": "node", "id": 1, "lat": -22.9519, "lon": -43.2105,
+         "tags": {"tourism": "attraction", "name": "Cristo Redentor"}},
+        {"type": "way", "id": 2, "center": {"lat": -22.9486, "lon": -43.1574},
+         "tags": {"tourism": "viewpoint", "name": "Pão de Açúcar"}},
+        {"type": "node", "id": 3, "lat": -15.7998, "lon": -47.8645,
+         "tags": {"tourism": "attraction", "name": "Muito Longe"}},
+    ]
+}
+
+
+@pytest.fixture
+def overpass(fake_http_server, monkeypatch):
+    """Aponta o Overpass para o servidor falso com um cache isolado em memória"""
+    cache = TTLCache('overpass-test', ttl=3600, max_entries=1000)
+    monkeypatch.setattr(tourist_spots, 'OVERPASS_URL', fake_http_server.url + '/api/interpreter')
+    monkeypatch.setattr(tourist_spots, 'overpass_tile_cache', cache)
+    fake_http_server.handler = lambda method, path, body: (200, OVERPASS_RESPONSE)
+    return cache
+
+
+def _buscar(client, lat, lng, radius=10, categories=None):
+    payload = {"latitude": lat, "longitude": lng, "radius": radius}
+    if categories:
+        payload["categories"] = categories
+    return client.post('/api/search-nearby-spots', data=json.dumps(payload),
+                       content_type='application/json')
+
+
+class TestOverpassTileCache:
+    """Testes do cache de tiles em /api/search-nearby-spots"""
+
+    def test_tiles_cobrem_a_area(self):
+        """
+        Critério: Os tiles devem cobrir toda a caixa envolvente da busca
+        """
+        tiles = tourist_spots.tiles_for_bbox(-23.1, -43.4, -22.8, -43.1)
+
+        for lat, lng in [(-23.1, -43.4), (-22.8, -43.1), (-22.95, -43.2)]:
+            assert tourist_spots.tile_for_point(lat, lng) in tiles
+
+    def test_busca_repetida_nao_consulta_overpass(self, client, overpass, fake_http_server):
+        """
+        Critério: Uma segunda busca na mesma área é respondida pelos tiles em cache
+        """
+        primeira = _buscar(client, -22.95, -43.19)
+        segunda = _buscar(client, -22.95, -43.19)
+
+        assert primeira.status_code == 200
+        assert segunda.status_code == 200
+        assert len(fake_http_server.requests) == 1
+        assert json.loads(primeira.data) == json.loads(segunda.data)
+        nomes = {p['nome'] for p in json.loads(primeira.data)}
+        assert nomes == {'Cristo Redentor', 'Pão de Açúcar'}
+
+    def test_usuarios_proximos_compartilham_tiles(self, client, overpass, fake_http_server):
+        """
+        Critério: Buscas de coordenadas diferentes dentro dos mesmos tiles não geram nova consulta
+        """
+        _buscar(client, -22.90, -43.19, radius=5)
+        _buscar(client, -22.88, -43.18, radius=5)
+
+        assert len(fake_http_server.requests) == 1
+
+    def test_busca_apenas_tiles_faltantes(self, client, overpass, fake_http_server):
+        """
+        Critério: Ampliar o raio busca somente os tiles ainda não consultados
+        """
+        _buscar(client, -22.95, -43.19, radius=5)
+        tiles_antes = overpass.stats()['entries']
+
+        _buscar(client, -22.95, -43.19, radius=60)
+
+        assert len(fake_http_server.requests) == 2
+        novos_tiles = overpass.stats()['entries'] - tiles_antes
+        total = len(tourist_spots.tiles_for_bbox(-22.95 - 60 / 111.0, -43.8, -22.95 + 60 / 111.0, -42.6))
+        assert 0 < novos_tiles < total + 1
+
+    def test_categorias_diferentes_nao_compartilham_tiles(self, client, overpass, fake_http_server):
+        """
+        Critério: O conjunto de categorias faz parte da chave do tile
+        """
+        _buscar(client, -22.95, -43.19, categories=['tourism'])
+        _buscar(client, -22.95, -43.19, categories=['historic'])
+        _buscar(client, -22.95, -43.19, categories=['tourism'])
+
+        assert len(fake_http_server.requests) == 2
+
+    def test_erro_da_api_nao_e_armazenado(self, client, overpass, fake_http_server):
+        """
+        Critério: Respostas de erro do Overpass não são guardadas em cache
+        """
+        fake_http_server.handler = lambda method, path, body: (429, {})
+
+        response = _buscar(client, -22.95, -43.19)
+
+        assert response.status_code == 500
+        assert overpass.stats()['entries'] == 0
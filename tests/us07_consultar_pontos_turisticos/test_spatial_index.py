@@ -0,0 +1,143 @@
+"""
+Testes unitários para o índice espacial de pontos turísticos
+Funcionalidade testada: US07 (Consultar pontos turísticos por proximidade)
+"""
+import pytest
+import json
+import random
+
+from src.services.geo import haversine_km
+from src.services.spatial_index import SpatialGridIndex
+
+
+def _random_spots(n, seed=42):
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "nome": f"Ponto {i}",
+            "localizacao": {
+                "latitude": rnd.uniform(-34.0, 5.0),
+                "longitude": rnd.uniform(-74.0, -34.0),
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def _brute_force(spots, lat, lng, radius):
+    result = []
+    for spot in spots:
+        loc = spot['localizacao']
+        distance = haversine_km(lat, lng, loc['latitude'], loc['longitude'])
+        if distance <= radius:
+            result.append((distance, spot['id']))
+    return sorted(result)
+
+
+class TestSpatialGridIndex:
+    """Testes para o índice espacial em grade"""
+
+    @pytest.mark.parametrize("radius", [5, 50, 500, 3000])
+    def test_consulta_por_raio_igual_varredura_linear(self, radius):
+        """
+        Critério: O índice deve retornar exatamente os pontos da varredura linear
+        """
+        # Arrange
+        spots = _random_spots(5000)
+        index = SpatialGridIndex.build(spots)
+        lat, lng = -22.9068, -43.1729
+
+        # Act
+        result = index.within_radius(lat, lng, radius)
+
+        # Assert
+        esperado = _brute_force(spots, lat, lng, radius)
+        assert [spot['id'] for _, spot in result] == [spot_id for _, spot_id in esperado]
+
+    def test_resultados_ordenados_por_distancia(self):
+        """
+        Critério: Resultados devem vir ordenados por distância crescente
+        """
+        index = SpatialGridIndex.build(_random_spots(2000))
+
+        result = index.within_radius(-15.78, -47.93, 800)
+        distancias = [d for d, _ in result]
+
+        assert distancias == sorted(distancias)
+
+    def test_k_vizinhos_mais_proximos(self):
+        """
+        Critério: nearest(k) deve retornar os k pontos mais próximos
+        """
+        spots = _random_spots(3000)
+        index = SpatialGridIndex.build(spots)
+        lat, lng = -3.1, -60.0
+
+        result = index.nearest(lat, lng, 7)
+
+        esperado = _brute_force(spots, lat, lng, float('inf'))[:7]
+        assert [spot['id'] for _, spot in result] == [spot_id for _, spot_id in esperado]
+
+    def test_k_vizinhos_com_raio_maximo(self):
+        """
+        Critério: nearest com raio máximo não retorna pontos além do raio
+        """
+        spots = _random_spots(100)
+        index = SpatialGridIndex.build(spots)
+
+        result = index.nearest(-22.9, -43.2, 50, max_radius_km=100)
+
+        assert all(d <= 100 for d, _ in result)
+
+    def test_cruzamento_do_antimeridiano(self):
+        """
+        Critério: Consultas próximas a longitude ±180 devem considerar os dois lados
+        """
+        spots = [
+            {"id": 1, "nome": "Leste", "localizacao": {"latitude": 0.0, "longitude": 179.95}},
+            {"id": 2, "nome": "Oeste", "localizacao": {"latitude": 0.0, "longitude": -179.95}},
+        ]
+        index = SpatialGridIndex.build(spots)
+
+        result = index.within_radius(0.0, 179.99, 20)
+
+        assert sorted(spot['id'] for _, spot in result) == [1, 2]
+
+    def test_indice_vazio(self):
+        """
+        Critério: Índice vazio retorna listas vazias
+        """
+        index = SpatialGridIndex()
+
+        assert index.within_radius(0, 0, 100) == []
+        assert index.nearest(0, 0, 3) == []
+
+
+class TestProximidadeAPI:
+    """Testes do filtro de proximidade em GET /api/tourist-spots"""
+
+    def test_filtro_por_raio_usa_distancia_haversine(self, client):
+        """
+        Endpoint: GET /api/tourist-spots?lat=&lng=&radius=
+        """
+        response = client.get('/api/tourist-spots?lat=-22.951916&lng=-43.210487&radius=10')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data[0]['nome'] == 'Cristo Redentor'
+        assert data[0]['distance'] == 0
+        distancias = [p['distance'] for p in data]
+        assert distancias == sorted(distancias)
+        assert all(d <= 10 for d in distancias)
+
+    def test_k_mais_proximos(self, client):
+        """
+        Endpoint: GET /api/tourist-spots?lat=&lng=&k=
+        """
+        response = client.get('/api/tourist-spots?lat=-15.7801&lng=-47.9292&k=3')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data) == 3
+        assert [p['distance'] for p in data] == sorted(p['distance'] for p in data)
@@ -0,0 +1,161 @@
+"""
+Testes unitários para o índice de busca textual de pontos turísticos
+Funcionalidade testada: US07 (Buscar pontos turísticos por nome)
+"""
+import pytest
+import json
+
+from src.services.text_index import InvertedIndex, fold_text, tokenize
+
+
+@pytest.fixture
+def spots():
+    return [
+        {"id": 1, "nome": "Cristo Redentor", "descricao": "Estátua no Corcovado", "categoria": "Monumento"},
+        {"id": 2, "nome": "Pão de Açúcar", "descricao": "Bondinho com vista da baía", "categoria": "Mirante"},
+        {"id": 3, "nome": "Museu do Amanhã", "descricao": "Museu de ciências", "categoria": "Museu"},
+        {"id": 4, "nome": "Parque Lage", "descricao": "Vista para o Cristo", "categoria": "Parque"},
+    ]
+
+
+class TestInvertedIndex:
+    """Testes para o índice invertido"""
+
+    def test_dobra_de_acentos(self):
+        """
+        Critério: Texto com e sem acento deve gerar os mesmos termos
+        """
+        assert fold_text("Pão de Açúcar") == "pao de acucar"
+        assert tokenize("Pão de Açúcar") == tokenize("PAO DE ACUCAR")
+
+    def test_busca_sem_acentos(self, spots):
+        """
+        Critério: "Pao de Acucar" deve encontrar "Pão de Açúcar"
+        """
+        index = InvertedIndex.build(spots)
+
+        result = index.search("Pao de Acucar")
+
+        assert [s['id'] for s in result] == [2]
+
+    def test_busca_por_prefixo(self, spots):
+        """
+        Critério: Termos parciais devem casar pelo prefixo
+        """
+        index = InvertedIndex.build(spots)
+
+        assert [s['id'] for s in index.search("amanh")] == [3]
+        assert [s['id'] for s in index.search("corco")] == [1]
+
+    def test_intersecao_de_termos(self, spots):
+        """
+        Critério: Todos os termos da consulta devem estar presentes
+        """
+        index = InvertedIndex.build(spots)
+
+        assert [s['id'] for s in index.search("vista cristo")] == [4]
+        assert index.search("cristo bondinho") == []
+
+    def test_ranking_prioriza_nome(self, spots):
+        """
+        Critério: Casamento no nome vale mais que na descrição
+        """
+        index = InvertedIndex.build(spots)
+
+        result = index.search("cristo")
+
+        assert [s['id'] for s in result] == [1, 4]
+
+    def test_restricao_de_campos(self, spots):
+        """
+        Critério: A busca pode ser limitada a campos específicos
+        """
+        index = InvertedIndex.build(spots)
+
+        assert [s['id'] for s in index.search("cristo", fields=('nome',))] == [1]
+        assert [s['id'] for s in index.search("museu", fields=('categoria',))] == [3]
+
+    def test_consulta_vazia(self, spots):
+        """
+        Critério: Consulta sem termos não retorna resultados
+        """
+        index = InvertedIndex.build(spots)
+
+        assert index.search("   ") == []
+        assert index.search("inexistente") == []
+
+
+class TestBuscaTextualAPI:
+    """Testes da busca textual nos endpoints de pontos turísticos"""
+
+    def test_busca_por_nome_sem_acentos(self, client):
+        """
+        Endpoint: GET /api/tourist-spots?search=
+        """
+        response = client.get('/api/tourist-spots?search=pao de acucar')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [p['nome'] for p in data] == ['Pão de Açúcar']
+
+    def test_busca_combinada_com_proximidade(self, client):
+        """
+        Endpoint: GET /api/tourist-spots?search=&lat=&lng=&radius=
+        """
+        response = client.get('/api/tourist-spots?search=catedral&lat=-15.78&lng=-47.93&radius=20')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [p['nome'] for p in data] == ['Catedral de Brasília']
+        assert 'distance' in data[0]
+
+
+class _ListaContada(dict):
+    """Lista de postings que conta quantos documentos foram lidos ou testados"""
+
+    acessos = 0
+
+    def __iter__(self):
+        for doc_idx in super().__iter__():
+            _ListaContada.acessos += 1
+            yield doc_idx
+
+    def __contains__(self, doc_idx):
+        _ListaContada.acessos += 1
+        return super().__contains__(doc_idx)
+
+
+def _acessos_da_busca(quantidade, consulta):
+    """Documentos lidos nas listas de postings para responder à consulta"""
+    docs = [{"id": i, "nome": f"pa{i:05d} museu", "descricao": f"pa{i:05d}"} for i in range(quantidade)]
+    index = InvertedIndex.build(docs)
+    for postings in index._postings.values():
+        for term, lista in postings.items():
+            postings[term] = _ListaContada(lista)
+    _ListaContada.acessos = 0
+    assert len(index.search(consulta)) == quantidade
+    return _ListaContada.acessos
+
+
+class TestComplexidadeDaBusca:
+    """Benchmark da busca: o custo cresce com o tamanho das listas, não com listas x candidatos"""
+
+    def test_prefixo_amplo_e_linear(self):
+        """
+        Critério: Cada documento de cada lista expandida é lido uma única vez
+        """
+        # "pa" expande para um termo por documento, em dois campos; "museu" tem uma lista
+        for quantidade in (500, 2000):
+            assert _acessos_da_busca(quantidade, "museu pa") <= 3 * quantidade
+
+    def test_consulta_repetida_nao_relê_listas(self):
+        docs = [{"id": i, "nome": f"pa{i:05d}"} for i in range(1000)]
+        index = InvertedIndex.build(docs)
+        index.search("pa")
+        for postings in index._postings.values():
+            for term, lista in postings.items():
+                postings[term] = _ListaContada(lista)
+        _ListaContada.acessos = 0
+
+        assert len(index.search("pa", limit=10)) == 10
+        assert _ListaContada.acessos == 0
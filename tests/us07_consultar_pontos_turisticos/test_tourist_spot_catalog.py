@@ -0,0 +1,151 @@
+"""
+Testes unitários para o catálogo de pontos turísticos em memória
+Funcionalidade testada: US07 (Consultar pontos turísticos)
+"""
+import pytest
+import json
+import os
+import threading
+
+from src.services.tourist_spot_catalog import TouristSpotCatalog
+
+
+def _write_spots(path, spots):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(spots, f)
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """Arquivo de catálogo temporário com dois pontos"""
+    path = tmp_path / 'tourist_spots.json'
+    _write_spots(path, [
+        {"id": 1, "nome": "Cristo Redentor", "localizacao": {"latitude": -22.95, "longitude": -43.21}},
+        {"id": 2, "nome": "Pão de Açúcar", "localizacao": {"latitude": -22.94, "longitude": -43.15}},
+    ])
+    return str(path)
+
+
+class TestTouristSpotCatalog:
+    """Testes para o catálogo de pontos turísticos"""
+
+    def test_carrega_arquivo_uma_unica_vez(self, catalog_path):
+        """
+        Critério: Leituras repetidas não devem reler o arquivo inalterado
+        """
+        # Arrange
+        catalog = TouristSpotCatalog(catalog_path, check_interval=0)
+
+        # Act
+        for _ in range(10):
+            spots = catalog.get_all()
+
+        # Assert
+        assert len(spots) == 2
+        stats = catalog.stats()
+        assert stats['reloads'] == 1
+        assert stats['hits'] == 10
+
+    def test_busca_por_id(self, catalog_path):
+        """
+        Critério: Deve localizar pontos pelo id sem varrer a lista
+        """
+        catalog = TouristSpotCatalog(catalog_path, check_interval=0)
+
+        assert catalog.get(2)['nome'] == "Pão de Açúcar"
+        assert catalog.get(999) is None
+
+    def test_recarrega_quando_arquivo_muda(self, catalog_path):
+        """
+        Critério: Alteração de tamanho/mtime do arquivo invalida o catálogo
+        """
+        # Arrange
+        catalog = TouristSpotCatalog(catalog_path, check_interval=0)
+        assert len(catalog.get_all()) == 2
+
+        # Act
+        _write_spots(catalog_path, [
+            {"id": 3, "nome": "Maracanã", "localizacao": {"latitude": -22.91, "longitude": -43.23}},
+        ])
+        stat = os.stat(catalog_path)
+        os.utime(catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        # Assert
+        spots = catalog.get_all()
+        assert [s['id'] for s in spots] == [3]
+        assert catalog.stats()['reloads'] == 2
+
+    def test_mantem_ultima_versao_valida_com_arquivo_corrompido(self, catalog_path):
+        """
+        Critério: Um arquivo inválido não deve esvaziar o catálogo já carregado
+        """
+        catalog = TouristSpotCatalog(catalog_path, check_interval=0)
+        assert len(catalog.get_all()) == 2
+
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            f.write('{ inválido')
+
+        assert len(catalog.get_all()) == 2
+        assert catalog.stats()['errors'] == 1
+
+    def test_reload_explicito(self, catalog_path):
+        """
+        Critério: reload() deve reler o arquivo mesmo sem alterações
+        """
+        catalog = TouristSpotCatalog(catalog_path, check_interval=60)
+        catalog.get_all()
+
+        stats = catalog.reload()
+
+        assert stats['reloads'] == 2
+
+    def test_acesso_concorrente(self, catalog_path):
+        """
+        Critério: Acesso multi-thread deve carregar o arquivo apenas uma vez
+        """
+        catalog = TouristSpotCatalog(catalog_path, check_interval=0)
+        erros = []
+
+        def worker():
+            try:
+                for _ in range(50):
+                    assert len(catalog.get_all()) == 2
+            except Exception as e:  # pragma: no cover - apenas em falha
+                erros.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not erros
+        assert catalog.stats()['reloads'] == 1
+        assert catalog.stats()['hits'] == 400
+
+
+class TestTouristSpotCatalogAPI:
+    """Testes dos endpoints de manutenção do catálogo"""
+
+    def test_endpoint_reload(self, client):
+        """
+        Endpoint: POST /api/tourist-spots/reload
+        """
+        response = client.post('/api/tourist-spots/reload')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['spots'] > 0
+        assert 'reloads' in data
+        assert 'hits' in data
+
+    def test_endpoint_stats(self, client):
+        """
+        Endpoint: GET /api/tourist-spots/stats
+        """
+        client.get('/api/tourist-spots')
+        response = client.get('/api/tourist-spots/stats')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['hits'] >= 1
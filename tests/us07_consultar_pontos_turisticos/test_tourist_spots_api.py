@@ -191,3 +191,37 @@ class TestUS07ConsultarPontosTuristicos:
             assert isinstance(ponto['localizacao'], dict)
             assert isinstance(ponto['localizacao']['latitude'], (int, float))
             assert isinstance(ponto['localizacao']['longitude'], (int, float))
+
+
+class TestRevalidacaoPontosTuristicos:
+    """ETag e 304 nos endpoints do catálogo"""
+
+    @pytest.mark.parametrize('url', ['/api/tourist-spots', '/api/tourist-spots?search=cristo',
+                                     '/api/tourist-spots/1', '/tourist_spots.json'])
+    def test_if_none_match_retorna_304(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'].startswith('public, max-age=')
+
+        revalidacao = client.get(url, headers={'If-None-Match': response.headers['ETag']})
+
+        assert revalidacao.status_code == 304
+        assert revalidacao.data == b''
+        assert revalidacao.headers['ETag'] == response.headers['ETag']
+
+    def test_etag_depende_dos_filtros(self, client):
+        todos = client.get('/api/tourist-spots')
+        filtrados = client.get('/api/tourist-spots?search=cristo')
+
+        assert todos.headers['ETag'] != filtrados.headers['ETag']
+
+    def test_etag_muda_com_o_catalogo(self, client, monkeypatch):
+        from src.services.tourist_spot_catalog import catalog
+
+        etag = client.get('/api/tourist-spots').headers['ETag']
+        monkeypatch.setattr(catalog, 'version', lambda: (0, 0))
+
+        response = client.get('/api/tourist-spots', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
@@ -0,0 +1,114 @@
+"""
+Testes do preparo da imagem do mapa (redução e recompressão) antes de embutir no PDF
+Funcionalidade testada: US18 (Salvar rotas em PDF)
+"""
+import io
+from datetime import datetime
+
+import numpy as np
+import pytest
+from PIL import Image, PngImagePlugin
+
+from src.routes import pdf_export
+from src.services.cache import FileLRUCache
+from src.services.map_image import prepare_map_image
+
+
+def _salvar(imagem, formato, **kwargs):
+    buffer = io.BytesIO()
+    imagem.save(buffer, formato, **kwargs)
+    return buffer.getvalue()
+
+
+def _captura_de_tela(largura=2400, altura=1600):
+    """PNG grande com ruído, como a captura de um mapa de satélite"""
+    pixels = np.random.default_rng(7).integers(0, 256, (altura, largura, 3), dtype=np.uint8)
+    return _salvar(Image.fromarray(pixels), 'PNG')
+
+
+def _desenho_com_metadados():
+    """PNG de poucas cores, com texto e EXIF"""
+    imagem = Image.new('RGB', (1800, 1200), 'white')
+    imagem.paste((30, 90, 200), (100, 100, 900, 700))
+    info = PngImagePlugin.PngInfo()
+    info.add_text('Author', 'Fulano')
+    exif = Image.Exif()
+    exif[0x010E] = 'Mapa de teste'
+    return _salvar(imagem, 'PNG', pnginfo=info, exif=exif)
+
+
+class TestPreparoDaImagem:
+
+    def test_reduz_para_o_dpi_e_converte_foto_em_jpeg(self):
+        dados = _captura_de_tela()
+
+        resultado = prepare_map_image(dados, 6, 4, dpi=150)
+
+        assert resultado['format'] == 'JPEG'
+        assert (resultado['width'], resultado['height']) == (900, 600)
+        assert resultado['input_bytes'] == len(dados)
+        assert resultado['output_bytes'] == len(resultado['data']) < len(dados) / 4
+        assert resultado['seconds'] > 0
+
+    def test_poucas_cores_vira_png_sem_metadados(self):
+        resultado = prepare_map_image(_desenho_com_metadados(), 6, 4, dpi=100)
+
+        imagem = Image.open(io.BytesIO(resultado['data']))
+        assert resultado['format'] == 'PNG'
+        assert imagem.size == (600, 400)
+        assert imagem.mode == 'P'
+        assert 'Author' not in imagem.info
+        assert not imagem.getexif()
+
+    def test_transparencia_sobre_fundo_branco(self):
+        imagem = Image.new('RGBA', (300, 200), (0, 0, 0, 0))
+        imagem.paste((255, 0, 0, 255), (0, 0, 150, 200))
+
+        resultado = prepare_map_image(_salvar(imagem, 'PNG'), 6, 4)
+
+        convertida = Image.open(io.BytesIO(resultado['data'])).convert('RGB')
+        assert convertida.getpixel((10, 10)) == (255, 0, 0)
+        assert convertida.getpixel((290, 10)) == (255, 255, 255)
+
+    def test_imagem_pequena_nao_e_ampliada(self):
+        resultado = prepare_map_image(_salvar(Image.new('RGB', (200, 100), 'green'), 'PNG'), 6, 4)
+
+        assert (resultado['width'], resultado['height']) == (200, 100)
+
+    def test_dados_invalidos(self):
+        with pytest.raises(ValueError):
+            prepare_map_image(b'nao-e-imagem', 6, 4)
+
+
+@pytest.fixture
+def rota(route_factory, monkeypatch):
+    """Rota do usuário do teste, com o cache de PDFs desativado"""
+    monkeypatch.setattr(pdf_export, 'route_pdf_cache', FileLRUCache('route_pdfs', '', max_bytes=0))
+    return route_factory([{'id': 1, 'nome': 'Cristo Redentor',
+                           'localizacao': {'latitude': -22.95, 'longitude': -43.21}}],
+                         nome='Rota com mapa', data_inicio=datetime(2030, 9, 1, 9, 0)).id
+
+
+class TestExportacaoComMapa:
+    """POST /api/routes/<id>/export-pdf com map_image"""
+
+    def test_pdf_menor_que_a_captura_e_cabecalhos(self, client, rota):
+        """
+        Critério: O PDF embute a imagem reduzida e a resposta informa tamanhos e tempo
+        """
+        dados = _captura_de_tela()
+
+        response = client.post(f'/api/routes/{rota}/export-pdf',
+                               data={'map_image': (io.BytesIO(dados), 'mapa.png')})
+
+        assert response.status_code == 200
+        assert len(response.data) < len(dados) / 4
+        assert response.headers['X-Map-Image-Input-Bytes'] == str(len(dados))
+        assert int(response.headers['X-Map-Image-Output-Bytes']) < len(dados)
+        assert response.headers['X-Map-Image-Format'] == 'JPEG'
+        assert float(response.headers['X-Map-Image-Time-Ms']) > 0
+
+    def test_sem_imagem_sem_cabecalhos(self, client, rota):
+        response = client.get(f'/api/routes/{rota}/export-pdf')
+
+        assert 'X-Map-Image-Input-Bytes' not in response.headers
@@ -0,0 +1,133 @@
+"""
+Testes do cache de PDFs de rotas
+Funcionalidade testada: US18 (Salvar rotas em PDF)
+"""
+import io
+import json
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.routes import pdf_export
+from src.services.cache import FileLRUCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Cache de PDFs isolado em um diretório temporário"""
+    novo = FileLRUCache('route_pdfs', str(tmp_path / 'pdfs'), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(pdf_export, 'route_pdf_cache', novo)
+    return novo
+
+
+@pytest.fixture
+def rota(route_factory):
+    return route_factory([{'id': 1, 'nome': 'Cristo Redentor',
+                           'localizacao': {'latitude': -22.95, 'longitude': -43.21}}],
+                         nome='Rota em cache', data_inicio=datetime(2030, 7, 1, 9, 0)).id
+
+
+def _exportar(client, route_id, **kwargs):
+    return client.get(f'/api/routes/{route_id}/export-pdf', **kwargs)
+
+
+class TestCacheDePdf:
+    """GET/POST /api/routes/<id>/export-pdf com cache"""
+
+    def test_segundo_download_vem_do_cache(self, client, rota, cache):
+        primeiro = _exportar(client, rota)
+
+        with patch.object(pdf_export, 'render_route_pdf') as gerar:
+            segundo = _exportar(client, rota)
+
+        gerar.assert_not_called()
+        assert segundo.status_code == 200
+        assert segundo.data == primeiro.data
+        assert segundo.headers['ETag'] == primeiro.headers['ETag']
+        assert cache.stats()['hits'] == 1
+
+    def test_if_none_match_retorna_304(self, client, rota, cache):
+        etag = _exportar(client, rota).headers['ETag']
+
+        response = _exportar(client, rota, headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_imagem_do_mapa_faz_parte_da_chave(self, client, rota, cache):
+        sem_mapa = _exportar(client, rota).headers['ETag']
+        com_mapa = client.post(f'/api/routes/{rota}/export-pdf',
+                               data={'map_image': (io.BytesIO(b'nao-e-imagem'), 'mapa.png')})
+
+        assert com_mapa.headers['ETag'] != sem_mapa
+        assert cache.stats()['entries'] == 2
+
+    def test_atualizacao_invalida(self, client, rota, cache):
+        """
+        Critério: Após atualizar a rota o PDF é gerado de novo e o antigo sai do cache
+        """
+        antes = _exportar(client, rota)
+        client.put(f'/api/routes/{rota}', data=json.dumps({'nome': 'Rota renomeada'}),
+                   content_type='application/json')
+
+        assert cache.stats()['entries'] == 0
+        depois = _exportar(client, rota, headers={'If-None-Match': antes.headers['ETag']})
+        assert depois.status_code == 200
+        assert 'Rota_renomeada' in depois.headers['Content-Disposition']
+
+    def test_atualizacao_parcial_invalida(self, client, rota, cache):
+        _exportar(client, rota)
+        client.patch(f'/api/routes/{rota}', data=json.dumps({'nome': 'Outra'}), content_type='application/json')
+
+        assert cache.stats()['entries'] == 0
+
+    def test_exclusao_invalida(self, client, rota, cache):
+        _exportar(client, rota)
+        client.delete(f'/api/routes/{rota}')
+
+        assert os.listdir(cache.directory) == []
+
+
+class TestFileLRUCache:
+    """Testes unitários do armazenamento em arquivos"""
+
+    def test_despeja_menos_usado_acima_do_limite(self, tmp_path):
+        cache = FileLRUCache('teste', str(tmp_path), max_bytes=250)
+        cache.set('a', b'a' * 100)
+        cache.set('b', b'b' * 100)
+        cache.get('a')
+
+        cache.set('c', b'c' * 100)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == b'a' * 100
+        assert cache.stats()['bytes'] == 200
+        assert cache.stats()['evictions'] == 1
+
+    def test_ordem_lru_sobrevive_a_reinicio(self, tmp_path):
+        cache = FileLRUCache('teste', str(tmp_path), max_bytes=250)
+        cache.set('a', b'a' * 100)
+        cache.set('b', b'b' * 100)
+        os.utime(tmp_path / 'a.bin', (1, 1))
+
+        reiniciado = FileLRUCache('teste', str(tmp_path), max_bytes=250)
+        reiniciado.set('c', b'c' * 100)
+
+        assert sorted(os.listdir(tmp_path)) == ['b.bin', 'c.bin']
+
+    def test_remove_por_prefixo(self, tmp_path):
+        cache = FileLRUCache('teste', str(tmp_path), max_bytes=1000)
+        cache.set('route-1-x', b'1')
+        cache.set('route-12-y', b'12')
+
+        assert cache.delete_prefix('route-1-') == 1
+        assert cache.get('route-12-y') == b'12'
+
+    def test_desativado(self, tmp_path):
+        cache = FileLRUCache('teste', str(tmp_path / 'nada'), max_bytes=0)
+        cache.set('a', b'a')
+
+        assert cache.get('a') is None
+        assert not (tmp_path / 'nada').exists()
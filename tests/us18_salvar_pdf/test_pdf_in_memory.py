@@ -0,0 +1,94 @@
+"""
+Testes da geração de PDF em memória
+Funcionalidade testada: US18 (Salvar rotas em PDF)
+"""
+import io
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from PIL import Image as PILImage
+
+from src.routes import pdf_export
+from src.services.cache import FileLRUCache
+
+
+PONTOS = [
+    {'id': 1, 'nome': 'Cristo Redentor', 'descricao': 'Estátua icônica no Corcovado',
+     'localizacao': {'latitude': -22.951916, 'longitude': -43.210487}},
+    {'id': 2, 'nome': 'Pão de Açúcar', 'localizacao': {'latitude': -22.948658, 'longitude': -43.157444}},
+    3,  # ponto informado apenas pelo ID
+]
+
+
+@pytest.fixture(autouse=True)
+def sem_cache_de_pdf(monkeypatch):
+    """Desativa o cache de PDFs: cada exportação gera o documento de novo"""
+    monkeypatch.setattr(pdf_export, 'route_pdf_cache', FileLRUCache('route_pdfs', '', max_bytes=0))
+
+
+@pytest.fixture
+def rota(route_factory):
+    return route_factory(PONTOS, nome='Rota PDF', data_inicio=datetime(2030, 6, 1, 9, 0)).id
+
+
+def _imagem_png():
+    buffer = io.BytesIO()
+    PILImage.new('RGB', (400, 300), 'steelblue').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _arquivos_temporarios():
+    return set(os.listdir(tempfile.gettempdir()))
+
+
+def _sem_arquivos_temporarios(*args, **kwargs):
+    raise AssertionError('A exportação não deve criar arquivos temporários')
+
+
+class TestPdfEmMemoria:
+    """GET/POST /api/routes/<id>/export-pdf sem passar pelo disco"""
+
+    def test_mil_exportacoes_sem_arquivos_temporarios(self, client, rota):
+        """
+        Critério: Após 1.000 exportações nenhum arquivo temporário permanece
+        """
+        antes = _arquivos_temporarios()
+
+        with patch('tempfile.NamedTemporaryFile', _sem_arquivos_temporarios), \
+                patch('tempfile.mkstemp', _sem_arquivos_temporarios):
+            for _ in range(1000):
+                response = client.get(f'/api/routes/{rota}/export-pdf')
+                assert response.status_code == 200
+                assert response.data.startswith(b'%PDF-')
+
+        assert _arquivos_temporarios() - antes == set()
+
+    def test_imagem_do_mapa_em_memoria(self, client, rota):
+        with patch('tempfile.NamedTemporaryFile', _sem_arquivos_temporarios):
+            com_mapa = client.post(f'/api/routes/{rota}/export-pdf',
+                                   data={'map_image': (io.BytesIO(_imagem_png()), 'mapa.png')})
+            sem_mapa = client.get(f'/api/routes/{rota}/export-pdf')
+
+        assert com_mapa.status_code == 200
+        assert b'/Subtype /Image' in com_mapa.data
+        assert b'/Subtype /Image' not in sem_mapa.data
+
+    def test_imagem_invalida_usa_mapa_simples(self, client, rota):
+        response = client.post(f'/api/routes/{rota}/export-pdf',
+                               data={'map_image': (io.BytesIO(b'nao-e-imagem'), 'mapa.png')})
+
+        assert response.status_code == 200
+        assert response.data.startswith(b'%PDF-')
+
+    def test_cabecalhos_de_download(self, client, rota):
+        response = client.get(f'/api/routes/{rota}/export-pdf')
+
+        assert response.content_type == 'application/pdf'
+        assert 'rota_Rota_PDF.pdf' in response.headers['Content-Disposition']
+        assert int(response.headers['Content-Length']) == len(response.data)
+
+    def test_rota_inexistente(self, client):
+        assert client.get('/api/routes/999999999/export-pdf').status_code == 404
@@ -0,0 +1,139 @@
+"""
+Testes da exportação assíncrona de PDFs (fila de jobs em pool de processos)
+Funcionalidade testada: US18 (Salvar rotas em PDF)
+"""
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from src.routes import pdf_export
+from src.services.cache import FileLRUCache
+from src.services.job_queue import JobQueue, JobStore
+
+
+@pytest.fixture
+def fila(tmp_path, monkeypatch):
+    """Fila, armazenamento de jobs e cache de PDFs isolados em um diretório temporário"""
+    nova = JobQueue('pdf_export', JobStore(str(tmp_path / 'jobs.db'), ttl=60),
+                    max_workers=1, max_pending=4, job_timeout=60,
+                    on_result=lambda key, pdf: pdf_export.route_pdf_cache.set(key, pdf))
+    monkeypatch.setattr(pdf_export, 'pdf_job_queue', nova)
+    monkeypatch.setattr(pdf_export, 'route_pdf_cache',
+                        FileLRUCache('route_pdfs', str(tmp_path / 'pdfs'), max_bytes=10 * 1024 * 1024))
+    yield nova
+    if nova._executor is not None:
+        nova._executor.shutdown()
+
+
+@pytest.fixture
+def rota(route_factory):
+    return route_factory([{'id': 1, 'nome': 'Cristo Redentor',
+                           'localizacao': {'latitude': -22.95, 'longitude': -43.21}}],
+                         nome='Rota assincrona', data_inicio=datetime(2030, 8, 1, 9, 0)).id
+
+
+def _enfileirar(client, route_id):
+    return client.post(f'/api/routes/{route_id}/export-pdf/jobs')
+
+
+def _aguardar(client, status_url, timeout=30):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        job = json.loads(client.get(status_url).data)
+        if job['status'] != 'pending':
+            return job
+        time.sleep(0.05)
+    pytest.fail('Job não terminou a tempo')
+
+
+class TestJobsDeExportacao:
+    """POST /api/routes/<id>/export-pdf/jobs e consulta do job"""
+
+    def test_gera_pdf_em_outro_processo(self, client, rota, fila):
+        response = _enfileirar(client, rota)
+
+        assert response.status_code == 202
+        criado = json.loads(response.data)
+        assert response.headers['Location'] == criado['status_url']
+
+        job = _aguardar(client, criado['status_url'])
+        assert job['status'] == 'done'
+        download = client.get(job['download_url'])
+        assert download.status_code == 200
+        assert download.data.startswith(b'%PDF')
+        assert 'rota_Rota_assincrona.pdf' in download.headers['Content-Disposition']
+        assert fila.stats()['completed'] == 1
+
+    def test_pdf_em_cache_nao_usa_o_pool(self, client, rota, fila):
+        """
+        Critério: Se o PDF da versão atual já existe, o job nasce concluído
+        """
+        client.get(f'/api/routes/{rota}/export-pdf')
+
+        job = json.loads(_enfileirar(client, rota).data)
+
+        assert job['status'] == 'done'
+        assert fila._executor is None
+        assert client.get(job['download_url']).data.startswith(b'%PDF')
+
+    def test_fila_cheia_retorna_429(self, client, rota, fila):
+        fila.max_pending = 0
+
+        response = _enfileirar(client, rota)
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == str(pdf_export.PDF_JOB_RETRY_AFTER)
+        assert fila.stats()['rejected'] == 1
+
+    def test_rota_inexistente(self, client, fila):
+        assert _enfileirar(client, 999999999).status_code == 404
+
+    def test_job_de_outra_rota(self, client, rota, fila):
+        job = json.loads(_enfileirar(client, rota).data)
+
+        assert client.get(f"/api/routes/{rota + 1}/export-pdf/jobs/{job['job_id']}").status_code == 404
+        assert client.get(f'/api/routes/{rota}/export-pdf/jobs/inexistente').status_code == 404
+        _aguardar(client, job['status_url'])
+
+
+def _falhar():
+    raise ValueError('falha na geração')
+
+
+class TestJobQueue:
+    """Testes unitários da fila"""
+
+    def test_falha_do_job_fica_registrada(self, tmp_path):
+        fila = JobQueue('teste', JobStore(str(tmp_path / 'jobs.db'), ttl=60),
+                        max_workers=1, max_pending=1, job_timeout=60)
+        job_id = fila.submit(1, 'chave', 'arquivo.pdf', _falhar)
+        fila._executor.shutdown(wait=True)
+
+        job = fila.status(job_id)
+        assert job['status'] == 'failed'
+        assert 'falha na geração' in job['error']
+        assert fila.stats()['pending'] == 0
+
+    def test_pendente_alem_do_tempo_limite(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.db'), ttl=60)
+        store.create('perdido', 'teste', 1, 'arquivo.pdf')
+        store.create('outro_tipo', 'outro', 1, 'arquivo.pdf')
+        fila = JobQueue('teste', store, max_workers=1, max_pending=1, job_timeout=0)
+
+        assert fila.expire_timed_out() == 1
+        # A falha fica gravada no store, visível para qualquer processo
+        job = store.get('perdido')
+        assert job['status'] == 'failed'
+        assert job['error'] == 'Tempo limite excedido'
+        assert job['finished_at'] is not None
+        assert store.get('outro_tipo')['status'] == 'pending'
+
+    def test_pool_nao_usa_fork_por_padrao(self, tmp_path):
+        fila = JobQueue('teste', JobStore(str(tmp_path / 'jobs.db'), ttl=60),
+                        max_workers=1, max_pending=1, job_timeout=60)
+        try:
+            assert fila._get_executor()._mp_context.get_start_method() == 'spawn'
+        finally:
+            fila._executor.shutdown(wait=True)
@@ -0,0 +1,137 @@
+"""
+Testes da exportação de várias rotas em um único PDF (livro da viagem)
+Funcionalidade testada: US18 (Salvar rotas em PDF)
+"""
+import io
+import json
+from datetime import datetime
+
+import pytest
+from reportlab.platypus import Flowable, SimpleDocTemplate
+from sqlalchemy import event
+
+from src.models.user import db
+from src.routes import pdf_export
+from src.routes.pdf_export import LazyStory
+
+
+PONTO = {'id': 1, 'nome': 'Cristo Redentor', 'localizacao': {'latitude': -22.95, 'longitude': -43.21}}
+
+
+@pytest.fixture
+def rotas(route_factory):
+    """Cria cinco rotas para o usuário do teste"""
+    return [route_factory([PONTO, i + 100], nome=f'Dia {i + 1}', data_inicio=datetime(2030, 10, i + 1, 9, 0)).id
+            for i in range(5)]
+
+
+def _exportar(client, corpo):
+    return client.post('/api/routes/export-pdf', data=json.dumps(corpo), content_type='application/json')
+
+
+def _paginas(pdf):
+    return pdf.count(b'/Type /Page\n')
+
+
+class TestLivroDeRotas:
+    """POST /api/routes/export-pdf"""
+
+    def test_um_documento_com_sumario(self, client, rotas):
+        response = _exportar(client, {'route_ids': rotas, 'title': 'Viagem ao Rio'})
+
+        assert response.status_code == 200
+        assert response.content_type == 'application/pdf'
+        assert 'Viagem_ao_Rio.pdf' in response.headers['Content-Disposition']
+        pdf = response.data
+        # Sumário + uma página por rota, com um link do sumário e uma entrada no outline para cada
+        assert _paginas(pdf) == 1 + len(rotas)
+        assert pdf.count(b'/Subtype /Link') == len(rotas)
+        assert b'/Outlines' in pdf
+        for i in range(len(rotas)):
+            assert f'{i + 1}. Dia {i + 1}'.encode() in pdf
+
+    def test_ordem_informada_e_ids_repetidos(self, client, rotas):
+        pedido = [rotas[2], rotas[0], rotas[2]]
+
+        pdf = _exportar(client, {'route_ids': pedido}).data
+
+        assert _paginas(pdf) == 3
+        assert pdf.index(b'1. Dia 3') < pdf.index(b'2. Dia 1')
+
+    def test_carrega_rotas_em_lotes(self, client, rotas, monkeypatch):
+        monkeypatch.setattr(pdf_export, 'ROUTE_BOOK_BATCH_SIZE', 2)
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            # Rotas completas (as do sumário trazem só id, nome e data)
+            if 'FROM route' in statement and 'route.pontos_turisticos' in statement:
+                consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = _exportar(client, {'route_ids': rotas})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        assert response.status_code == 200
+        # 5 rotas em lotes de 2
+        assert len(consultas) == 3
+
+    def test_rota_inexistente(self, client, rotas):
+        response = _exportar(client, {'route_ids': [rotas[0], 999999999]})
+
+        assert response.status_code == 404
+        assert json.loads(response.data)['missing'] == [999999999]
+
+    @pytest.mark.parametrize('corpo', [
+        {},
+        {'route_ids': []},
+        {'route_ids': 'todos'},
+        {'route_ids': [1, 'dois']},
+        {'route_ids': [True]},
+        {'route_ids': [1], 'title': 5},
+        [1, 2],
+    ])
+    def test_corpo_invalido(self, client, corpo):
+        assert _exportar(client, corpo).status_code == 400
+
+    def test_limite_de_rotas(self, client, monkeypatch):
+        monkeypatch.setattr(pdf_export, 'ROUTE_BOOK_MAX_ROUTES', 2)
+
+        assert _exportar(client, {'route_ids': [1, 2, 3]}).status_code == 400
+
+
+class _Marcador(Flowable):
+    """Registra, ao ser desenhado, quantas partes da story já tinham sido geradas"""
+
+    def __init__(self, parte, geradas, registro):
+        super().__init__()
+        self.parte = parte
+        self.geradas = geradas
+        self.registro = registro
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.registro.append((self.parte, len(self.geradas)))
+
+
+class TestLazyStory:
+
+    def test_partes_geradas_sob_demanda(self):
+        """
+        Critério: Cada parte só é montada quando a anterior já foi paginada (memória limitada)
+        """
+        geradas = []
+        registro = []
+
+        def partes():
+            for parte in range(20):
+                geradas.append(parte)
+                yield [_Marcador(parte, geradas, registro)]
+
+        SimpleDocTemplate(io.BytesIO()).build(LazyStory(partes()))
+
+        assert [parte for parte, _ in registro] == list(range(20))
+        assert all(quantas == parte + 1 for parte, quantas in registro)